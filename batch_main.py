@@ -0,0 +1,10 @@
+# 好幾個半季一次跑完，一個半季一個 process，結果寫到 outputs/{半季}/
+# python batch_main.py                 -> package/cpbl_batch.py SEASONS 裡全部
+# python batch_main.py 2025年上 2024年下 -> 只跑這幾個
+import sys
+from package.cpbl_batch import run_seasons
+
+# 開 process 一定要有這行 (Windows 子 process 會重新 import 這支)
+if __name__ == "__main__":
+	seasons = sys.argv[1:] if len(sys.argv) > 1 else None
+	run_seasons(seasons)
@@ -0,0 +1,114 @@
+import datetime
+import glob
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from package.cpbl_cache import DEFAULT_CACHE_DIR
+from package.cpbl_decode import loads, orjson
+from package.cpbl_models import games_from_week
+from fake_rebas import make_week
+
+"""
+一週的 json 解開一次，再給 CONSUMERS 個 consumer 各走一遍 (每場看狀態、主客隊、每個打席的打者跟 RE24) 要多久
+	json + .get()          : 以前的寫法，json.loads 變 dict，每個 consumer 一層一層 .get()
+	json + games_from_week : 內建 json 解，dict 再轉成 Game (GetData(compact=True) 沒裝 orjson 的時候)
+	orjson + games_from_week: cpbl_decode.loads (有裝 orjson 才會有這列)，現在 WeekCache / RebasClient 用的
+有存下來的週 (.rebas_cache/CPBL-*/*.json) 就用那些，沒有的話用 fake_rebas 產生一季
+	python bench/bench_decode.py
+"""
+
+ROUNDS = 5
+WEEKS = 29
+# pipeline_main.py 註冊了四個分析
+CONSUMERS = 4
+
+def payloads() -> list:
+	files = sorted(glob.glob(os.path.join(DEFAULT_CACHE_DIR, "CPBL-*", "*.json")))
+	if (len(files) > 0):
+		result = []
+		for path in files:
+			with open(path, "rb") as f:
+				result.append(f.read())
+		return result
+	day = datetime.date(2025, 3, 24)
+	result = []
+	for _ in range(WEEKS):
+		result.append(json.dumps(make_week(day), ensure_ascii=False).encode("utf-8"))
+		day += datetime.timedelta(days=7)
+	return result
+
+def walk_dicts(games: list) -> tuple:
+	finished = 0
+	pa = 0
+	re24 = 0.0
+	for game in games:
+		if (game.get("info", {}).get("status") != "FINISHED"):
+			continue
+		finished += 1
+		game.get("home", {}).get("abbr")
+		game.get("away", {}).get("abbr")
+		for it in game.get("PA_list", []):
+			it.get("batter", {}).get("name")
+			pa += 1
+			re24 += it.get("RE24", 0)
+	return (finished, pa, round(re24, 6))
+
+def walk_games(games: list) -> tuple:
+	finished = 0
+	pa = 0
+	re24 = 0.0
+	for game in games:
+		if (not game.finished):
+			continue
+		finished += 1
+		game.home
+		game.away
+		for it in game.PA_list:
+			it.batter
+			pa += 1
+			re24 += it.RE24
+	return (finished, pa, round(re24, 6))
+
+def baseline(payload: bytes) -> tuple:
+	games = json.loads(payload)["data"]
+	return [walk_dicts(games) for _ in range(CONSUMERS)][-1]
+
+def compact(payload: bytes) -> tuple:
+	games = games_from_week(json.loads(payload)["data"])
+	return [walk_games(games) for _ in range(CONSUMERS)][-1]
+
+def fast(payload: bytes) -> tuple:
+	games = games_from_week(loads(payload)["data"])
+	return [walk_games(games) for _ in range(CONSUMERS)][-1]
+
+def timed(run, weeks: list) -> tuple:
+	best = None
+	result = None
+	for _ in range(ROUNDS):
+		begin = time.perf_counter()
+		result = [run(payload) for payload in weeks]
+		spent = time.perf_counter() - begin
+		best = spent if best is None else min(best, spent)
+	return (best, result)
+
+def main():
+	weeks = payloads()
+	size = sum(len(payload) for payload in weeks) / 1e6
+	print(f"{len(weeks)} weeks, {size:.1f} MB, {CONSUMERS} consumers, best of {ROUNDS}")
+
+	base, expected = timed(baseline, weeks)
+	print(f"{'decoder':>24} | {'total s':>8} | {'ms/week':>8} | {'speedup':>8}")
+	print(f"{'json + .get()':>24} | {base:>8.3f} | {base / len(weeks) * 1000:>8.2f} | {1.0:>8.2f}")
+	runs = [("json + games_from_week", compact)]
+	if (orjson is not None):
+		runs.append(("orjson + games_from_week", fast))
+	for name, run in runs:
+		t, result = timed(run, weeks)
+		# 算出來的東西要跟 baseline 一樣
+		assert result == expected, name
+		print(f"{name:>24} | {t:>8.3f} | {t / len(weeks) * 1000:>8.2f} | {base / t:>8.2f}")
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,44 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from package.cpbl_cache import WeekCache
+from package.cpbl_client import RebasClient
+from package.cpbl_win_rate import GetWR
+from fake_rebas import FakeRebas
+
+"""
+一週一週抓 vs 一起抓 的牆鐘時間
+對象是本機的假 server (每個 request 睡 LATENCY 秒)，每次都用全新的快取資料夾，所以每週都真的有打 request
+	python bench/bench_fetch.py
+"""
+
+LATENCY = 0.2
+START = (2025, 3, 24)
+END = (2025, 10, 13)   # 29 週
+
+def crawl(root: str, max_workers: int) -> tuple[float, list]:
+	# 不限速，這裡只想量抓的方式本身
+	client = RebasClient(root=root, rate=None)
+	wr = GetWR(START, END, cache=WeekCache(tempfile.mkdtemp()), max_workers=max_workers, client=client)
+	begin = time.perf_counter()
+	with contextlib.redirect_stdout(io.StringIO()):
+		wr.analyze()
+	return (time.perf_counter() - begin, wr._game_result)
+
+def main():
+	with FakeRebas(LATENCY) as fake:
+		base_time, base_result = crawl(fake.root, 1)
+		print(f"{'workers':>8} | {'seconds':>8} | {'speedup':>8}")
+		print(f"{1:>8} | {base_time:>8.2f} | {1.0:>8.2f}")
+		for workers in (4, 8, 16):
+			t, result = crawl(fake.root, workers)
+			# 順序一定要跟一週一週抓的一樣
+			assert result == base_result
+			print(f"{workers:>8} | {t:>8.2f} | {base_time / t:>8.2f}")
+
+if __name__ == "__main__":
+	main()
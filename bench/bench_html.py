@@ -0,0 +1,56 @@
+import glob
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from package.cpbl_html import read_tables, available_backends
+
+"""
+解析 datas/ 底下所有存下來的頁面要多久
+baseline 是以前的寫法：整頁丟給 BeautifulSoup(html, "html.parser") 再 find_all("table")
+	python bench/bench_html.py
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROUNDS = 3
+
+def baseline(html: str):
+	from bs4 import BeautifulSoup
+	soup = BeautifulSoup(html, "html.parser")
+	for table in soup.find_all("table"):
+		thead = table.find("thead")
+		tbody = table.find("tbody")
+		if (not thead or not tbody):
+			continue
+		[th.get_text(strip=True) for th in thead.find_all("th")]
+		for tr in tbody.find_all("tr"):
+			[td.get_text(strip=True) for td in tr.find_all("td")]
+
+def timed(parse, pages: list) -> float:
+	best = None
+	for _ in range(ROUNDS):
+		begin = time.perf_counter()
+		for html in pages:
+			parse(html)
+		spent = time.perf_counter() - begin
+		best = spent if best is None else min(best, spent)
+	return best
+
+def main():
+	files = sorted(glob.glob(os.path.join(ROOT, "datas", "**", "*.txt"), recursive=True))
+	pages = []
+	for path in files:
+		with open(path, "r", encoding="utf-8") as f:
+			pages.append(f.read())
+	size = sum(len(page.encode("utf-8")) for page in pages) / 1e6
+	print(f"{len(pages)} pages, {size:.1f} MB, best of {ROUNDS}")
+
+	base = timed(baseline, pages)
+	print(f"{'backend':>22} | {'total s':>8} | {'ms/page':>8} | {'speedup':>8}")
+	print(f"{'full tree html.parser':>22} | {base:>8.3f} | {base / len(pages) * 1000:>8.1f} | {1.0:>8.2f}")
+	for backend in available_backends():
+		t = timed(lambda html: read_tables(html, backend), pages)
+		print(f"{backend:>22} | {t:>8.3f} | {t / len(pages) * 1000:>8.1f} | {base / t:>8.2f}")
+
+if __name__ == "__main__":
+	main()
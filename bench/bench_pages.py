@@ -0,0 +1,45 @@
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from package.cpbl_html import available_backends
+from package.cpbl_tables import TableCache
+from package.cpbl_league import load_pages, season_pages
+
+"""
+一季的頁面 (六隊投手頁 + 打擊頁) 全部冷啟動讀進來要多久
+每一輪都用新的快取資料夾，所以一定是真的解析
+	python bench/bench_pages.py [年份] [backend]
+理想上 process pool 的時間 ≈ 最慢那一頁 (+ 開 process 的成本)，前提是 CPU 夠多
+"""
+
+ROUNDS = 3
+
+def cold_load(paths: list, backend: str, workers: int) -> float:
+	best = None
+	for _ in range(ROUNDS):
+		with tempfile.TemporaryDirectory() as tmp:
+			cache = TableCache(tmp, backend)
+			begin = time.perf_counter()
+			load_pages(paths, workers, cache)
+			spent = time.perf_counter() - begin
+		best = spent if best is None else min(best, spent)
+	return best
+
+def main():
+	year = int(sys.argv[1]) if len(sys.argv) > 1 else 2025
+	backend = sys.argv[2] if len(sys.argv) > 2 else available_backends()[0]
+	pitching, offense = season_pages(year)
+	paths = [path for path in list(pitching.values()) + list(offense.values()) if os.path.exists(path)]
+	print(f"{year}: {len(paths)} pages, backend {backend}, {os.cpu_count()} CPUs, best of {ROUNDS}")
+
+	slowest = max(cold_load([path], backend, 1) for path in paths)
+	print(f"{'slowest single page':>20} | {slowest:>8.3f} s")
+	for workers in [None, 1, 2, 4, len(paths)]:
+		t = cold_load(paths, backend, workers)
+		label = "auto (default)" if workers is None else f"{workers} workers"
+		print(f"{label:>20} | {t:>8.3f} s")
+
+if __name__ == "__main__":
+	main()
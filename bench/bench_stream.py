@@ -0,0 +1,134 @@
+import datetime
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from package.cpbl_cache import WeekCache
+from package.cpbl_calendar import WeekCalendar, week_start
+from package.cpbl_client import SEASON_SUFFIX
+from package.cpbl_era import GetERA
+from package.cpbl_models import games_from_week
+from package.cpbl_stream import iter_cached_games, iter_cached_weeks
+from offense_data.offense import GetPAStats
+from fake_rebas import make_week
+
+try:
+	import resource
+except ImportError:
+	resource = None
+
+"""
+八季六隊的快取週檔，find_sp + end_season_PAs 各走一遍，記憶體最多用到多少
+	all    : 以前 GetData.data 那樣，全部的週先 json.load 進一個 dict 再算
+	weekly : GetData.iter_weeks() 那樣，一次 json.load 一整週
+	stream : cpbl_stream，一次只解一場
+每種都在自己的 process 裡跑，peak RSS 才不會互相影響 (要有 resource 模組，Windows 沒有)
+用 fake_rebas 產生資料放在暫存資料夾，不會動到 .rebas_cache
+	python bench/bench_stream.py [季數]
+"""
+
+SEASONS = 8
+WEEKS = 29
+
+def season_range(year: int) -> tuple:
+	start = week_start(datetime.date(year, 3, 24))
+	return (start, start + datetime.timedelta(days=7 * WEEKS))
+
+def ranges(seasons: int) -> list:
+	last = max(SEASON_SUFFIX)
+	return [season_range(year) for year in range(last - seasons + 1, last + 1)]
+
+def build_cache(cache_dir: str, seasons: int) -> int:
+	cache = WeekCache(cache_dir)
+	size = 0
+	for start, end in ranges(seasons):
+		day = start
+		while (day < end):
+			path = cache.path_of(SEASON_SUFFIX[day.year], day)
+			os.makedirs(os.path.dirname(path), exist_ok=True)
+			with open(path, "w", encoding="utf-8") as f:
+				json.dump(make_week(day), f, ensure_ascii=False)
+			size += os.path.getsize(path)
+			day += datetime.timedelta(days=7)
+	return size
+
+def peak_rss_mb():
+	if (resource is None):
+		return None
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	# Linux 是 KB，macOS 是 bytes
+	return peak / (1 << 20) if sys.platform == "darwin" else peak / (1 << 10)
+
+def _load(cache: WeekCache, now) -> dict:
+	with open(cache.path_of(SEASON_SUFFIX[now[0]], now), "r", encoding="utf-8") as f:
+		return json.load(f)
+
+# 每種讀法都回傳 (find_sp 吃的 weeks, end_season_PAs 吃的 games)
+def read_all(cache: WeekCache, calendar: WeekCalendar, start, end) -> tuple:
+	data = {now: _load(cache, now) for now in calendar.weeks(start, end)}
+	return ({now: json_data["data"] for now, json_data in data.items()}, [game for json_data in data.values() for game in json_data["data"]])
+
+def read_weekly(cache: WeekCache, calendar: WeekCalendar, start, end) -> tuple:
+	weeks = ((now, games_from_week(_load(cache, now)["data"])) for now in calendar.weeks(start, end))
+	games = (game for now in calendar.weeks(start, end) for game in _load(cache, now)["data"])
+	return (weeks, games)
+
+def read_stream(cache: WeekCache, calendar: WeekCalendar, start, end) -> tuple:
+	return (iter_cached_weeks(start, end, cache, calendar), iter_cached_games(start, end, cache, calendar))
+
+MODES = {"all": read_all, "weekly": read_weekly, "stream": read_stream}
+
+def child(mode: str, cache_dir: str, seasons: int):
+	base = peak_rss_mb()
+	cache = WeekCache(cache_dir)
+	calendar = WeekCalendar(cache_dir)
+	begin = time.perf_counter()
+	sp = {}
+	pa_games = 0
+	pa_total = 0
+	# all 的話八季會一起留在記憶體 (以前每個半季一個 GetData)，另外兩種只是 generator
+	readers = [(start, end, MODES[mode](cache, calendar, start, end)) for start, end in ranges(seasons)]
+	for start, end, (weeks, games) in readers:
+		guardians, _ = GetERA({}).find_sp(10 ** 6, weeks)
+		for name, count in guardians.items():
+			sp[name] = sp.get(name, 0) + count
+		pa = GetPAStats(start.timetuple()[:3], end.timetuple()[:3])
+		pa.end_season_PAs(games)
+		pa_games += pa._games_count
+		pa_total += sum(stats["full_season_PA_count"] for stats in pa.player_data.values())
+	spent = time.perf_counter() - begin
+	print(json.dumps({"time": spent, "base": base, "peak": peak_rss_mb(), "result": [sorted(sp.items()), pa_games, pa_total]}, ensure_ascii=False))
+
+def run_child(mode: str, cache_dir: str, seasons: int) -> dict:
+	out = subprocess.run(
+		[sys.executable, os.path.abspath(__file__), "--child", mode, cache_dir, str(seasons)],
+		capture_output=True, text=True, encoding="utf-8", check=True
+	).stdout
+	return json.loads(out.strip().splitlines()[-1])
+
+def mb(value) -> str:
+	return f"{value:>9.1f}" if value is not None else f"{'n/a':>9}"
+
+def main():
+	seasons = int(sys.argv[1]) if len(sys.argv) > 1 else SEASONS
+	with tempfile.TemporaryDirectory() as tmp:
+		size = build_cache(tmp, seasons)
+		print(f"{seasons} seasons x {WEEKS} weeks, {size / 1e6:.1f} MB of cached json")
+		print(f"{'mode':>8} | {'time s':>8} | {'import MB':>9} | {'peak MB':>9} | {'extra MB':>9}")
+		expected = None
+		for mode in MODES:
+			it = run_child(mode, tmp, seasons)
+			# 三種讀法算出來要一樣
+			expected = it["result"] if expected is None else expected
+			assert it["result"] == expected, mode
+			extra = it["peak"] - it["base"] if it["peak"] is not None else None
+			print(f"{mode:>8} | {it['time']:>8.2f} | {mb(it['base'])} | {mb(it['peak'])} | {mb(extra)}")
+
+if __name__ == "__main__":
+	if (len(sys.argv) > 1 and sys.argv[1] == "--child"):
+		child(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+	else:
+		main()
@@ -0,0 +1,93 @@
+import datetime
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+"""
+假的 Rebas API，給 benchmark 用
+make_week 產生長得跟 /api/seasons/.../games?start= 一樣的 json
+(只有我們會讀的欄位：home/away/info/PA_list)
+FakeRebas 在本機開一個 server，每個 request 故意睡 latency 秒模擬網路
+"""
+
+TEAMS = ["悍", "龍", "獅", "猿", "鷹", "象"]
+
+def make_game(day: datetime.date, no: int, rng: random.Random) -> dict:
+	home, away = rng.sample(TEAMS, 2)
+	pa_list = []
+	order = {"top": 0, "bottom": 0}
+	for inning in range(1, 10):
+		for side, pitching in (("top", home), ("bottom", away)):
+			for _ in range(rng.randint(3, 6)):
+				order[side] += 1
+				pa_list.append({
+					"batter": {"name": f"{pitching}-{side}-{(order[side] - 1) % 9 + 1}"},
+					"pitcher": {"name": f"{pitching}-SP" if inning <= 5 else f"{pitching}-RP{inning}"},
+					"PA_order": (order[side] - 1) % 9 + 1,
+					"PA_round": (order[side] - 1) // 9 + 1,
+					"RE24": round(rng.uniform(-0.8, 1.5), 3),
+				})
+	home_runs = rng.randint(0, 10)
+	away_runs = rng.randint(0, 10)
+	if (home_runs > away_runs):
+		winner = "HOME"
+	elif (home_runs < away_runs):
+		winner = "AWAY"
+	else:
+		winner = "TIE"
+	return {
+		"id": f"{day.isoformat()}-{no}",
+		"home": {"abbr": home, "runs": home_runs},
+		"away": {"abbr": away, "runs": away_runs},
+		"info": {"status": "FINISHED", "winner_side": winner, "started_at": f"{day.isoformat()} 18:35:00"},
+		"PA_list": pa_list,
+	}
+
+def make_week(week_start: datetime.date) -> dict:
+	rng = random.Random(week_start.toordinal())
+	games = []
+	for offset in range(1, 7):
+		day = week_start + datetime.timedelta(days=offset)
+		for no in range(3):
+			games.append(make_game(day, no, rng))
+	# API 是新的比賽排前面
+	games.reverse()
+	return {"data": games}
+
+class FakeRebas():
+
+	def __init__(self, latency: float = 0.1):
+		self.latency = latency
+		self.requests = 0
+		fake = self
+
+		class Handler(BaseHTTPRequestHandler):
+			def do_GET(self):
+				fake.requests += 1
+				time.sleep(fake.latency)
+				query = parse_qs(urlparse(self.path).query)
+				start = datetime.date.fromisoformat(query["start"][0])
+				body = json.dumps(make_week(start), ensure_ascii=False).encode("utf-8")
+				self.send_response(200)
+				self.send_header("Content-Type", "application/json")
+				self.send_header("Content-Length", str(len(body)))
+				self.end_headers()
+				self.wfile.write(body)
+
+			def log_message(self, *args):
+				pass
+
+		self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+		self.root = f"http://127.0.0.1:{self.server.server_address[1]}"
+		self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+	def __enter__(self):
+		self._thread.start()
+		return self
+
+	def __exit__(self, *args):
+		self.server.shutdown()
+		self.server.server_close()
@@ -0,0 +1,41 @@
+# 半季打包成一個檔案 (週的 json + datas/ 的表格)，帶去沒網路的地方跑
+# python bundle_main.py export                -> package/cpbl_batch.py SEASONS 裡全部，寫到 outputs/bundles/{半季}.cpblz
+# python bundle_main.py export 2025年上 2024年下 -> 只打包這幾個 (那段日期要先爬過一次)
+# python bundle_main.py info outputs/bundles/2025年上.cpblz
+# 拿來跑: bundle = SeasonBundle(path); bundle.attach(); GetData(..., cache=bundle.cache())
+import os
+import sys
+from package.cpbl_batch import DEFAULT_OUT_DIR, SEASONS
+from package.cpbl_bundle import SeasonBundle, export_bundle
+
+BUNDLE_DIR = os.path.join(DEFAULT_OUT_DIR, "bundles")
+
+def export(labels: list):
+	for label in labels if labels else SEASONS.keys():
+		if (label not in SEASONS):
+			print(f"Unknown season {label}, known: {list(SEASONS.keys())}")
+			continue
+		season = SEASONS[label]
+		path = os.path.join(BUNDLE_DIR, f"{label}.cpblz")
+		weeks, pages = export_bundle(path, season.start, season.end)
+		print(f"{label}: {weeks} weeks, {pages} pages, {os.path.getsize(path) / 1e6:.1f} MB -> {path}")
+
+def info(path: str):
+	with SeasonBundle(path) as bundle:
+		meta = bundle.meta
+		print(f"{path}: {bundle.codec}, {meta.get('start')} ~ {meta.get('end')}, created {meta.get('created')}")
+		print(f"calendar knows {len(bundle.calendar_entries())} weeks")
+		weeks = bundle.weeks()
+		if (len(weeks) > 0):
+			print(f"{len(weeks)} weeks: {weeks[0][1]} ~ {weeks[-1][1]}")
+		for name in bundle.table_names():
+			print(f"table {name}")
+
+# 解析頁面會開 process (Windows 子 process 會重新 import 這支)
+if __name__ == "__main__":
+	if (len(sys.argv) >= 2 and sys.argv[1] == "export"):
+		export(sys.argv[2:])
+	elif (len(sys.argv) == 3 and sys.argv[1] == "info"):
+		info(sys.argv[2])
+	else:
+		print("python bundle_main.py export [半季 ...] | info 檔案")
@@ -2,44 +2,65 @@
 import pandas as pd
 from package.cpbl_data_get import GetData
 from package.cpbl_era import GetERA
+from package.cpbl_league import load_pages
+from package.cpbl_names import page_index
 
-database = GetData("rebras", (2025, 3, 24), (2025, 6, 30))
-erabase = GetERA(database.data)
-(guardians, opponents) = erabase.find_sp(300)
+# 名字在頁面上對不準 (好幾個可能) 或根本沒有的話，era_datas 裡就沒有這個人，印出來跳過
+def add_counts(era_datas: dict, counts: dict, paths: list):
+	for name, count in counts.items():
+		try:
+			era_datas[name]["出賽場數"] = count
+		except KeyError:
+			candidates = []
+			for path in paths:
+				index = page_index(path)
+				if (index is not None):
+					candidates.extend(index.resolve([name])[1].get(name, []))
+			if (len(candidates) > 0):
+				print(f"跳過 {name}：對不準，可能是 {candidates}")
+			else:
+				print(f"跳過 {name}：頁面上找不到")
 
-file_path = []
-for team in ["brothers", "hawks", "monkeys", "lions", "dragons"]:
-	file_path.append(f"C:/Users/aaron/Desktop/Python/大學中文/datas/2025/{team}.txt")
+# 底下會開 process 平行解析頁面，Windows 上一定要有這行，不然子 process 會把整支重跑一次
+if __name__ == "__main__":
+	database = GetData("rebras", (2025, 3, 24), (2025, 6, 30))
+	erabase = GetERA({})
+	# 一週抓到就先算，算滿 300 場就不用再抓了
+	(guardians, opponents) = erabase.find_sp(300, database.iter_weeks())
 
-guardians_path = "C:/Users/aaron/Desktop/Python/大學中文/datas/2025/guardians.txt"
-era_datas_guardians = erabase.get_pitching_stats_from_local_file(guardians_path, list(guardians.keys()))
-era_datas_opponents = {}
+	file_path = []
+	for team in ["brothers", "hawks", "monkeys", "lions", "dragons"]:
+		file_path.append(f"C:/Users/aaron/Desktop/Python/大學中文/datas/2025/{team}.txt")
 
-for path in file_path:
-	temp = erabase.get_pitching_stats_from_local_file(path, list(opponents.keys()))
-	# print(temp)
-	era_datas_opponents.update(temp)
+	guardians_path = "C:/Users/aaron/Desktop/Python/大學中文/datas/2025/guardians.txt"
+	# 六隊的頁面先一起解析 (頁面不多，load_pages 預設不開 pool)，底下一頁一頁查的時候就都是快取了
+	load_pages([guardians_path] + file_path)
+	era_datas_guardians = erabase.get_pitching_stats_from_local_file(guardians_path, list(guardians.keys()))
+	era_datas_opponents = {}
 
-# print(guardians.keys())
-# print(opponents.keys())
-# print(era_datas_guardians)
-# print(era_datas_opponents)
+	for path in file_path:
+		temp = erabase.get_pitching_stats_from_local_file(path, list(opponents.keys()))
+		# print(temp)
+		era_datas_opponents.update(temp)
 
-for name in guardians.keys():
-	era_datas_guardians[name]["出賽場數"] = guardians[name]
-for name in opponents.keys():
-	era_datas_opponents[name]["出賽場數"] = opponents[name]
+	# print(guardians.keys())
+	# print(opponents.keys())
+	# print(era_datas_guardians)
+	# print(era_datas_opponents)
 
-g_table = pd.DataFrame.from_dict(era_datas_guardians, orient='index')
-g_table.index.name = "投手名稱"
-o_table = pd.DataFrame.from_dict(era_datas_opponents, orient='index')
-o_table.index.name = "投手名稱"
+	add_counts(era_datas_guardians, guardians, [guardians_path])
+	add_counts(era_datas_opponents, opponents, file_path)
 
-g_table.to_csv("2025-top-guardians.csv", encoding='utf-8-sig')
-o_table.to_csv("2025-top-opponents.csv", encoding='utf-8-sig')
+	g_table = pd.DataFrame.from_dict(era_datas_guardians, orient='index')
+	g_table.index.name = "投手名稱"
+	o_table = pd.DataFrame.from_dict(era_datas_opponents, orient='index')
+	o_table.index.name = "投手名稱"
 
-print(g_table)
-print(o_table)
+	g_table.to_csv("2025-top-guardians.csv", encoding='utf-8-sig')
+	o_table.to_csv("2025-top-opponents.csv", encoding='utf-8-sig')
+
+	print(g_table)
+	print(o_table)
 
 """
 2025 上
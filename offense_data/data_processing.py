@@ -1,5 +1,6 @@
+# 要在 repo 根目錄用 python -m offense_data.data_processing 跑
 import pandas as pd
-from offense import GetPAStats
+from offense_data.offense import GetPAStats
 
 def main():
     # 1. 設定日期參數
@@ -1,26 +1,18 @@
-import requests as rq
+# 要在 repo 根目錄用 python -m offense_data.offense 跑，才找得到 package/
 import datetime
 import math
 import os
-from bs4 import BeautifulSoup
+from package.cpbl_cache import WeekCache
+from package.cpbl_calendar import GameWindow, WeekCalendar
+from package.cpbl_fetch import CrawlCheckpoint, WeekCrawler
+from package.cpbl_client import RebasClient
+from package.cpbl_tables import load_page
 from collections import defaultdict
 
 end_D = (2025, 7, 3)
 
-class GetPAStats:
-    # 模擬瀏覽器的 Header
-    header = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36",
-        "Accept": "application/json, text/plain, */*"
-    }
-
-    # 年份對應的 URL 後綴
-    suffix = {
-        2018: "Fq", 2019: "Sf", 2020: "KS", 2021: "fi", 
-        2022: "dG", 2023: "sk", 2024: "xa", 2025: "JO"
-    }
-
-    def __init__(self, start_date: tuple, end_date: tuple, really_start_date = None):
+class GetPAStats(WeekCrawler):
+    def __init__(self, start_date: tuple, end_date: tuple, really_start_date = None, cache: WeekCache = None, max_workers: int = 1, client: RebasClient = None, calendar: WeekCalendar = None, checkpoint: CrawlCheckpoint = None):
         if (really_start_date is None):
             self._really_start_date = datetime.date(*start_date)
         else:
@@ -29,34 +21,12 @@ class GetPAStats:
         # 將 tuple (2025, 3, 24) 轉為 datetime 物件方便計算
         self._start_date = datetime.date(*start_date)
         self._end_date = datetime.date(*end_date)
-        self._current_date = self._start_date
-        self._url = None
         
         # 統計數據容器
         self._games_count = 0
         self.player_data = self.player_data = defaultdict(lambda: defaultdict(int))
-
-    def _url_get(self):
-        """
-        產生 Rebas API 的 URL
-        """
-        y, m, d = self._current_date.year, self._current_date.month, self._current_date.day
-        su = self.suffix.get(y, "JO") 
-        # 保持你原本的 URL 格式
-        self._url = f"https://www.rebas.tw/api/seasons/CPBL-{y}-{su}/games?start={y}-{m:02d}-{d:02d}"
-
-    def raw_content_by_get(self, url: str): 
-        """
-        爬蟲核心：發送 GET 請求並回傳 JSON
-        """
-        try:
-            s = rq.Session()
-            response = s.get(url, headers=self.header)
-            response.raise_for_status() # 檢查 HTTP 錯誤
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching data from {url}: {e}")
-            return None
+        # 快取、連線池、週曆、checkpoint、self.missing 都是 WeekCrawler 在管
+        self.init_crawler(cache, max_workers, client, calendar, checkpoint)
 
     def end_season_PAs(self, game_list: list):
         """
@@ -108,11 +78,10 @@ class GetPAStats:
 
             print(f"正在讀取並解析：{file_path} ...")
             
-            with open(file_path, "r", encoding="utf-8") as f:
-                html_content = f.read()
-
-            soup = BeautifulSoup(html_content, "html.parser")
-            tables = soup.find_all("table")
+            # 整頁的表格 (cells 已經轉好型別)，同一頁只會真的解析一次
+            tables = load_page(file_path)
+            if tables is None:
+                return
 
             # 定義我們要抓取的欄位名稱 (HTML header文字) 對應到 (player_data 的 key)
             # 注意：OPS+ 和 tOPS+ 在 HTML 中可能帶有特殊符號，這裡做精確匹配
@@ -125,65 +94,30 @@ class GetPAStats:
                 "P/PA": "P/PA"
             }
 
-            # 遍歷 HTML 中所有的表格 (因為數據分散在不同表格)
+            # 遍歷所有的表格 (因為數據分散在不同表格)
             for table in tables:
-                # 1. 解析表頭 (Header) 以確認此表格包含哪些目標數據
-                thead = table.find("thead")
-                if not thead:
-                    continue
-                
-                headers = [th.get_text(strip=True).replace("<span></span>", "") for th in thead.find_all("th")]
-                
-                # 找出這個表格裡有哪些是我們要的欄位，並記錄 Index
+                # 1. 表頭跟以前一樣先清掉 <span></span>，再找出這個表格裡有哪些是我們要的欄位
                 # 格式: { index: "儲存用的Key" }，例如 { 3: "AVG", 9: "OPS_plus" }
-                col_indices = {}
-                for idx, h_text in enumerate(headers):
-                    if h_text in target_columns:
-                        col_indices[idx] = target_columns[h_text]
+                headers = [h.replace("<span></span>", "") for h in table.headers]
+                col_indices = {idx: target_columns[h] for idx, h in enumerate(headers) if h in target_columns}
 
                 # 如果這個表格完全沒有我們要的數據，就跳過
                 if not col_indices:
                     continue
 
-                # 2. 解析內容 (Body)
-                tbody = table.find("tbody")
-                if not tbody:
-                    continue
-
-                rows = tbody.find_all("tr")
-                for row in rows:
-                    cols = row.find_all("td")
-                    if not cols:
+                # 2. 跟以前一樣：列裡要有 button (球員名字)，"球隊平均" 這種無效行不要
+                for row in table.rows:
+                    if row.button is None or "平均" in row.button:
                         continue
 
-                    # 抓取球員名字 (通常在第一個按鈕內)
-                    # 結構通常是 td -> button -> text
-                    try:
-                        name_btn = row.find("button")
-                        if not name_btn:
-                            continue
-                        player_name = name_btn.get_text(strip=True)
-                        
-                        # 排除 "球隊平均" 這種無效行
-                        if "平均" in player_name:
-                            continue
-
-                        # 抓取對應欄位的數值
-                        for idx, key in col_indices.items():
-                            if idx < len(cols):
-                                val_str = cols[idx].get_text(strip=True)
-                                
-                                # 嘗試轉為 float，若失敗(例如 NaN 或 -)則保持原樣或設為 0
-                                try:
-                                    val = float(val_str)
-                                except ValueError:
-                                    val = 0.0
-                                
-                                self.player_data[player_name][key] = val
-                                
-                    except Exception as e:
-                        # 避免單一行解析失敗導致整個程式崩潰
-                        continue
+                    # 這列格子不夠的欄位就不記
+                    for idx, key in col_indices.items():
+                        if idx < len(row.cells):
+                            val = row.cells[idx]
+                            # 數字已經是 float 了，轉不了的 (例如 -) 就設為 0
+                            if not isinstance(val, float):
+                                val = 0.0
+                            self.player_data[row.button][key] = val
 
     def process_and_filter_stats(self):
             # 1. 篩選：找出不是富邦的球員 (沒有抓到 AVG 的)
@@ -260,18 +194,15 @@ class GetPAStats:
         """
         print(f"Start analyze from {self._start_date} to {self._end_date}")
         
-        # 當前日期小於結束日期時，持續迴圈
-        while self._current_date < self._end_date:
-            self._url_get()
-            # print(f"Fetching: {self._url}") # Debug 用
-            
-            json_data = self.raw_content_by_get(self._url)
-            
-            if json_data and "data" in json_data:
-                self.end_season_PAs(json_data["data"])
-            
-            # 前進一週 (配合 Rebas API 的特性)
-            self._current_date += datetime.timedelta(days=7)
+        # 週曆會對齊週一、跳過已經知道沒比賽的週，開始日不用剛好是週一
+        # 照日期順序回傳，所以處理順序跟以前一樣
+        # 抓不到的週不會再默默不見，會記在 self.missing 而且最後印出來
+        window = GameWindow(self._start_date, self._end_date)
+        for (week, _), json_data in self.crawl(self._start_date, self._end_date):
+            if json_data is not None:
+                self.calendar.record(week, json_data)
+                # 範圍外跟重複的比賽不算
+                self.end_season_PAs(window.take(json_data["data"]))
         
         print(f"Finished analyze from rebras web")
         self.parse_local_html()
@@ -0,0 +1,163 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from .cpbl_cache import WeekCache, as_date
+from .cpbl_calendar import WeekCalendar, shared_calendar
+from .cpbl_era import GetERA
+from .cpbl_fetch import CrawlCheckpoint
+from .cpbl_league import DEFAULT_DATA_DIR, load_pages
+from .cpbl_pipeline import Pipeline
+from .cpbl_standings import LeagueStats
+from .cpbl_teams import TEAM_MAP
+
+"""
+好幾個半季一次跑完，一個半季一個 process
+以前要換季就得去改 era_main.py / offense.py / merged.py 底下的日期再跑一次，
+現在把日期表寫在 SEASONS，run_seasons() 一次丟進 process pool
+每個半季: 爬那段日期 (WeekCache 是磁碟快取，大家共用，有 checkpoint 可以接著跑) -> LeagueStats -> 寫檔
+	{out_dir}/{半季}/league.json        : LeagueStats 的狀態，之後可以 load / refresh
+	{out_dir}/{半季}/standings.csv      : 六隊戰績
+	{out_dir}/{半季}/{隊}_sp.csv        : 先發投手 ERA+ / tERA+ / 總出賽 / 季末出賽 (merged.py 那份)
+	{out_dir}/{半季}/batters.csv        : 六隊打者 全季 / 季末 的 PA 跟 RE24/PA (offense.py 那份)
+投手頁 (datas/{年}/{隊}.txt) 會先在這個 process 一起解析完存進磁碟快取，子 process 直接讀
+週曆 (calendar.json) 子 process 只記不存，全部跑完由這個 process 合在一起存一次
+
+注意 Windows 開 process 會重新 import 主程式，呼叫的腳本要有 if __name__ == "__main__"
+"""
+
+DEFAULT_OUT_DIR = os.path.join(os.path.dirname(DEFAULT_DATA_DIR), "outputs")
+
+"""
+一個半季
+	start / end : start <= 日期 < end (結束那天不算，所以表上寫到禮拜天的這裡是隔天)
+	late_start  : 這天以後算季末 (GetPAStats 的 really_start_date)
+	late_games  : 最後幾場算季末 (merged.py 的 LATE_N)，先發投手的季末出賽用這個
+late_start / late_games 給一個就好，都沒給就沒有季末
+"""
+Season = namedtuple("Season", ["start", "end", "late_start", "late_games"], defaults=(None, None))
+
+"""
+{半季: Season}，就是 era_main.py / offense.py 最下面那張表
+上半季的結束就是下半季的開始，同一天的比賽只會算在一邊 (表上 2024 上寫到 0703，跟下半季的 0701 重疊，這裡切在 0701)
+"""
+SEASONS = {
+	"2025年上": Season((2025, 3, 24), (2025, 6, 30), late_start=(2025, 6, 8)),
+	"2025年下": Season((2025, 6, 30), (2025, 10, 13), late_start=(2025, 9, 26)),
+	"2024年上": Season((2024, 4, 1), (2024, 7, 1), late_start=(2024, 6, 23)),
+	"2024年下": Season((2024, 7, 1), (2024, 10, 28), late_games=19)
+}
+
+def pitching_page(year: int, team_code: str, data_dir: str = None) -> str:
+	data_dir = data_dir if data_dir is not None else DEFAULT_DATA_DIR
+	return os.path.join(data_dir, str(year), f"{team_code}.txt")
+
+# 季末那段先發: 最後 late_games 場，或是 late_start 那天以後
+def _late_starts(league: LeagueStats, team: str, season: Season) -> dict:
+	if (season.late_games is not None):
+		return league.starting_pitchers(team, last=season.late_games)[0]
+	if (season.late_start is None):
+		return {}
+	return league.starting_pitchers(team, start=season.late_start)[0]
+
+def _sp_table(league: LeagueStats, team: str, season: Season, page: str) -> pd.DataFrame:
+	starts = league.starting_pitchers(team)[0]
+	if (len(starts) == 0):
+		return None
+	late_starts = _late_starts(league, team, season)
+	era_data = GetERA({}).get_pitching_stats_from_local_file(page, list(starts.keys()))
+	rows = []
+	for name, count in starts.items():
+		era = era_data.get(name, {})
+		rows.append({
+			"投手名稱": name,
+			"ERA+": era.get("ERA+", 0.0),
+			"tERA+": era.get("tERA+", 0.0),
+			"總出賽數": count,
+			"季末出賽": late_starts.get(name, 0)
+		})
+	return pd.DataFrame(rows).set_index("投手名稱")
+
+def _batter_table(league: LeagueStats) -> pd.DataFrame:
+	rows = []
+	for team in league.teams():
+		for name, stats in league.batter_re24(team).items():
+			f_pa = stats["full_season_PA_count"]
+			e_pa = stats["end_season_PA_count"]
+			rows.append({
+				"Name": name,
+				"team": team,
+				"Full_PA": f_pa,
+				"End_PA": e_pa,
+				"Full_RE24/PA": stats["full_season_RE24_total"] / f_pa if f_pa > 0 else 0.0,
+				"End_RE24/PA": stats["end_season_RE24_total"] / e_pa if e_pa > 0 else 0.0
+			})
+	if (len(rows) == 0):
+		return pd.DataFrame(columns=["Name", "team", "Full_PA", "End_PA", "Full_RE24/PA", "End_RE24/PA"]).set_index("Name")
+	return pd.DataFrame(rows).set_index("Name")
+
+"""
+一個半季 (在子 process 裡跑)，job = (半季, Season, data_dir, out_dir, cache_dir)
+回傳 (半季, 收了幾場, 缺了哪幾週, 週曆記到的 {週一: [...]})
+"""
+def run_season(job: tuple) -> tuple:
+	label, season, data_dir, out_dir, cache_dir = job
+	start, end = season.start, season.end
+	league = LeagueStats(start, end, season.late_start)
+	# 中途斷掉的話，下次跑同一個半季只會抓還沒抓到的週
+	checkpoint = CrawlCheckpoint.of(cache_dir, f"batch-{label}")
+	# 別的半季同時也在記週曆，這裡不存檔，交給 run_seasons
+	calendar = WeekCalendar(cache_dir, autosave=False)
+	pipe = Pipeline(start, end, cache=WeekCache(cache_dir), calendar=calendar, checkpoint=checkpoint)
+	pipe.register(league)
+	pipe.run()
+
+	season_dir = os.path.join(out_dir, label)
+	os.makedirs(season_dir, exist_ok=True)
+	league.save(os.path.join(season_dir, "league.json"))
+	league.table().to_csv(os.path.join(season_dir, "standings.csv"), encoding="utf-8-sig")
+	year = as_date(start).year
+	for team, team_code in TEAM_MAP.items():
+		table = _sp_table(league, team, season, pitching_page(year, team_code, data_dir))
+		if (table is not None):
+			table.to_csv(os.path.join(season_dir, f"{team_code}_sp.csv"), encoding="utf-8-sig")
+	_batter_table(league).to_csv(os.path.join(season_dir, "batters.csv"), encoding="utf-8-sig")
+	return (label, len(league.seen), list(pipe.missing), calendar.known)
+
+"""
+seasons 是 SEASONS 那種 {半季: Season} dict，或是 SEASONS 裡的名字 (list)，None 就是全部
+max_workers 預設是 CPU 數，1 就是全部在這個 process 一個一個跑
+回傳 {半季: (收了幾場, 缺了哪幾週)}
+"""
+def run_seasons(seasons = None, out_dir: str = None, data_dir: str = None,
+				cache: WeekCache = None, max_workers: int = None) -> dict:
+	if (seasons is None):
+		seasons = SEASONS
+	elif (not isinstance(seasons, dict)):
+		unknown = [label for label in seasons if label not in SEASONS]
+		if (len(unknown) > 0):
+			raise ValueError(f"Unknown seasons {unknown}, known: {list(SEASONS.keys())}")
+		seasons = {label: SEASONS[label] for label in seasons}
+	out_dir = out_dir if out_dir is not None else DEFAULT_OUT_DIR
+	cache_dir = (cache if cache is not None else WeekCache()).cache_dir
+
+	# 上下半季用同一年的投手頁，先在這裡一起解析完，子 process 就只是讀磁碟快取
+	years = sorted({as_date(season.start).year for season in seasons.values()})
+	load_pages([pitching_page(year, team_code, data_dir) for year in years for team_code in TEAM_MAP.values()], max_workers)
+
+	jobs = [(label, season, data_dir, out_dir, cache_dir) for label, season in seasons.items()]
+	workers = min(len(jobs), max_workers if max_workers is not None else (os.cpu_count() or 1))
+	if (workers <= 1):
+		results = [run_season(job) for job in jobs]
+	else:
+		with ProcessPoolExecutor(max_workers=workers) as pool:
+			results = list(pool.map(run_season, jobs))
+
+	calendar = shared_calendar(cache_dir)
+	report = {}
+	for label, games, missing, known in results:
+		calendar.seed(known)
+		report[label] = (games, missing)
+		print(f"{label}: {games} games, {len(missing)} weeks missing -> {os.path.join(out_dir, label)}")
+	calendar.save()
+	return report
@@ -0,0 +1,338 @@
+import datetime
+import json
+import lzma
+import os
+import struct
+import threading
+import zlib
+from .errors import CrawlerError
+from .cpbl_cache import WeekCache, as_date
+from .cpbl_calendar import WeekCalendar, shared_calendar, week_starts
+from .cpbl_client import SEASON_SUFFIX
+from .cpbl_decode import loads
+from .cpbl_league import DEFAULT_DATA_DIR, load_pages, season_pages
+from .cpbl_tables import TableCache, tables_from_json, tables_to_json, shared_cache
+
+"""
+一段日期 (通常是半季) 打包成一個檔案，沒網路的筆電也能跑
+裡面有:
+	week/{後綴}/{週一}      : WeekCache 裡那週的原始 json (跟 API 給的一樣)
+	table/{相對 datas 的路徑} : FirstBase 存下來的頁面解析完的表格 (TableCache 那份，已經轉好型別)
+每一項各自壓縮，檔尾有一份索引 (名字 -> 位置、長度)，只讀一週或一頁就只會解壓那一塊
+索引裡也帶著那段日期的週曆 (WeekCalendar 知道的週，包括沒比賽的)，換一台電腦也知道哪幾週本來就不用抓
+
+	export_bundle(path, start, end)     : 從本機的 WeekCache + datas/ 打包 (要先爬過一次)
+	bundle = SeasonBundle(path)
+	GetData(..., cache=bundle.cache())  : 任何爬蟲 (GetData / GetWR / Pipeline / GetPAStats / ...) 都吃 cache=，
+	                                      換成 bundle 的就只讀 bundle，不會上網，bundle 裡沒有的週就當抓不到
+	                                      (bundle.cache() 會順便把 bundle 的週曆補進本機的週曆，見 BundleCache.install)
+	bundle.attach()                     : datas/ 底下找不到的頁面改從 bundle 拿 (load_frames / page_index 都吃得到)
+	bundle.import_weeks()               : 把週解回本機的 WeekCache
+
+有裝 zstandard 就用 zstd 壓，沒有的話用內建的 zlib (lzma 比較小但比較慢，要的話 codec="lzma")
+用什麼壓的寫在檔頭，讀的時候沒裝那個套件會丟 ImportError
+"""
+
+try:
+	import zstandard
+except ImportError:
+	zstandard = None
+
+MAGIC = b"CPBLBDL1"
+# 檔頭: MAGIC + 壓縮方式 (8 bytes，補 \0)
+HEADER = struct.Struct("<8s8s")
+# 檔尾: 索引的位置 + 長度 + MAGIC
+FOOTER = struct.Struct("<QQ8s")
+
+ZSTD_LEVEL = 10
+
+def _zstd_compress(data: bytes) -> bytes:
+	return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+def _zstd_decompress(data: bytes) -> bytes:
+	return zstandard.ZstdDecompressor().decompress(data)
+
+# 快的排前面
+CODECS = {
+	"zstd": (lambda: zstandard is not None, _zstd_compress, _zstd_decompress),
+	"zlib": (lambda: True, lambda data: zlib.compress(data, 9), zlib.decompress),
+	"lzma": (lambda: True, lzma.compress, lzma.decompress)
+}
+
+def available_codecs() -> list:
+	return [name for name, (ok, _, _) in CODECS.items() if ok()]
+
+def _codec(name: str) -> tuple:
+	if (name not in CODECS):
+		raise ValueError(f"Unknown codec {name}, known: {list(CODECS.keys())}")
+	ok, compress, decompress = CODECS[name]
+	if (not ok()):
+		raise ImportError(f"Codec {name} is not installed")
+	return (compress, decompress)
+
+def week_key(su: str, week_start) -> str:
+	return f"week/{su}/{as_date(week_start).isoformat()}"
+
+def table_key(name: str) -> str:
+	return f"table/{name}"
+
+# 頁面在 bundle 裡的名字: 相對 data_dir 的路徑，一律用 /，不在 data_dir 底下就 None
+def page_name(file_path: str, data_dir: str = None):
+	data_dir = data_dir if data_dir is not None else DEFAULT_DATA_DIR
+	try:
+		rel = os.path.relpath(os.path.abspath(file_path), os.path.abspath(data_dir))
+	except ValueError:
+		# Windows 不同磁碟機
+		return None
+	if (rel == ".." or rel.startswith(".." + os.sep)):
+		return None
+	return rel.replace(os.sep, "/")
+
+class BundleWriter():
+
+	def __init__(self, path: str, codec: str = None):
+		self.path = path
+		self.codec = codec if codec is not None else available_codecs()[0]
+		self._compress, _ = _codec(self.codec)
+		self.entries = {}
+		self.meta = {}
+		# 先寫暫存檔，close() 才換過去，中途壞掉不會留下半個 bundle
+		self._tmp = f"{path}.{os.getpid()}.tmp"
+		dirname = os.path.dirname(path)
+		if (dirname):
+			os.makedirs(dirname, exist_ok=True)
+		self._f = open(self._tmp, "wb")
+		self._f.write(HEADER.pack(MAGIC, self.codec.encode("ascii")))
+
+	def add(self, key: str, data: bytes):
+		if (key in self.entries):
+			raise ValueError(f"Duplicate bundle entry {key}")
+		block = self._compress(data)
+		self.entries[key] = [self._f.tell(), len(block), len(data)]
+		self._f.write(block)
+
+	def close(self):
+		index = json.dumps({"meta": self.meta, "entries": self.entries}, ensure_ascii=False).encode("utf-8")
+		block = self._compress(index)
+		offset = self._f.tell()
+		self._f.write(block)
+		self._f.write(FOOTER.pack(offset, len(block), MAGIC))
+		self._f.close()
+		os.replace(self._tmp, self.path)
+
+	def abort(self):
+		self._f.close()
+		os.remove(self._tmp)
+
+class SeasonBundle():
+
+	def __init__(self, path: str):
+		self.path = os.path.abspath(path)
+		self._f = open(self.path, "rb")
+		# fetch_weeks 會好幾個執行緒一起讀，seek + read 要包在一起
+		self._lock = threading.Lock()
+		try:
+			magic, codec = HEADER.unpack(self._f.read(HEADER.size))
+			self._f.seek(-FOOTER.size, os.SEEK_END)
+			offset, length, tail = FOOTER.unpack(self._f.read(FOOTER.size))
+		except (OSError, struct.error) as e:
+			self._f.close()
+			raise CrawlerError(f"Broken bundle {path}. {e}")
+		if (magic != MAGIC or tail != MAGIC):
+			self._f.close()
+			raise CrawlerError(f"Not a bundle: {path}")
+		self.codec = codec.rstrip(b"\0").decode("ascii")
+		_, self._decompress = _codec(self.codec)
+		index = json.loads(self._read_block(offset, length))
+		self.meta = index["meta"]
+		self.entries = index["entries"]
+
+	def _read_block(self, offset: int, length: int) -> bytes:
+		with self._lock:
+			self._f.seek(offset)
+			block = self._f.read(length)
+		return self._decompress(block)
+
+	def close(self):
+		self._f.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+	def __contains__(self, key: str) -> bool:
+		return key in self.entries
+
+	# 一項解壓出來的 bytes，沒有就 None
+	def read(self, key: str):
+		entry = self.entries.get(key)
+		if (entry is None):
+			return None
+		return self._read_block(entry[0], entry[1])
+
+	# [(後綴, 週一), ...] 照日期排
+	def weeks(self) -> list:
+		result = []
+		for key in self.entries:
+			if (key.startswith("week/")):
+				_, su, day = key.split("/")
+				result.append((su, datetime.date.fromisoformat(day)))
+		return sorted(result, key=lambda it: it[1])
+
+	def week_bytes(self, su: str, week_start):
+		return self.read(week_key(su, week_start))
+
+	def week(self, su: str, week_start):
+		payload = self.week_bytes(su, week_start)
+		return json.loads(payload) if payload is not None else None
+
+	def table_names(self) -> list:
+		return sorted(key[len("table/"):] for key in self.entries if key.startswith("table/"))
+
+	def has_table(self, name: str) -> bool:
+		return table_key(name) in self.entries
+
+	# 那一頁的 list[HtmlTable] (跟 TableCache.load 一樣)，沒有就 None
+	def tables(self, name: str):
+		data = self.read(table_key(name))
+		return tables_from_json(json.loads(data)) if data is not None else None
+
+	# 打包時的週曆 {週一 iso: [場數, 第一場, 最後一場]}
+	def calendar_entries(self) -> dict:
+		return self.meta.get("calendar", {})
+
+	# 給爬蟲用的 cache，bundle 帶來的週曆會先補進 calendar (沒給就是本機 cache_dir 那份共用的)
+	def cache(self, cache_dir: str = None, calendar: WeekCalendar = None) -> "BundleCache":
+		return BundleCache(self, cache_dir).install(calendar)
+
+	"""
+	data_dir 底下找不到檔案的頁面改從 bundle 拿，tables 預設是大家共用的那個 TableCache
+	磁碟上有檔案的話還是用檔案 (比較新)
+	"""
+	def attach(self, data_dir: str = None, tables: TableCache = None):
+		tables = tables if tables is not None else shared_cache()
+		tables.add_source(data_dir if data_dir is not None else DEFAULT_DATA_DIR, self)
+
+	# 把週解回本機的 WeekCache (已經有定案資料的週不動)，回傳寫了幾週
+	def import_weeks(self, cache: WeekCache = None) -> int:
+		cache = cache if cache is not None else WeekCache()
+		calendar = shared_calendar(cache.cache_dir)
+		calendar.seed(self.calendar_entries())
+		calendar.save()
+		count = 0
+		for su, day in self.weeks():
+			if (WeekCache.is_final(cache.load(su, day), day)):
+				continue
+			cache.save_bytes(su, day, self.week_bytes(su, day))
+			count += 1
+		return count
+
+"""
+WeekCache 的樣子，但只讀 bundle，getter 永遠不會被叫 (不會上網)
+bundle 裡沒有的週回傳 None，爬蟲那邊就當作抓不到 (會記在 missing)
+建構的時候不碰任何週曆，要 install() (bundle.cache() 會幫你叫) 才會把 bundle 的週曆補進去，
+沒比賽的週爬蟲就不會來要
+"""
+class BundleCache(WeekCache):
+
+	def __init__(self, bundle: SeasonBundle, cache_dir: str = None):
+		super().__init__(cache_dir)
+		self.bundle = bundle
+
+	# bundle 的週曆補進 calendar (沒給就是 shared_calendar(cache_dir)，爬蟲沒給 calendar= 用的就是那份)，回傳自己
+	def install(self, calendar: WeekCalendar = None) -> "BundleCache":
+		calendar = calendar if calendar is not None else shared_calendar(self.cache_dir)
+		calendar.seed(self.bundle.calendar_entries())
+		return self
+
+	def load_bytes(self, su: str, week_start):
+		return self.bundle.week_bytes(su, week_start)
+
+	def load(self, su: str, week_start):
+		payload = self.load_bytes(su, week_start)
+		if (payload is None):
+			return None
+		try:
+			return loads(payload)
+		except CrawlerError as e:
+			print(f"Broken week {as_date(week_start)} in bundle {self.bundle.path}, ignored. \n{e}")
+			return None
+
+	# 唯讀
+	def save(self, su: str, week_start, json_data: dict):
+		pass
+
+	def save_bytes(self, su: str, week_start, payload: bytes):
+		pass
+
+	def _count(self, found, week_start):
+		if (found is None):
+			self.misses += 1
+			print(f"Week {as_date(week_start)} is not in bundle {self.bundle.path}")
+		else:
+			self.hits += 1
+
+	def fetch(self, su: str, week_start, getter):
+		cached = self.load(su, week_start)
+		self._count(cached, week_start)
+		return cached
+
+"""
+start <= 日期 < end 的週 (本機 WeekCache 裡要有，沒有的印出來跳過) + 頁面表格打包成 path
+沒比賽的週有快取就照樣放，週曆知道的週 (包括沒比賽的) 一起寫進索引
+pages 是要放進去的頁面路徑，None 就是那幾年的六隊投手頁 + 打擊頁 (data_dir 底下找得到的)
+回傳 (放了幾週, 放了幾頁)
+"""
+def export_bundle(path: str, start, end, cache: WeekCache = None, data_dir: str = None,
+				pages: list = None, codec: str = None, tables: TableCache = None) -> tuple:
+	cache = cache if cache is not None else WeekCache()
+	data_dir = data_dir if data_dir is not None else DEFAULT_DATA_DIR
+	tables = tables if tables is not None else shared_cache()
+	calendar = shared_calendar(cache.cache_dir)
+	if (pages is None):
+		pages = []
+		for year in range(as_date(start).year, as_date(end).year + 1):
+			pitching, offense = season_pages(year, data_dir)
+			pages += [page for page in list(pitching.values()) + list(offense.values()) if os.path.exists(page)]
+
+	writer = BundleWriter(path, codec)
+	try:
+		weeks = 0
+		known = {}
+		for day in week_starts(start, end):
+			if (day.isoformat() in calendar.known):
+				known[day.isoformat()] = calendar.known[day.isoformat()]
+			su = SEASON_SUFFIX[day.year]
+			payload = cache.load_bytes(su, day)
+			if (payload is None):
+				# 週曆已經知道這週沒比賽 (或比賽不在範圍內) 的話本來就不用抓
+				if (calendar.has_games(day, start, end)):
+					print(f"Week {day} is not cached, skipped (crawl it first)")
+				continue
+			writer.add(week_key(su, day), payload)
+			weeks += 1
+
+		# 還沒解析過的頁面先一起解析 (process pool)
+		load_pages(pages, cache=tables)
+		count = 0
+		for page in pages:
+			name = page_name(page, data_dir)
+			found = tables.load(page) if name is not None else None
+			if (found is None):
+				print(f"Page {page} is not under {data_dir} or can't be read, skipped")
+				continue
+			writer.add(table_key(name), json.dumps(tables_to_json(found), ensure_ascii=False).encode("utf-8"))
+			count += 1
+
+		writer.meta = {
+			"start": as_date(start).isoformat(), "end": as_date(end).isoformat(),
+			"created": datetime.datetime.now().isoformat(timespec="seconds"),
+			"calendar": known
+		}
+	except BaseException:
+		writer.abort()
+		raise
+	writer.close()
+	return (weeks, count)
@@ -0,0 +1,112 @@
+import datetime
+import json
+import os
+from .errors import CrawlerError
+from .cpbl_decode import loads
+
+"""
+Rebas 每週比賽 json 的本機快取
+key 是 (賽季後綴, 該週起始日)，一週存成一個檔案
+	{cache_dir}/CPBL-2025-JO/2025-04-21.json
+整週都 FINISHED 的就永遠用快取，還有沒打完的比賽才會重新抓
+"""
+
+DEFAULT_CACHE_DIR = os.environ.get(
+	"REBAS_CACHE_DIR",
+	os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".rebas_cache")
+)
+
+def as_date(day) -> datetime.date:
+	# 這個 repo 裡 tuple 跟 datetime.date 都有人用，統一轉成 date
+	if (isinstance(day, datetime.date)):
+		return day
+	return datetime.date(*day)
+
+class WeekCache():
+
+	def __init__(self, cache_dir: str = None):
+		self.cache_dir = cache_dir if cache_dir is not None else DEFAULT_CACHE_DIR
+		self.hits = 0
+		self.misses = 0
+
+	def path_of(self, su: str, week_start) -> str:
+		day = as_date(week_start)
+		return os.path.join(self.cache_dir, f"CPBL-{day.year}-{su}", f"{day.isoformat()}.json")
+
+	def load(self, su: str, week_start):
+		path = self.path_of(su, week_start)
+		if (not os.path.exists(path)):
+			return None
+		try:
+			with open(path, "rb") as f:
+				return loads(f.read())
+		except (OSError, CrawlerError) as e:
+			# 壞掉的快取就當作沒有，等等重抓蓋過去
+			print(f"Broken cache file {path}, ignored. \n{e}")
+			return None
+
+	def save(self, su: str, week_start, json_data: dict):
+		path = self.path_of(su, week_start)
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		# 先寫暫存檔再 replace，中途被砍掉也不會留下半個檔案
+		tmp = f"{path}.{os.getpid()}.tmp"
+		with open(tmp, "w", encoding="utf-8") as f:
+			json.dump(json_data, f, ensure_ascii=False)
+		os.replace(tmp, path)
+
+	"""
+	一週的資料是不是已經定案了
+	有比賽: 全部都要是 FINISHED
+	沒比賽: 那週要已經過完，不然可能只是賽程還沒出來
+	"""
+	@staticmethod
+	def is_final(json_data: dict, week_start, today: datetime.date = None) -> bool:
+		if (json_data is None or "data" not in json_data):
+			return False
+		games = json_data["data"]
+		if (len(games) == 0):
+			if (today is None):
+				today = datetime.date.today()
+			return as_date(week_start) + datetime.timedelta(days=7) <= today
+		for game in games:
+			if (game.get("info", {}).get("status") != "FINISHED"):
+				return False
+		return True
+
+	"""
+	主要的入口
+	getter 是沒有參數的 function，真的要上網時才會被叫，回傳 json 或 None
+	快取有定案的資料就直接回傳，不然就重抓再存起來
+	重抓失敗的話，至少把舊的快取丟回去
+	"""
+	def fetch(self, su: str, week_start, getter):
+		cached = self.load(su, week_start)
+		if (cached is not None and self.is_final(cached, week_start)):
+			self.hits += 1
+			return cached
+
+		self.misses += 1
+		fresh = getter()
+		if (fresh is None or "data" not in fresh):
+			if (cached is not None):
+				print(f"Fetch failed, using stale cache of week {as_date(week_start)}")
+			return cached
+		self.save(su, week_start, fresh)
+		return fresh
+
+	# 存在磁碟上的原始 bytes (不解開)，沒有就 None
+	def load_bytes(self, su: str, week_start):
+		path = self.path_of(su, week_start)
+		try:
+			with open(path, "rb") as f:
+				return f.read()
+		except FileNotFoundError:
+			return None
+
+	def save_bytes(self, su: str, week_start, payload: bytes):
+		path = self.path_of(su, week_start)
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		tmp = f"{path}.{os.getpid()}.tmp"
+		with open(tmp, "wb") as f:
+			f.write(payload)
+		os.replace(tmp, path)
@@ -0,0 +1,162 @@
+import datetime
+import json
+import os
+import threading
+from .cpbl_cache import DEFAULT_CACHE_DIR, WeekCache, as_date
+from .cpbl_models import game_id
+
+"""
+Rebas 的週曆
+API 的 ?start= 是以週一為一週的開頭，以前每支爬蟲都自己 +7 天 (而且 days_of_month 的閏年是看月份在算)，
+start / end 還規定一定要剛好是週一，不然就會抓到錯的週或是同一週抓兩次
+現在:
+	week_start(day)       : day 那週的週一
+	WeekCalendar.jobs()   : start <= 日期 < end 這段要抓哪幾週 (對齊週一)，已經知道沒比賽的週 (明星賽、季後) 直接跳過
+	GameWindow.take()     : 一週的比賽裡只留日期在範圍內、還沒看過 (看 id) 的
+每週抓到定案的資料 (WeekCache.is_final) 就記下那週有幾場、第一場跟最後一場是哪天，
+存在 {cache_dir}/calendar.json，一季只要完整爬過一次，之後任何日期區間都只會去抓有比賽的週
+好幾個 process 共用一個 cache_dir 的話，子 process 用 autosave=False 只記在記憶體，
+最後由主 process seed 進去再存一次 (各自存檔的話後存的會蓋掉別人記的週)
+"""
+
+def week_start(day) -> datetime.date:
+	day = as_date(day)
+	return day - datetime.timedelta(days=day.weekday())
+
+# 跟 start <= 日期 < end 有交集的每一週的週一
+def week_starts(start, end) -> list:
+	day = week_start(start)
+	end = as_date(end)
+	weeks = []
+	while (day < end):
+		weeks.append(day)
+		day += datetime.timedelta(days=7)
+	return weeks
+
+# 原始 json 或 cpbl_models.Game 都可以，沒有日期就 None
+def game_day(game):
+	if (isinstance(game, dict)):
+		started_at = game.get("info", {}).get("started_at") or ""
+		return datetime.date.fromisoformat(started_at.split()[0]) if started_at.strip() else None
+	return game.started_at
+
+def _game_key(game):
+	return game_id(game) if isinstance(game, dict) else game.id
+
+class WeekCalendar():
+
+	def __init__(self, cache_dir: str = None, autosave: bool = True):
+		self.cache_dir = cache_dir if cache_dir is not None else DEFAULT_CACHE_DIR
+		self.autosave = autosave
+		self.path = os.path.join(self.cache_dir, "calendar.json")
+		# {"2025-04-21": [場數, 第一場日期, 最後一場日期]}，沒比賽的週日期是 None
+		self.known = {}
+		self._lock = threading.Lock()
+		if (os.path.exists(self.path)):
+			try:
+				with open(self.path, "r", encoding="utf-8") as f:
+					self.known = json.load(f)
+			except (OSError, ValueError) as e:
+				print(f"Broken calendar file {self.path}, ignored. \n{e}")
+
+	"""
+	這週要不要抓
+	還不知道的週一律要抓；知道的話要有比賽，而且有比賽的那幾天要碰到 start <= 日期 < end
+	"""
+	def has_games(self, week, start = None, end = None) -> bool:
+		info = self.known.get(week_start(week).isoformat())
+		if (info is None):
+			return True
+		count, first, last = info
+		if (count == 0):
+			return False
+		if (start is not None and datetime.date.fromisoformat(last) < as_date(start)):
+			return False
+		if (end is not None and datetime.date.fromisoformat(first) >= as_date(end)):
+			return False
+		return True
+
+	# start <= 日期 < end 要抓的週 (週一的 tuple)，照日期順序
+	def weeks(self, start, end) -> list:
+		return [(day.year, day.month, day.day) for day in week_starts(start, end) if self.has_games(day, start, end)]
+
+	# [(週一, url), ...]，url_of(週一) 產生那週的 url，可以直接丟給 fetch_weeks
+	def jobs(self, start, end, url_of) -> list:
+		return [(now, url_of(now)) for now in self.weeks(start, end)]
+
+	"""
+	抓到一週就丟進來，定案的才會記 (還有比賽沒打完的週之後可能會變)
+	可以好幾個執行緒一起叫，autosave 的話有新的週就存檔
+	"""
+	def record(self, week, json_data: dict, today: datetime.date = None):
+		if (not WeekCache.is_final(json_data, week_start(week), today)):
+			return
+		days = [day for day in map(game_day, json_data["data"]) if day is not None]
+		info = [len(json_data["data"]), min(days).isoformat() if days else None, max(days).isoformat() if days else None]
+		key = week_start(week).isoformat()
+		with self._lock:
+			if (self.known.get(key) == info):
+				return
+			self.known[key] = info
+			if (self.autosave):
+				self.save()
+
+	"""
+	別的地方 (例如 cpbl_bundle 帶過來的) 已經知道的週，{週一 iso: [場數, 第一場, 最後一場]}
+	自己已經知道的週不動，只放在記憶體，下次 record 存檔的時候才會一起寫進去
+	"""
+	def seed(self, known: dict):
+		with self._lock:
+			for key, info in known.items():
+				self.known.setdefault(key, info)
+
+	def save(self):
+		os.makedirs(self.cache_dir, exist_ok=True)
+		tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+		with open(tmp, "w", encoding="utf-8") as f:
+			json.dump(dict(sorted(self.known.items())), f)
+		os.replace(tmp, self.path)
+
+_calendars = {}
+_calendars_lock = threading.Lock()
+
+# 同一個快取資料夾大家共用一份週曆
+def shared_calendar(cache_dir: str = None) -> WeekCalendar:
+	cache_dir = os.path.abspath(cache_dir if cache_dir is not None else DEFAULT_CACHE_DIR)
+	with _calendars_lock:
+		if (cache_dir not in _calendars):
+			_calendars[cache_dir] = WeekCalendar(cache_dir)
+		return _calendars[cache_dir]
+
+"""
+start <= 日期 < end 的比賽，None 就是那邊不限
+同一場 (看 id) 只會給一次，週跟週重疊或同一週抓兩次都不會重複算
+"""
+class GameWindow():
+
+	def __init__(self, start = None, end = None):
+		self.start = as_date(start) if start is not None else None
+		self.end = as_date(end) if end is not None else None
+		self.seen = set()
+
+	def __contains__(self, day) -> bool:
+		if (day is None):
+			return False
+		if (self.start is not None and day < self.start):
+			return False
+		if (self.end is not None and day >= self.end):
+			return False
+		return True
+
+	# 回傳新的 list (順序不變)，原本的 list 不動
+	def take(self, games: list) -> list:
+		result = []
+		for game in games:
+			if (game_day(game) not in self):
+				continue
+			key = _game_key(game)
+			if (key in self.seen):
+				continue
+			self.seen.add(key)
+			result.append(game)
+		return result
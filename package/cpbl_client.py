@@ -0,0 +1,145 @@
+import random
+import threading
+import time
+import requests as rq
+from requests.adapters import HTTPAdapter
+from .errors import CrawlerError, StatusError
+from .cpbl_cache import as_date
+from .cpbl_decode import loads
+
+"""
+所有爬蟲共用的 Rebas HTTP client
+	- 一個 keep-alive 的 Session，連線池重複用，不用每週都重新握手
+	- gzip / brotli 壓縮傳輸 (brotli 要有裝才會開)
+	- 失敗會重試，指數退避 + jitter
+	- token bucket 限速，免得被對面封鎖
+"""
+
+API_ROOT = "https://www.rebas.tw"
+
+# 年份對應的賽季後綴，CPBL-2025-JO 的 JO
+SEASON_SUFFIX = {2018:"Fq", 2019:"Sf", 2020:"KS", 2021:"fi",
+				2022:"dG", 2023:"sk", 2024:"xa", 2025:"JO"}
+
+# 這裡不會直接用到 brotli，只是看有沒有裝: 解 br 的是 requests 底下的 urllib3，
+# 它找得到 brotli 才會解，沒裝的話跟對面要 br 只會拿到解不開的內容
+try:
+	import brotli  # noqa: F401
+	ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+	ACCEPT_ENCODING = "gzip, deflate"
+
+# 這些狀態碼通常等一下再試就會好
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class TokenBucket():
+	"""
+	每秒補 rate 個 token，最多存 burst 個
+	每個 request 拿一個，沒有就睡到有為止
+	"""
+	def __init__(self, rate: float, burst: int):
+		self.rate = rate
+		self.burst = burst
+		self._tokens = float(burst)
+		self._last = time.monotonic()
+		self._lock = threading.Lock()
+
+	def acquire(self):
+		while (True):
+			with self._lock:
+				now = time.monotonic()
+				self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+				self._last = now
+				if (self._tokens >= 1):
+					self._tokens -= 1
+					return
+				wait = (1 - self._tokens) / self.rate
+			time.sleep(wait)
+
+class RebasClient():
+	header = {
+		"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36",
+		"Accept": "application/json, text/plain, */*",
+		"Accept-Encoding": ACCEPT_ENCODING
+	}
+
+	"""
+	rate = None 就是不限速 (測試或打本機 server 時用)
+	pool_size 至少要跟 fetch_weeks 的 max_workers 一樣大，不然多的執行緒還是會重開連線
+	"""
+	def __init__(self, root: str = API_ROOT, timeout: float = 8, retries: int = 3,
+				backoff_base: float = 0.5, backoff_cap: float = 8.0,
+				rate: float = 4.0, burst: int = 8, pool_size: int = 16):
+		self.root = root
+		self.timeout = timeout
+		self.retries = retries
+		self.backoff_base = backoff_base
+		self.backoff_cap = backoff_cap
+		self.limiter = TokenBucket(rate, burst) if rate is not None else None
+
+		self.session = rq.Session()
+		self.session.headers.update(self.header)
+		adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+		self.session.mount("https://", adapter)
+		self.session.mount("http://", adapter)
+
+	# https://www.rebas.tw/api/seasons/CPBL-2025-JO/games?start=2025-04-21
+	def week_url(self, su: str, week_start) -> str:
+		day = as_date(week_start)
+		return f"{self.root}/api/seasons/CPBL-{day.year}-{su}/games?start={day.isoformat()}"
+
+	# full jitter：在 [0, min(cap, base * 2^attempt)] 裡隨便挑一個
+	def backoff(self, attempt: int) -> float:
+		return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+	"""
+	GET 一個 url，回傳 response (狀態碼一定是 200)
+	重試完還是失敗就丟 StatusError (狀態碼不對) 或 CrawlerError (連不上)
+	"""
+	def _get(self, url: str):
+		last_error = None
+		for attempt in range(self.retries + 1):
+			if (attempt > 0):
+				time.sleep(self.backoff(attempt - 1))
+			if (self.limiter is not None):
+				self.limiter.acquire()
+
+			try:
+				response = self.session.get(url, timeout=self.timeout)
+			except (rq.exceptions.ConnectionError, rq.exceptions.Timeout) as e:
+				last_error = CrawlerError(f"Failed to fetch {url}. {e}")
+				continue
+
+			if (response.status_code != 200):
+				last_error = StatusError(url, response.status_code)
+				if (response.status_code in RETRY_STATUS):
+					continue
+				raise last_error
+			return response
+
+		raise last_error
+
+	"""
+	GET 一個 url 並回傳解開的 json
+	重試完還是失敗就丟 StatusError (狀態碼不對) 或 CrawlerError (連不上、json 壞掉)
+	"""
+	def get_json(self, url: str) -> dict:
+		response = self._get(url)
+		try:
+			return loads(response.content)
+		except CrawlerError as e:
+			raise CrawlerError(f"Broken json from {url}. {e}")
+
+	def close(self):
+		self.session.close()
+
+_default_client = None
+_default_lock = threading.Lock()
+
+# 沒特別指定的話大家都用同一個 client，才真的共用到連線池
+def default_client() -> RebasClient:
+	global _default_client
+	with _default_lock:
+		if (_default_client is None):
+			_default_client = RebasClient()
+		return _default_client
@@ -0,0 +1,206 @@
+import json
+import os
+import numpy as np
+from .cpbl_models import as_game
+from .cpbl_cache import as_date
+
+try:
+	import pyarrow
+	import pyarrow.feather as feather
+	import pyarrow.parquet as parquet
+except ImportError:
+	pyarrow = None
+
+"""
+把所有打席攤平成一欄一欄的 numpy array
+	batter / pitcher / team (打擊方) / opponent (守備方) : 整數編號，名字在 self.players / self.teams
+	game : 第幾場 (照灌進來的順序)
+	date : 比賽日期 datetime64[D]
+	PA_order / PA_round / RE24
+這樣 "某段日期每個打者的 RE24/PA" 就是一個 mask 加一次 bincount，不用一個打席一個打席跑 python
+
+存檔看副檔名:
+	.feather / .arrow : Arrow IPC，不壓縮，可以 memory map (要有 pyarrow)
+	.parquet          : Parquet (要有 pyarrow)
+	其他              : 當資料夾，每欄一個 .npy，讀的時候用 np.load(mmap_mode="r")
+"""
+
+COLUMNS = {
+	"batter": np.int32,
+	"pitcher": np.int32,
+	"team": np.int16,
+	"opponent": np.int16,
+	"game": np.int32,
+	"date": "datetime64[D]",
+	"PA_order": np.int16,
+	"PA_round": np.int16,
+	"RE24": np.float64
+}
+
+class PAStore():
+
+	def __init__(self):
+		self.players = []
+		self.teams = []
+		self.games = 0
+		self._player_code = {}
+		self._team_code = {}
+		self._pending = {name: [] for name in COLUMNS}
+		self._columns = {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+
+	def _code(self, table: list, index: dict, name: str) -> int:
+		code = index.get(name)
+		if (code is None):
+			code = len(table)
+			table.append(name)
+			index[name] = code
+		return code
+
+	"""
+	灌一場比賽進來 (Game 或原始 json 都可以)，沒打完的不收
+	"""
+	def add_game(self, game):
+		game = as_game(game)
+		if (not game.finished or game.started_at is None):
+			return
+		sides = game.batting_sides()
+		team_of = {
+			"AWAY": self._code(self.teams, self._team_code, game.away),
+			"HOME": self._code(self.teams, self._team_code, game.home)
+		}
+		cols = self._pending
+		for pa, side in zip(game.PA_list, sides):
+			cols["batter"].append(self._code(self.players, self._player_code, pa.batter))
+			cols["pitcher"].append(self._code(self.players, self._player_code, pa.pitcher))
+			cols["team"].append(team_of[side])
+			cols["opponent"].append(team_of["HOME" if side == "AWAY" else "AWAY"])
+			cols["game"].append(self.games)
+			cols["date"].append(game.started_at)
+			cols["PA_order"].append(pa.PA_order)
+			cols["PA_round"].append(pa.PA_round)
+			cols["RE24"].append(pa.RE24)
+		self.games += 1
+
+	def add_games(self, games):
+		for game in games:
+			self.add_game(game)
+		return self
+
+	# 讓它可以直接註冊到 Pipeline 上
+	def __call__(self, now: tuple, games: list):
+		self.add_games(games)
+
+	# 把還在 python list 裡的打席併進 numpy array
+	def _flush(self):
+		if (len(self._pending["batter"]) == 0):
+			return
+		for name, dtype in COLUMNS.items():
+			new = np.asarray(self._pending[name], dtype=dtype)
+			self._columns[name] = np.concatenate([self._columns[name], new])
+			self._pending[name] = []
+
+	def column(self, name: str) -> np.ndarray:
+		self._flush()
+		return self._columns[name]
+
+	def __len__(self):
+		self._flush()
+		return len(self._columns["batter"])
+
+	"""
+	篩選條件全部做成一個 bool mask
+	start / end : 日期 (tuple 或 date)，start <= date < end (end 那天不算)，None 就是不限
+	team        : 只要這隊有參賽的比賽 (打擊或守備)
+	"""
+	def mask(self, start = None, end = None, team: str = None) -> np.ndarray:
+		date = self.column("date")
+		mask = np.ones(len(date), dtype=bool)
+		if (start is not None):
+			mask &= date >= np.datetime64(as_date(start), "D")
+		if (end is not None):
+			mask &= date < np.datetime64(as_date(end), "D")
+		if (team is not None):
+			code = self._team_code.get(team)
+			if (code is None):
+				return np.zeros(len(date), dtype=bool)
+			mask &= (self.column("team") == code) | (self.column("opponent") == code)
+		return mask
+
+	"""
+	每個打者在條件內的 (打席數, RE24 總和)，兩個長度 = len(self.players) 的 array
+	"""
+	def batter_totals(self, start = None, end = None, team: str = None) -> tuple:
+		mask = self.mask(start, end, team)
+		batter = self.column("batter")[mask]
+		pa_count = np.bincount(batter, minlength=len(self.players))
+		re24 = np.bincount(batter, weights=self.column("RE24")[mask], minlength=len(self.players))
+		return (pa_count, re24)
+
+	# 給人看的版本: {名字: {"PA": n, "RE24_total": x, "RE24_per_PA": y}}，沒打席的不列
+	def re24_per_pa(self, start = None, end = None, team: str = None) -> dict:
+		pa_count, re24 = self.batter_totals(start, end, team)
+		result = {}
+		for code in np.nonzero(pa_count)[0]:
+			result[self.players[code]] = {
+				"PA": int(pa_count[code]),
+				"RE24_total": float(re24[code]),
+				"RE24_per_PA": float(re24[code] / pa_count[code])
+			}
+		return result
+
+	def _meta(self) -> dict:
+		return {"players": self.players, "teams": self.teams, "games": self.games}
+
+	def save(self, path: str):
+		self._flush()
+		ext = os.path.splitext(path)[1]
+		if (ext in (".feather", ".arrow", ".parquet")):
+			if (pyarrow is None):
+				raise ImportError("pyarrow is needed to write Feather/Parquet, or save to a directory of .npy instead")
+			table = pyarrow.table(self._columns, metadata={"pa_store": json.dumps(self._meta(), ensure_ascii=False)})
+			if (ext == ".parquet"):
+				parquet.write_table(table, path)
+			else:
+				# 不壓縮才能 memory map
+				feather.write_feather(table, path, compression="uncompressed")
+			return
+
+		os.makedirs(path, exist_ok=True)
+		for name, values in self._columns.items():
+			np.save(os.path.join(path, f"{name}.npy"), values)
+		with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+			json.dump(self._meta(), f, ensure_ascii=False)
+
+	"""
+	mmap = True 的話欄位直接對到檔案，不會整個讀進記憶體 (Parquet 沒辦法，一定會解壓)
+	讀回來的 store 還是可以繼續 add_game
+	"""
+	@classmethod
+	def load(cls, path: str, mmap: bool = True) -> "PAStore":
+		store = cls()
+		ext = os.path.splitext(path)[1]
+		if (ext in (".feather", ".arrow", ".parquet")):
+			if (pyarrow is None):
+				raise ImportError("pyarrow is needed to read Feather/Parquet")
+			if (ext == ".parquet"):
+				table = parquet.read_table(path, memory_map=mmap)
+			else:
+				table = feather.read_table(path, memory_map=mmap)
+			meta = json.loads(table.schema.metadata[b"pa_store"])
+			for name in COLUMNS:
+				values = table.column(name).combine_chunks()
+				if (name == "date"):
+					values = values.cast(pyarrow.date32())
+				store._columns[name] = values.to_numpy(zero_copy_only=False).astype(COLUMNS[name], copy=False)
+		else:
+			with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+				meta = json.load(f)
+			for name in COLUMNS:
+				store._columns[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+
+		store.players = meta["players"]
+		store.teams = meta["teams"]
+		store.games = meta["games"]
+		store._player_code = {name: i for i, name in enumerate(store.players)}
+		store._team_code = {name: i for i, name in enumerate(store.teams)}
+		return store
@@ -1,51 +1,55 @@
-import requests as rq
+import datetime
 import json
 from .errors import CrawlerError, StatusError
+from .cpbl_cache import WeekCache, as_date
+from .cpbl_calendar import GameWindow, WeekCalendar
+from .cpbl_fetch import CrawlCheckpoint, WeekCrawler
+from .cpbl_client import RebasClient
+from .cpbl_models import games_from_week
 
-class GetData():
-	header = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36",
-    "Accept": "application/json, text/plain, */*"
-	}
+class GetData(WeekCrawler):
 
-	suffix = {2018:"Fq", 2019:"Sf", 2020:"KS", 2021:"fi", 
-				2022:"dG", 2023:"sk", 2024:"xa", 2025:"JO"}
-
-	def __init__(self, target: str, start_date: tuple, end_date: tuple):
+	def __init__(self, target: str, start_date: tuple, end_date: tuple, cache: WeekCache = None, max_workers: int = 1, client: RebasClient = None, compact: bool = True, calendar: WeekCalendar = None, checkpoint: CrawlCheckpoint = None):
 		self.tar = target
-		self.data = {}
+		self._data = None
 		self._url = None
 		self.start_date = start_date
 		self.end_date = end_date
-		self._raw_content = None
 		self._complete_games = 0
 		self._now = start_date
+		self.init_crawler(cache, max_workers, client, calendar, checkpoint)
+		# True 的話每週的比賽一進來就轉成 cpbl_models.Game，原始 json 直接丟掉
+		# 注意 .data / iter_weeks() 每週給的就變成 list[Game] (用屬性讀，不是 game["info"] 那種 dict)，
+		# 還在用 dict 寫法的舊程式請給 compact=False
+		self.compact = compact
 
-		if (target == "rebras"):
-			self.analyze()
+	"""
+	以前一建構就會把整段爬完，現在要等第一次碰 .data 才會爬
+	{週一: 那週的比賽}，compact (預設) 的話比賽是 Game，compact=False 才是以前的原始 dict
+	不想一次全部拿進記憶體的話請用 iter_weeks()
+	"""
+	@property
+	def data(self) -> dict:
+		if (self._data is None):
+			self._data = {}
+			if (self.tar == "rebras"):
+				self.analyze()
+		return self._data
 
 	# return a week
 	def raw_content_by_get(self, url: str, start_date: tuple): 
-		s = rq.Session()
-		s.headers.update(self.header)
 		print(f"Trying to get from {start_date}")
-		try:	
-			self._raw_content = rq.get(url, timeout = 8)
-			if (self._raw_content.status_code != 200):
-				raise StatusError(url, self._raw_content.status_code)
+		try:
+			json_data = self.client.get_json(url)
 		except StatusError as e:
 			print(f"Expected Error. \n{e}")
 
-		except rq.exceptions.ConnectionError as e:
+		except CrawlerError as e:
 			print(f"Connection Error. You dont even get a freaking net, or the url isnt even exist\n{e}")
-			
+
 		else:
 			print(f"Happy duck! request succeed!")
-			if (self._raw_content != None):
-				json_data = self._raw_content.json()
-				return json_data
-			else:
-				print("Error. Content isnt detected")
+			return json_data
 
 	@staticmethod
 	def date_trans(raw: str):
@@ -68,56 +72,51 @@ class GetData():
 			pass
 		self._now = new_date
 
-	@staticmethod
-	def days_of_month(m: int):
-		if (m in [1, 3, 5, 7, 8, 10, 12]):
-			return 31
-		if (m in [4, 6, 9, 11]):
-			return 30
-		if (m%4==0 and m%100 != 0):
-			return 29
-		else:
-			return 28
-
 	"""
-	把 self._now 換到下一個比賽日，就加七天
-	對，python 有 datetime library，但我就很懶
-	known bug: 其實跨年後，你的日期絕對不是開季第一天
-	我知道這麼做會爛掉，所以請你他喵的不要這麼做
+	把 self._now 換到下一週，就加七天 (跨月跨年都交給 datetime)
 	"""
 	def next_date(self):
-		y, m, d = self.now[0], self.now[1], self.now[2]
-		d += 7
-		if (d > self.days_of_month(m)):
-			d -= self.days_of_month(m)
-			m += 1
-		if (m > 12):
-			m -= 12
-			y += 1
-		self.now = (y, m, d)
-		return (y, m, d)
+		day = as_date(self.now) + datetime.timedelta(days=7)
+		self.now = (day.year, day.month, day.day)
+		return self.now
 	
 	"""
 	會給你 self._now 所對應到的 api request url
 	"""
 	def url_get(self):
 		# https://www.rebas.tw/api/seasons/CPBL-2025-JO/games?start=2025-04-21
-		y, m, d = self.now[0], self.now[1], self.now[2]
-		su = self.suffix[y]
-		self._url = f"https://www.rebas.tw/api/seasons/CPBL-{y}-{su}/games?start={y}-{m:02d}-{d:02d}" 
+		self._url = self.week_url(self.now)
 		return self._url
 
 	"""
-	因為我很懶惰，所以你的 _start_date 和 _end_date
-	必須要是一週的起始點
-	判斷那個太麻煩了
+	start_date <= 日期 < end_date 的比賽，日期隨便給，不用是一週的開頭
 	"""
 	def analyze(self):
 		print(f"Start analyze from {self.start_date} to {self.end_date}")
-		self._now = self.start_date
-		while (self._now < self.end_date):
-			self.url_get() # 他吃的是 now
-			json_data = self.raw_content_by_get(self._url, self._now)
-			self.data[self._now] = json_data["data"]
-			self.next_date()
-			print(f"finish analyzing, there're {len(self.data)} weeks in total")
\ No newline at end of file
+		self._data = {}
+		for now, games in self.iter_weeks():
+			self._data[now] = games
+			print(f"finish analyzing, there're {len(self._data)} weeks in total")
+
+	"""
+	一週抓到就 yield 一週 (week_start, games)，不會存在 self.data 裡
+	照日期順序，中途 break 掉後面的週就不會再抓 (多執行緒的話頂多多抓幾週)
+	"""
+	def iter_weeks(self):
+		window = GameWindow(self.start_date, self.end_date)
+		# 對齊週一，已經知道沒比賽的週不抓，回來的順序跟日期一樣
+		for (now, _), json_data in self.crawl(self.start_date, self.end_date):
+			# 抓不到的週已經記在 self.missing，最後會印出來，這裡跳過就好
+			if (json_data is None):
+				continue
+			self.calendar.record(now, json_data)
+			# 範圍外 (週頭週尾) 跟重複的比賽在這裡就濾掉
+			games = window.take(json_data["data"])
+			if (self.compact):
+				yield (now, games_from_week(games))
+			else:
+				yield (now, games)
+
+	# fetch_week 真的要上網的時候走這裡 (不碰 self._now，所以可以好幾個執行緒一起叫)
+	def get_week(self, url: str, now: tuple):
+		return self.raw_content_by_get(url, now)
@@ -0,0 +1,30 @@
+import json
+from .errors import PayloadError
+from .cpbl_models import Game
+
+"""
+週的 json 怎麼解
+	loads(payload)       : bytes / str -> dict，有裝 orjson 就用它 (一週大概快兩倍)，沒有就內建 json
+	game_from_dict(raw)  : 一場原始 dict -> Game，少欄位、型別不對、日期看不懂都丟 ValueError
+解完一樣是 dict 再 games_from_week，不另外做照 schema 直接解成 Game 的路線 (量起來沒有比較快，見 bench/bench_decode.py)
+"""
+
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+# 解不開丟 PayloadError (orjson.JSONDecodeError 也是 ValueError)
+def loads(payload):
+	try:
+		return orjson.loads(payload) if orjson is not None else json.loads(payload)
+	except ValueError as e:
+		raise PayloadError(f"Broken json. {e}")
+
+def game_from_dict(raw) -> Game:
+	if (not isinstance(raw, dict)):
+		raise ValueError(f"Expected a game object, got {type(raw).__name__}")
+	try:
+		return Game.from_json(raw)
+	except (AttributeError, KeyError, TypeError) as e:
+		raise ValueError(f"Malformed game {raw.get('id')}: {type(e).__name__} {e}")
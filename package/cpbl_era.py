@@ -1,10 +1,13 @@
-from bs4 import BeautifulSoup
 import json
 from .errors import CrawlerError, StatusError
+from .cpbl_models import as_game
+from .cpbl_tables import PLAYER, frames_with, load_frames, stat_or_zero
+from .cpbl_names import page_index
 
 class GetERA():
 
 	# data 應該要是整個半季的比賽，dict{tuple, json}
+	# 也可以是 GetData.iter_weeks() 那種一週一週吐 (week, games) 的 iterator
 	def __init__(self, data: dict) -> None:
 		self.raw_data = data
 		self.total_games = 0
@@ -13,17 +16,21 @@ class GetERA():
 		if (data is None):
 			data = self.raw_data
 
+		# dict 就拿 items()，iterator 就直接用
+		weeks = data.items() if hasattr(data, "items") else data
+
 		counter = 0
 		guardians_starting_pitcher = {}
 		opponents_starting_pitcher = {}
-		for _, week_game_list in data.items():
+		for _, week_game_list in weeks:
 			if (counter >= game_count):
 				break
-			week_game_list.reverse()
-			for game in week_game_list:
-				home = game["home"]["abbr"]
-				away = game["away"]["abbr"]
-				status =  game["info"]["status"]
+			# API 給的是新的在前面，倒著看就好，不要動到傳進來的 list
+			for game in reversed(week_game_list):
+				game = as_game(game)
+				home = game.home
+				away = game.away
+				status =  game.status
 				if (counter >= game_count):
 					break
 				if (home != "悍" and away != "悍"):
@@ -31,17 +38,13 @@ class GetERA():
 				if (status != "FINISHED"):
 					continue
 
+				# 半局怎麼切是每場算一次就記住的，1 局上是主隊先發、1 局下是客隊先發
+				top_inning, bottom_inning = game.innings.starting_pitchers()
+				if (top_inning is None or bottom_inning is None):
+					continue
+
 				self.total_games += 1
 				guardians_top = (away == "悍")
-				top_inning = game["PA_list"][0]["pitcher"]["name"]
-				index = 1
-				switch = (game["PA_list"][index]["PA_order"] <= game["PA_list"][index-1]["PA_order"])
-				first_round = (game["PA_list"][index-1]["PA_round"] == 1)
-				while (not (switch and first_round)):
-					index += 1
-					switch = (game["PA_list"][index]["PA_order"] <= game["PA_list"][index-1]["PA_order"])
-					first_round = (game["PA_list"][index-1]["PA_round"] == 1)
-				bottom_inning = game["PA_list"][index]["pitcher"]["name"]
 
 				# print(f"DEBUG: {away}, {guardians_top}")
 				if (guardians_top):
@@ -64,80 +67,41 @@ class GetERA():
 						opponents_starting_pitcher[bottom_inning] += 1
 
 				counter += 1
+
+			# 夠了就停，不要再去要下一週
+			if (counter >= game_count):
+				break
 				
 		return (guardians_starting_pitcher, opponents_starting_pitcher)
 
 	def get_pitching_stats_from_local_file(self, file_path: str, target_pitchers: list[str]) -> dict[str, dict]:
-	    try:
-	        with open(file_path, "r", encoding="utf-8") as f:
-	            html_content = f.read()
-	    except FileNotFoundError:
+	    # 同一頁只會真的解析一次，之後都是快取 (檔案改了才會重來)
+	    frames = load_frames(file_path)
+	    if frames is None:
 	        print(f"錯誤：找不到檔案 {file_path}")
 	        return {}
 
-	    soup = BeautifulSoup(html_content, "html.parser")
+	    # 名字一頁只建一次索引，一列查一次就知道是誰
+	    owners, ambiguous = page_index(file_path).resolve(target_pitchers)
+	    for target, candidates in ambiguous.items():
+	        print(f"警告：{target} 對不準，可能是 {candidates}，先不算 (是同一個人的話去 player_aliases.json 加別名)")
+
 	    result = {}
 	    
-	    tables = soup.find_all("table")
-	    
-	    for table in tables:
-	        thead = table.find("thead")
-	        if not thead:
-	        	continue
-	        
-	        headers = [th.get_text(strip=True) for th in thead.find_all("th")]
-	        
-	        # 確認我們要的東西在這裡
-	        if "ERA+" in headers and "tERA+" in headers:
-	            erap_idx = -1
-	            terap_idx = -1
-	            name_idx = 0
-	            
-	            for i, h in enumerate(headers):
-	                if h == "ERA+": erap_idx = i
-	                elif h == "tERA+": terap_idx = i
-	            
-	            # 開始解析這個表格的 Body
-	            tbody = table.find("tbody")
-	            if not tbody:
-	            	continue
+	    # 整頁每個表格都有全部欄位，挑有 ERA+ / tERA+ 的就好
+	    for frame in frames_with(frames, "ERA+", "tERA+"):
+	        for raw_name, erap_raw, terap_raw in zip(frame[PLAYER], frame["ERA+"], frame["tERA+"]):
+	            matched_name = owners.get(raw_name)
 	            
-	            rows = tbody.find_all("tr")
-	            
-	            for row in rows:
-	                cols = row.find_all("td")
-	                if not cols:
-	                	continue
-	                
-	                if len(cols) <= max(erap_idx, terap_idx):
-	                	continue
-
-	                raw_name = cols[name_idx].get_text(strip=True)
-	                
-	                # 比對名字
-	                matched_name = None
-	                for target in target_pitchers:
-	                    if target in raw_name:
-	                        matched_name = target
-	                        break
-	                
-	                if matched_name:
-	                    try:
-	                        val_erap_str = cols[erap_idx].get_text(strip=True)
-	                        val_terap_str = cols[terap_idx].get_text(strip=True)
-	                        
-	                        def parse_float(val_str):
-	                            if val_str in ["-", "NaN", "Infinity", ""]:
-	                                return 0.0
-	                            return float(val_str)
-
-	                        erap = parse_float(val_erap_str)
-	                        terap = parse_float(val_terap_str)
-	                        
-	                        result[matched_name] = {"ERA+": erap, "tERA+": terap}
-	                        # print(f"成功抓取: {matched_name} ERA+: {erap}")
-	                        
-	                    except Exception as e:
-	                        print(f"解析 {matched_name} 數據時發生錯誤: {e}")
+	            if matched_name:
+	                try:
+	                    erap = stat_or_zero(erap_raw)
+	                    terap = stat_or_zero(terap_raw)
+	                    
+	                    result[matched_name] = {"ERA+": erap, "tERA+": terap}
+	                    # print(f"成功抓取: {matched_name} ERA+: {erap}")
+	                    
+	                except Exception as e:
+	                    print(f"解析 {matched_name} 數據時發生錯誤: {e}")
 
 	    return result
\ No newline at end of file
@@ -0,0 +1,210 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .errors import CrawlerError
+from .cpbl_cache import WeekCache, as_date
+from .cpbl_calendar import shared_calendar
+from .cpbl_client import SEASON_SUFFIX, default_client
+
+"""
+一次把整段日期的每一週都丟出去抓
+weeks 是 list，每一項是一個 tuple，會原封不動地展開丟給 fetch_one
+	fetch_one(*week) -> 那一週的 json (或 None)
+回傳順序跟 weeks 一樣 (也就是日期順序)，不管誰先抓完
+max_workers = 1 的話就跟以前一樣一週一週慢慢抓
+"""
+def fetch_weeks(weeks: list, fetch_one, max_workers: int = 1):
+	if (max_workers <= 1 or len(weeks) <= 1):
+		for week in weeks:
+			yield fetch_one(*week)
+		return
+
+	# pool.map 本來就會照順序吐，前面的週抓完就可以先處理，不用等全部
+	with ThreadPoolExecutor(max_workers=max_workers) as pool:
+		yield from pool.map(lambda week: fetch_one(*week), weeks)
+
+def _ok(json_data) -> bool:
+	return json_data is not None and "data" in json_data
+
+def _week_key(week) -> str:
+	return as_date(week).isoformat()
+
+"""
+一段長爬蟲的進度，存成 json ({cache_dir}/checkpoints/{name}.json)
+	done   : 已經抓到 (資料在 WeekCache 裡) 的週
+	failed : {週: 失敗幾次}
+中途掛掉或斷網，下次用同一個 checkpoint 再跑，done 的週直接讀快取，只會去抓還沒抓到的
+整段都抓到之後 clear() 會把檔案刪掉，下次再跑就是全新的
+"""
+class CrawlCheckpoint():
+
+	def __init__(self, path: str):
+		self.path = path
+		self.done = set()
+		self.failed = {}
+		self._lock = threading.Lock()
+		if (os.path.exists(path)):
+			try:
+				with open(path, "r", encoding="utf-8") as f:
+					data = json.load(f)
+				self.done = set(data.get("done", []))
+				self.failed = dict(data.get("failed", {}))
+			except (OSError, ValueError) as e:
+				print(f"Broken checkpoint {path}, start over. \n{e}")
+
+	# name 通常是 "開始_結束"，同一段日期用同一個檔案
+	@classmethod
+	def of(cls, cache_dir: str, name: str) -> "CrawlCheckpoint":
+		return cls(os.path.join(cache_dir, "checkpoints", f"{name}.json"))
+
+	def is_done(self, week) -> bool:
+		return _week_key(week) in self.done
+
+	# 抓一週回來就記一次 (馬上寫檔)，可以好幾個執行緒一起叫
+	def mark(self, week, ok: bool):
+		key = _week_key(week)
+		with self._lock:
+			if (ok):
+				self.done.add(key)
+				self.failed.pop(key, None)
+			else:
+				self.failed[key] = self.failed.get(key, 0) + 1
+			self.save()
+
+	def save(self):
+		os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+		tmp = f"{self.path}.{os.getpid()}.tmp"
+		with open(tmp, "w", encoding="utf-8") as f:
+			json.dump({"done": sorted(self.done), "failed": dict(sorted(self.failed.items()))}, f)
+		os.replace(tmp, self.path)
+
+	def clear(self):
+		with self._lock:
+			self.done = set()
+			self.failed = {}
+			if (os.path.exists(self.path)):
+				os.remove(self.path)
+
+# 有 checkpoint 的時候一次抓幾週 (max_workers 比這個大就用 max_workers)
+CHECKPOINT_BATCH = 8
+
+"""
+照 weeks 的順序 yield (week, json)，抓不到的週 json 是 None (不會丟例外，也不會默默跳過)
+抓不到的週會加進 missing (有給的話) 並且在最後印出來
+
+有給 checkpoint 的話一批一批 (CHECKPOINT_BATCH 週) 來:
+	1. 這批裡還沒 done 的週抓一輪，每一週的結果馬上寫進 checkpoint
+	   失敗的週重試 retry_rounds 輪，每輪之前先等 retry_wait 秒
+	2. 照順序交出去，之前就 done 的週用 load_one(*week) 從快取讀 (不上網)
+	3. 交完這批才去抓下一批
+這樣在第 30 週斷掉，重跑的時候前 29 週都不用再抓，而且交出去的順序還是對的
+中途 break 的話後面的批次不會抓 (頂多多抓這一批)
+load_one 沒給的話就用 fetch_one (WeekCache.fetch 對定案的週本來就不會上網)
+"""
+def crawl_weeks(weeks: list, fetch_one, max_workers: int = 1, checkpoint: CrawlCheckpoint = None,
+				load_one = None, retry_rounds: int = 1, retry_wait: float = 5.0, missing: list = None):
+	missing = missing if missing is not None else []
+	if (checkpoint is None):
+		for week, json_data in zip(weeks, fetch_weeks(weeks, fetch_one, max_workers)):
+			if (not _ok(json_data)):
+				missing.append(week[0])
+				json_data = None
+			yield (week, json_data)
+		_report(missing)
+		return
+
+	load_one = load_one if load_one is not None else fetch_one
+	size = max(CHECKPOINT_BATCH, max_workers)
+	for begin in range(0, len(weeks), size):
+		batch = weeks[begin:begin+size]
+		# 這批剛抓到的，交出去的時候不用再讀一次快取
+		fetched = {}
+		todo = [week for week in batch if not checkpoint.is_done(week[0])]
+		for attempt in range(retry_rounds + 1):
+			if (len(todo) == 0):
+				break
+			if (attempt > 0):
+				print(f"Retrying {len(todo)} failed weeks (round {attempt}/{retry_rounds})")
+				time.sleep(retry_wait)
+			for week, json_data in zip(todo, fetch_weeks(todo, fetch_one, max_workers)):
+				checkpoint.mark(week[0], _ok(json_data))
+				if (_ok(json_data)):
+					fetched[_week_key(week[0])] = json_data
+			todo = [week for week in todo if not checkpoint.is_done(week[0])]
+
+		for week in batch:
+			json_data = fetched.pop(_week_key(week[0]), None)
+			if (json_data is None and checkpoint.is_done(week[0])):
+				json_data = load_one(*week)
+				# 快取被刪掉的話只好再抓一次
+				if (not _ok(json_data)):
+					json_data = fetch_one(*week)
+			if (not _ok(json_data)):
+				missing.append(week[0])
+				json_data = None
+			yield (week, json_data)
+	_report(missing)
+	if (len(missing) == 0):
+		checkpoint.clear()
+
+def _report(missing: list):
+	if (len(missing) > 0):
+		print(f"Still missing {len(missing)} weeks: {', '.join(_week_key(week) for week in missing)}")
+
+"""
+每支爬蟲都一樣的那一段: 快取、連線、週曆、checkpoint、抓一週 / 讀一週
+	class GetXX(WeekCrawler):
+		def __init__(self, ..., cache=None, max_workers=1, client=None, calendar=None, checkpoint=None):
+			self.init_crawler(cache, max_workers, client, calendar, checkpoint)
+	for (now, url), json_data in self.crawl(start, end): ...
+抓不到的時候要印不一樣的訊息就覆寫 get_week(url, now)
+"""
+class WeekCrawler():
+	# 年份對應的賽季後綴，沒列到的年份當 2025
+	suffix = SEASON_SUFFIX
+
+	def init_crawler(self, cache = None, max_workers: int = 1, client = None, calendar = None, checkpoint: CrawlCheckpoint = None):
+		self.cache = cache if cache is not None else WeekCache()
+		# 同時抓幾週，1 就是一週一週抓
+		self.max_workers = max_workers
+		# 沒給的話大家共用同一個連線池
+		self.client = client if client is not None else default_client()
+		# 哪幾週有比賽，跟 WeekCache 放在同一個資料夾
+		self.calendar = calendar if calendar is not None else shared_calendar(self.cache.cache_dir)
+		# 有給的話中途斷掉可以接著跑，失敗的週最後會再試
+		self.checkpoint = checkpoint
+		# 最後還是抓不到的週
+		self.missing = []
+
+	def week_suffix(self, now) -> str:
+		return self.suffix.get(as_date(now).year, "JO")
+
+	def week_url(self, now) -> str:
+		return self.client.week_url(self.week_suffix(now), now)
+
+	# 真的上網抓，抓不到回傳 None
+	def get_week(self, url: str, now):
+		try:
+			return self.client.get_json(url)
+		except CrawlerError as e:
+			print(f"Failed to get week {now}. \n{e}")
+			return None
+
+	# 抓一週 (有快取就用快取)，不碰其他狀態，可以好幾個執行緒一起叫
+	def fetch_week(self, now, url: str):
+		return self.cache.fetch(self.week_suffix(now), now, lambda: self.get_week(url, now))
+
+	# 只讀快取不上網，checkpoint 接著跑的時候用
+	def load_week(self, now, url: str):
+		return self.cache.load(self.week_suffix(now), now)
+
+	"""
+	start <= 日期 < end 的每一週 (對齊週一，已經知道沒比賽的週不抓)，照日期順序 yield ((週一, url), json)
+	抓不到的週 json 是 None，而且會記在 self.missing
+	"""
+	def crawl(self, start, end):
+		weeks = self.calendar.jobs(start, end, self.week_url)
+		self.missing = []
+		return crawl_weeks(weeks, self.fetch_week, self.max_workers, self.checkpoint, self.load_week, missing=self.missing)
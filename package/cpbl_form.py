@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+from .cpbl_cache import as_date
+from .cpbl_columns import PAStore
+
+"""
+每個打者的狀態曲線 (從 PAStore 建，一次建好之後怎麼問都不用重爬)
+以前 GetPAStats 只有 全季 / really_start_date 以後 兩格，現在任何一段都可以問:
+	window(start, end)   : start <= 日期 < end 每個打者的 (打席, RE24 總和)
+	last_pa(n, end)      : end 以前 (不含 end) 最後 n 個打席
+	ewma(alpha, end)     : end 以前 RE24 的指數加權平均 (越近的打席越重)
+日期區間跟 Pipeline / LeagueStats 一樣都是 [start, end)，end 那天不算
+全部都是一次回傳所有打者 (長度 = len(store.players) 的 array)
+
+做法:
+	打席照 (打者, 日期) 排好，每個打者一段連續的位置，RE24 做前綴和
+	再做一張 打者 x 比賽日 的累積打席數 / 累積 RE24 表，日期區間就是兩欄相減
+	表只有真的有打席的打者 (不是 store 裡全部的人) 跟有比賽的日子 (不是每一天)，
+	日期用 searchsorted 找到第幾欄，查完再放回 len(store.players) 長的 array
+所以每次查詢對每個打者都是 O(1)，不管季多長
+"""
+
+def _day(day) -> int:
+	return int(np.datetime64(as_date(day), "D").astype(np.int64))
+
+# RE24 / 打席，沒打席的是 NaN
+def per_pa(pa: np.ndarray, re24: np.ndarray) -> np.ndarray:
+	with np.errstate(divide="ignore", invalid="ignore"):
+		return np.where(pa > 0, re24 / pa, np.nan)
+
+class FormTimeline():
+
+	"""
+	team 有給的話只算那一隊在打擊的打席
+	"""
+	def __init__(self, store: PAStore, team: str = None):
+		self.players = store.players
+		batter = store.column("batter").astype(np.int64)
+		day = store.column("date").astype("datetime64[D]").astype(np.int64)
+		re24 = store.column("RE24").astype(np.float64)
+
+		keep = np.arange(len(batter))
+		if (team is not None):
+			code = store._team_code.get(team)
+			keep = np.nonzero(store.column("team") == code)[0] if code is not None else keep[:0]
+		# 同一天的照原本灌進來的順序
+		order = keep[np.lexsort((keep, day[keep], batter[keep]))]
+		self.batter = batter[order]
+		self.day = day[order]
+		self.re24 = re24[order]
+
+		B = len(self.players)
+		self.offsets = np.concatenate(([0], np.cumsum(np.bincount(self.batter, minlength=B))))
+		self.cum_re24 = np.concatenate(([0.0], np.cumsum(self.re24)))
+
+		# 有打席的打者 x 有比賽的日子: 第 k 欄 = game_days[k] 以前 (到 game_days[k-1] 那天) 的累積，第 0 欄全部是 0
+		self.rows, row = np.unique(self.batter, return_inverse=True)
+		self.game_days, col = np.unique(self.day, return_inverse=True)
+		R, D = len(self.rows), len(self.game_days)
+		cell = row.reshape(-1) * D + col.reshape(-1)
+		pa_grid = np.bincount(cell, minlength=R * D).reshape(R, D)
+		re24_grid = np.bincount(cell, weights=self.re24, minlength=R * D).reshape(R, D)
+		self.cum_pa_grid = np.concatenate((np.zeros((R, 1), dtype=np.int64), np.cumsum(pa_grid, axis=1)), axis=1)
+		self.cum_re24_grid = np.concatenate((np.zeros((R, 1)), np.cumsum(re24_grid, axis=1)), axis=1)
+		self._ewma = {}
+
+	# day 以前 (不含 day) 的累積在第幾欄 (= day 以前有幾個比賽日)
+	def _col(self, day: int) -> int:
+		return int(np.searchsorted(self.game_days, day, "left"))
+
+	# 表裡的一欄放回每個打者一格，沒打席的打者是 0
+	def _spread(self, values: np.ndarray) -> np.ndarray:
+		result = np.zeros(len(self.players), dtype=values.dtype)
+		result[self.rows] = values
+		return result
+
+	# 每個打者 end 以前 (不含 end) 打了幾個打席 (None 就是全部)
+	def _through(self, end) -> np.ndarray:
+		if (end is None):
+			return np.diff(self.offsets)
+		return self._spread(self.cum_pa_grid[:, self._col(_day(end))])
+
+	"""
+	start <= 日期 < end 的 (打席數, RE24 總和)，None 就是不限
+	"""
+	def window(self, start = None, end = None) -> tuple:
+		right = self._col(_day(end)) if end is not None else len(self.game_days)
+		left = self._col(_day(start)) if start is not None else 0
+		left = min(left, right)
+		pa = self.cum_pa_grid[:, right] - self.cum_pa_grid[:, left]
+		re24 = self.cum_re24_grid[:, right] - self.cum_re24_grid[:, left]
+		return (self._spread(pa), self._spread(re24))
+
+	"""
+	end 以前 (不含 end) 每個打者最後 n 個打席的 (打席數, RE24 總和)，打席不到 n 個的就是全部
+	"""
+	def last_pa(self, n: int, end = None) -> tuple:
+		lo = self.offsets[:-1]
+		hi = lo + self._through(end)
+		begin = np.maximum(lo, hi - max(n, 0))
+		return (hi - begin, self.cum_re24[hi] - self.cum_re24[begin])
+
+	"""
+	end 以前 (不含 end) RE24 的指數加權平均，alpha 越大越看最近的打席 (pandas 的 ewm(alpha=...).mean())
+	第一次用某個 alpha 會整個算一次，之後查詢都是 O(1)；還沒打過的打者是 NaN
+	"""
+	def ewma(self, alpha: float, end = None) -> np.ndarray:
+		values = self._ewma.get(alpha)
+		if (values is None):
+			series = pd.Series(self.re24).groupby(self.batter).ewm(alpha=alpha).mean()
+			values = series.reset_index(level=0, drop=True).sort_index().to_numpy()
+			self._ewma[alpha] = values
+		lo = self.offsets[:-1]
+		hi = lo + self._through(end)
+		result = np.full(len(self.players), np.nan)
+		has = hi > lo
+		result[has] = values[hi[has] - 1]
+		return result
+
+	"""
+	給人看的表，這段日期有打席的打者才列
+		PA / RE24 / RE24_per_PA : start <= 日期 < end 這段
+		last_N_PA ...           : 有給 last 的話，end 以前最後 last 個打席
+		EWMA                    : 有給 alpha 的話，end 以前的指數加權平均
+	"""
+	def table(self, start = None, end = None, last: int = None, alpha: float = None) -> pd.DataFrame:
+		pa, re24 = self.window(start, end)
+		columns = {"PA": pa, "RE24": re24, "RE24_per_PA": per_pa(pa, re24)}
+		if (last is not None):
+			last_pa, last_re24 = self.last_pa(last, end)
+			columns[f"last_{last}_PA"] = last_pa
+			columns[f"last_{last}_RE24_per_PA"] = per_pa(last_pa, last_re24)
+		if (alpha is not None):
+			columns["EWMA"] = self.ewma(alpha, end)
+		frame = pd.DataFrame(columns, index=pd.Index(self.players, name="Name"))
+		return frame[frame["PA"] > 0]
+
+	"""
+	一個打者每個比賽日的累積 (日期, 累積打席, 累積 RE24, 累積 RE24/PA)，畫圖用
+	"""
+	def curve(self, name: str) -> pd.DataFrame:
+		try:
+			code = self.players.index(name)
+		except ValueError:
+			return pd.DataFrame(columns=["PA", "RE24", "RE24_per_PA"])
+		lo, hi = self.offsets[code], self.offsets[code+1]
+		days = self.day[lo:hi]
+		cum_pa = np.arange(1, hi - lo + 1)
+		cum_re24 = self.cum_re24[lo+1:hi+1] - self.cum_re24[lo]
+		# 同一天最後一個打席就是那天結束時的累積
+		last_of_day = np.concatenate((days[1:] != days[:-1], [True])) if len(days) > 0 else np.zeros(0, dtype=bool)
+		frame = pd.DataFrame({
+			"PA": cum_pa[last_of_day],
+			"RE24": cum_re24[last_of_day],
+			"RE24_per_PA": cum_re24[last_of_day] / cum_pa[last_of_day]
+		}, index=pd.Index(days[last_of_day].astype("datetime64[D]"), name="date"))
+		return frame
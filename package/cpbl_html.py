@@ -0,0 +1,132 @@
+"""
+存下來的 FirstBase 頁面 (datas/**/*.txt) 的表格解析
+一頁 260KB，但我們只要裡面的 <table>，所以不建整棵 BeautifulSoup 樹
+有裝 selectolax 或 lxml 就用它們 (快很多)，都沒有就退回 html.parser + SoupStrainer("table")
+
+read_tables(html) 回傳 list[HtmlTable]，每個表格:
+	headers : thead 裡每個 th 的文字
+	rows    : tbody 裡每個有 td 的 tr，HtmlRow(cells = 每個 td 的文字, button = 列裡第一個 button 的文字或 None)
+文字的規則跟 bs4 的 get_text(strip=True) 一樣：每段文字各自 strip 再接起來
+"""
+
+try:
+	from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+	try:
+		# selectolax 1.0 以前只有這個
+		from selectolax.parser import HTMLParser
+	except ImportError:
+		HTMLParser = None
+
+try:
+	import lxml.html
+except ImportError:
+	lxml = None
+
+try:
+	from bs4 import BeautifulSoup, SoupStrainer
+except ImportError:
+	BeautifulSoup = None
+
+class HtmlRow():
+	__slots__ = ("cells", "button")
+
+	def __init__(self, cells: list, button: str = None):
+		self.cells = cells
+		self.button = button
+
+class HtmlTable():
+	__slots__ = ("headers", "rows")
+
+	def __init__(self, headers: list, rows: list):
+		self.headers = headers
+		self.rows = rows
+
+def _read_selectolax(html: str) -> list:
+	def text(node):
+		return node.text(deep=True, separator="", strip=True)
+
+	tables = []
+	for table in HTMLParser(html).css("table"):
+		thead = table.css_first("thead")
+		tbody = table.css_first("tbody")
+		if (thead is None or tbody is None):
+			continue
+		rows = []
+		for tr in tbody.css("tr"):
+			cells = [text(td) for td in tr.css("td")]
+			if (len(cells) == 0):
+				continue
+			button = tr.css_first("button")
+			rows.append(HtmlRow(cells, text(button) if button is not None else None))
+		tables.append(HtmlTable([text(th) for th in thead.css("th")], rows))
+	return tables
+
+def _read_lxml(html: str) -> list:
+	def text(node):
+		return "".join(piece.strip() for piece in node.itertext())
+
+	tables = []
+	for table in lxml.html.fromstring(html).iter("table"):
+		thead = next(table.iter("thead"), None)
+		tbody = next(table.iter("tbody"), None)
+		if (thead is None or tbody is None):
+			continue
+		rows = []
+		for tr in tbody.iter("tr"):
+			cells = [text(td) for td in tr.iter("td")]
+			if (len(cells) == 0):
+				continue
+			button = next(tr.iter("button"), None)
+			rows.append(HtmlRow(cells, text(button) if button is not None else None))
+		tables.append(HtmlTable([text(th) for th in thead.iter("th")], rows))
+	return tables
+
+def _read_html_parser(html: str) -> list:
+	# 只讓 <table> 進樹，其他 250KB 的 script/css 直接略過
+	soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("table"))
+	tables = []
+	for table in soup.find_all("table"):
+		thead = table.find("thead")
+		tbody = table.find("tbody")
+		if (not thead or not tbody):
+			continue
+		rows = []
+		for tr in tbody.find_all("tr"):
+			cells = [td.get_text(strip=True) for td in tr.find_all("td")]
+			if (len(cells) == 0):
+				continue
+			button = tr.find("button")
+			rows.append(HtmlRow(cells, button.get_text(strip=True) if button else None))
+		tables.append(HtmlTable([th.get_text(strip=True) for th in thead.find_all("th")], rows))
+	return tables
+
+# 快的排前面
+BACKENDS = {
+	"selectolax": (lambda: HTMLParser is not None, _read_selectolax),
+	"lxml": (lambda: lxml is not None, _read_lxml),
+	"html.parser": (lambda: BeautifulSoup is not None, _read_html_parser)
+}
+
+def available_backends() -> list:
+	return [name for name, (ok, _) in BACKENDS.items() if ok()]
+
+def read_tables(html: str, backend: str = None) -> list:
+	if (backend is None):
+		backends = available_backends()
+		if (len(backends) == 0):
+			raise ImportError("Need one of selectolax, lxml or beautifulsoup4 to parse saved pages")
+		backend = backends[0]
+	ok, reader = BACKENDS[backend]
+	if (not ok()):
+		raise ImportError(f"HTML backend {backend} is not installed")
+	return reader(html)
+
+# 讀檔 + 解析，找不到檔案就回傳 None，讓呼叫的人自己決定要印什麼
+def read_tables_from_file(file_path: str, backend: str = None):
+	try:
+		with open(file_path, "r", encoding="utf-8") as f:
+			html = f.read()
+	except FileNotFoundError:
+		return None
+	return read_tables(html, backend)
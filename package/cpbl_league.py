@@ -0,0 +1,104 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from .cpbl_html import available_backends
+from .cpbl_tables import TableCache, shared_cache
+from .cpbl_teams import TEAM_MAP
+
+"""
+一季存下來的頁面一次讀完
+	datas/{年}/{隊}.txt            : 六隊的投手頁
+	datas/offense/{年}年{上|下}.txt : 打擊頁
+還沒有快取的頁面預設在這個 process 一頁一頁解析 (selectolax / lxml 一頁 270KB 不到 0.05 秒，一季全部 0.25 秒，
+開 process pool 反而比較慢，Windows 開 process 還要重新 import pandas)
+頁面夠多 (POOL_MIN_BYTES) 或是只剩 html.parser 可以用 (慢十倍) 才會自己開 pool，或是 max_workers 指定 > 1
+記憶體或磁碟已經有的就直接拿，不用開 process
+解析完的表格會記在這個 process 共用的快取裡，之後 load_frames / page_index 都直接命中
+
+注意 Windows 開 process 會重新 import 主程式，呼叫的腳本要有 if __name__ == "__main__"
+"""
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "datas")
+
+PITCHING_TEAMS = list(TEAM_MAP.values())
+
+# max_workers 沒給的時候，還沒解析的頁面加起來超過這麼大才開 pool
+POOL_MIN_BYTES = 16 * 1024 * 1024
+# html.parser 一頁要 0.1 秒以上，門檻低一點
+SLOW_POOL_MIN_BYTES = 4 * 1024 * 1024
+
+# 在子 process 裡跑，用同一個磁碟快取資料夾，解析完順便存起來
+def _parse_page(job: tuple):
+	cache_dir, backend, file_path = job
+	return TableCache(cache_dir, backend).load(file_path)
+
+def _auto_workers(cold: list, backend: str) -> int:
+	if (len(cold) <= 1):
+		return 1
+	if (backend is None):
+		backends = available_backends()
+		backend = backends[0] if len(backends) > 0 else None
+	size = sum(os.path.getsize(path) for path in cold)
+	threshold = SLOW_POOL_MIN_BYTES if backend == "html.parser" else POOL_MIN_BYTES
+	return (os.cpu_count() or 1) if size >= threshold else 1
+
+"""
+paths 裡每一頁的 list[DataFrame] (跟 load_frames 一樣)，找不到檔案的是 None
+max_workers 沒給就看頁面多大 (見最上面)，通常是全部在這個 process 做；給 > 1 就一定開 pool
+"""
+def load_pages(paths, max_workers: int = None, cache: TableCache = None) -> dict:
+	cache = cache if cache is not None else shared_cache()
+	paths = list(dict.fromkeys(paths))
+	cold = [path for path in paths if cache.cached(path) is None and TableCache.key_of(path) is not None]
+
+	workers = min(len(cold), max_workers if max_workers is not None else _auto_workers(cold, cache.backend))
+	if (workers <= 1):
+		for path in cold:
+			cache.load(path)
+	else:
+		jobs = [(cache.cache_dir, cache.backend, path) for path in cold]
+		with ProcessPoolExecutor(max_workers=workers) as pool:
+			for path, tables in zip(cold, pool.map(_parse_page, jobs)):
+				if (tables is not None):
+					cache.remember(path, tables)
+					cache.parsed += 1
+
+	return {path: cache.frames(path) for path in paths}
+
+"""
+好幾頁併成一張大表，pages 是 {標籤: 路徑}
+每一列多兩欄: page (哪一頁的標籤) 跟 table (那一頁的第幾個表格)
+欄位不一樣的表格會自動對齊，沒有的格子是 NaN
+"""
+def league_frame(pages: dict, max_workers: int = None) -> pd.DataFrame:
+	frames = load_pages(pages.values(), max_workers)
+	parts = []
+	for label, path in pages.items():
+		if (frames[path] is None):
+			print(f"錯誤：找不到檔案 {path}")
+			continue
+		for no, frame in enumerate(frames[path]):
+			parts.append(frame.assign(page=label, table=no))
+	if (len(parts) == 0):
+		return pd.DataFrame()
+	return pd.concat(parts, ignore_index=True)
+
+# ({隊名: 投手頁}, {"2025年上": 打擊頁, ...})
+def season_pages(year: int, data_dir: str = None, teams: list = None) -> tuple:
+	data_dir = data_dir if data_dir is not None else DEFAULT_DATA_DIR
+	teams = teams if teams is not None else PITCHING_TEAMS
+	pitching = {team: os.path.join(data_dir, str(year), f"{team}.txt") for team in teams}
+	offense = {}
+	for path in sorted(glob.glob(os.path.join(data_dir, "offense", f"{year}年*.txt"))):
+		offense[os.path.splitext(os.path.basename(path))[0]] = path
+	return (pitching, offense)
+
+"""
+整季: 所有頁面一起解析 (頁面多才會開 pool)，回傳 (全聯盟投手表, 打擊表)
+投手表的 page 欄是隊名，打擊表的 page 欄是 "2025年上" 這種
+"""
+def load_season(year: int, data_dir: str = None, teams: list = None, max_workers: int = None) -> tuple:
+	pitching, offense = season_pages(year, data_dir, teams)
+	load_pages(list(pitching.values()) + list(offense.values()), max_workers)
+	return (league_frame(pitching, max_workers), league_frame(offense, max_workers))
@@ -0,0 +1,247 @@
+import datetime
+import sys
+
+"""
+比賽跟打席的精簡版
+API 給的 json 每場都帶一大堆我們根本沒在看的欄位
+這裡只留分析真的會用到的，而且用 __slots__，一場比賽就不會拖著一整棵 dict 樹
+球員名字會 intern，同一個人出現幾百次也只存一份字串
+"""
+
+def game_id(raw: dict):
+	# 不確定 API 每一季都有 id，沒有的話就用 日期+主客隊 湊一個
+	if (raw.get("id") is not None):
+		return raw["id"]
+	info = raw.get("info", {})
+	if (info.get("id") is not None):
+		return info["id"]
+	return (info.get("started_at"), raw.get("home", {}).get("abbr"), raw.get("away", {}).get("abbr"))
+
+def _runs(side: dict) -> int:
+	try:
+		return int(side.get("runs") or 0)
+	except (TypeError, ValueError):
+		return 0
+
+class PlateAppearance():
+	__slots__ = ("batter", "pitcher", "PA_order", "PA_round", "RE24")
+
+	def __init__(self, batter: str, pitcher: str, PA_order: int, PA_round: int, RE24: float):
+		self.batter = batter
+		self.pitcher = pitcher
+		self.PA_order = PA_order
+		self.PA_round = PA_round
+		self.RE24 = RE24
+
+	@classmethod
+	def from_json(cls, raw: dict) -> "PlateAppearance":
+		return cls(
+			sys.intern(raw["batter"]["name"]),
+			sys.intern(raw["pitcher"]["name"]),
+			raw["PA_order"],
+			raw["PA_round"],
+			float(raw["RE24"])
+		)
+
+	def __repr__(self):
+		return f"PlateAppearance({self.batter} vs {self.pitcher}, order={self.PA_order}, round={self.PA_round}, RE24={self.RE24})"
+
+"""
+一場比賽的半局切法，算一次就記住
+	starts   : 每個半局第一個打席在 PA_list 的位置 (第 h 個半局是第 h // 2 + 1 局，h 是偶數就是上半)
+	sides    : 每個半局是哪一邊在打 ("AWAY" / "HOME")
+	pitchers : 每個半局一開始站在投手丘上的人
+	staff    : {"HOME": [...], "AWAY": [...]} 守備那一邊照上場順序的投手，第一個就是先發
+"""
+class HalfInnings():
+	__slots__ = ("starts", "sides", "pitchers", "staff", "size")
+
+	def __init__(self, starts: list, sides: list, pitchers: list, staff: dict, size: int):
+		self.starts = starts
+		self.sides = sides
+		self.pitchers = pitchers
+		self.staff = staff
+		self.size = size
+
+	@classmethod
+	def of(cls, game: "Game") -> "HalfInnings":
+		batting = game.batting_sides()
+		starts = []
+		sides = []
+		pitchers = []
+		staff = {"HOME": {}, "AWAY": {}}
+		for i, (pa, side) in enumerate(zip(game.PA_list, batting)):
+			if (i == 0 or side != batting[i-1]):
+				starts.append(i)
+				sides.append(side)
+				pitchers.append(pa.pitcher)
+			staff["HOME" if side == "AWAY" else "AWAY"].setdefault(pa.pitcher, None)
+		return cls(starts, sides, pitchers, {side: list(names) for side, names in staff.items()}, len(batting))
+
+	def __len__(self):
+		return len(self.starts)
+
+	# 第 half 個半局在 PA_list 的範圍 [start, end)
+	def span(self, half: int) -> tuple:
+		end = self.starts[half+1] if half+1 < len(self.starts) else self.size
+		return (self.starts[half], end)
+
+	# 第 n 局 (從 1 開始) 的 (上半範圍, 下半範圍)，沒打的半局是 None
+	def inning(self, n: int) -> tuple:
+		top = 2 * (n-1)
+		return tuple(self.span(h) if h < len(self.starts) else None for h in (top, top+1))
+
+	# side 那一隊 ("HOME" / "AWAY") 的先發，沒守過就 None
+	def starter(self, side: str):
+		return self.staff[side][0] if len(self.staff[side]) > 0 else None
+
+	def relievers(self, side: str) -> list:
+		return self.staff[side][1:]
+
+	# (主隊先發, 客隊先發)
+	def starting_pitchers(self) -> tuple:
+		return (self.starter("HOME"), self.starter("AWAY"))
+
+class Game():
+	__slots__ = ("id", "home", "away", "status", "winner_side", "home_runs", "away_runs", "started_at", "PA_list", "_innings")
+
+	def __init__(self, id, home: str, away: str, status: str, winner_side: str,
+				home_runs: int, away_runs: int, started_at: datetime.date, PA_list: list):
+		self.id = id
+		self.home = home
+		self.away = away
+		self.status = status
+		self.winner_side = winner_side
+		self.home_runs = home_runs
+		self.away_runs = away_runs
+		self.started_at = started_at
+		self.PA_list = PA_list
+		self._innings = None
+
+	@classmethod
+	def from_json(cls, raw: dict) -> "Game":
+		info = raw.get("info", {})
+		home = raw.get("home", {})
+		away = raw.get("away", {})
+		started_at = info.get("started_at") or ""
+		day = started_at.split()[0] if started_at.strip() else None
+		return cls(
+			game_id(raw),
+			sys.intern(home.get("abbr") or ""),
+			sys.intern(away.get("abbr") or ""),
+			info.get("status"),
+			info.get("winner_side"),
+			_runs(home),
+			_runs(away),
+			datetime.date.fromisoformat(day) if day else None,
+			[PlateAppearance.from_json(pa) for pa in raw.get("PA_list") or []]
+		)
+
+	@property
+	def finished(self) -> bool:
+		return self.status == "FINISHED"
+
+	# GetWR 那邊的日期都是 tuple
+	@property
+	def date_tuple(self) -> tuple:
+		if (self.started_at is None):
+			return None
+		return (self.started_at.year, self.started_at.month, self.started_at.day)
+
+	def has(self, team: str) -> bool:
+		return self.home == team or self.away == team
+
+	# 站在 team 的角度："W" / "L" / "T"，沒參賽或 winner_side 看不懂就 None
+	def result_for(self, team: str):
+		if (self.winner_side == "TIE" and self.has(team)):
+			return "T"
+		if (self.home == team):
+			return {"HOME": "W", "AWAY": "L"}.get(self.winner_side)
+		if (self.away == team):
+			return {"AWAY": "W", "HOME": "L"}.get(self.winner_side)
+		return None
+
+	# 站在 team 的角度：(得分, 失分)
+	def runs_for(self, team: str) -> tuple:
+		if (self.home == team):
+			return (self.home_runs, self.away_runs)
+		return (self.away_runs, self.home_runs)
+
+	"""
+	每個打席是哪一邊在打 ("AWAY" / "HOME")
+	API 沒給局數，只能自己猜，依序看:
+		1. 第一個打席一定是客隊在打
+		2. 看過的投手 -> 他的對面在打
+		3. 看過的打者 -> 他那隊在打 (新投手一上來就換半局的時候靠這個)
+		4. 都沒看過就看棒次 (跟輪次) 接得上哪一邊
+		5. 兩邊都接得上 (新投手 + 新打者，兩隊剛好輪到同一棒):
+		   往後找第一個之前看過的別的投手，被換下去的投手不能再回來，
+		   他是守備那隊的就是換半局了 (新投手是另一隊的)，是打擊那隊的就是同一個半局
+		   後面找不到的話，這個半局已經至少三個打席 (可能三出局了) 才當作換半局
+	"""
+	def batting_sides(self) -> list:
+		sides = []
+		pitcher_side = {}
+		batter_side = {}
+		next_slot = {"AWAY": (1, 1), "HOME": (1, 1)}
+		batting = "AWAY"
+		# 這個半局到目前打了幾個
+		half_size = 0
+		for i, pa in enumerate(self.PA_list):
+			other = "HOME" if batting == "AWAY" else "AWAY"
+			slot = (pa.PA_order, pa.PA_round)
+			if (i == 0):
+				batting = "AWAY"
+			elif (pa.pitcher in pitcher_side):
+				batting = other if pitcher_side[pa.pitcher] == batting else batting
+			elif (pa.batter in batter_side):
+				batting = batter_side[pa.batter]
+			elif (pa.PA_order != next_slot[batting][0] and pa.PA_order == next_slot[other][0]):
+				batting = other
+			elif (slot != next_slot[batting] and slot == next_slot[other]):
+				batting = other
+			elif (slot == next_slot[batting] and slot == next_slot[other]):
+				batting = self._tie_side(i, pitcher_side, batting, half_size)
+			half_size = half_size + 1 if i > 0 and batting == sides[-1] else 1
+			pitcher_side.setdefault(pa.pitcher, "HOME" if batting == "AWAY" else "AWAY")
+			batter_side.setdefault(pa.batter, batting)
+			if (pa.PA_order == 9):
+				next_slot[batting] = (1, pa.PA_round + 1)
+			else:
+				next_slot[batting] = (pa.PA_order + 1, pa.PA_round)
+			sides.append(batting)
+		return sides
+
+	# batting_sides 的第 5 條，i 是兩邊都接得上的那個打席
+	def _tie_side(self, i: int, pitcher_side: dict, batting: str, half_size: int) -> str:
+		other = "HOME" if batting == "AWAY" else "AWAY"
+		new_pitcher = self.PA_list[i].pitcher
+		for pa in self.PA_list[i+1:]:
+			if (pa.pitcher != new_pitcher and pa.pitcher in pitcher_side):
+				# 守備那隊的投手之後又出現 -> 新投手不是他們的 -> 換半局了
+				return other if pitcher_side[pa.pitcher] == other else batting
+		return other if half_size >= 3 else batting
+
+	# 第一次用到才切，切好記在這場身上 (跟著 Game 一起被回收，不另外留一份)
+	# PA_list 之後變長的話 (還沒打完的比賽) 重切
+	@property
+	def innings(self) -> HalfInnings:
+		if (self._innings is None or self._innings.size != len(self.PA_list)):
+			self._innings = HalfInnings.of(self)
+		return self._innings
+
+	def __repr__(self):
+		return f"Game({self.started_at} {self.away}@{self.home} {self.away_runs}:{self.home_runs} {self.status})"
+
+# 已經是 Game 就直接回傳，json 的話就轉一下
+def as_game(game) -> Game:
+	if (isinstance(game, Game)):
+		return game
+	return Game.from_json(game)
+
+# Game 或原始 json 都可以 (json 的話每次都要轉一次，同一場要查很多次的話先 as_game)
+def half_innings(game) -> HalfInnings:
+	return as_game(game).innings
+
+def games_from_week(raw_games: list) -> list:
+	return [Game.from_json(raw) for raw in raw_games]
@@ -0,0 +1,231 @@
+import json
+import os
+import unicodedata
+from collections import deque
+from .cpbl_tables import PLAYER, TEAM_AVERAGE, load_frames, shared_cache
+
+"""
+API 的球員名字 -> 存下來頁面上的那一列
+以前是每一列都跑一次 for target in target_pitchers: if target in raw_name，
+列數 x 名單長度，而且 "張奕" 會同時吃到 "張奕" 跟 "張奕凱"，後面那個默默蓋掉前面的
+現在一頁建一次 NameIndex，照順序比:
+	1. 正規化 (全形半形、空白、中間那個點) + 別名表之後完全一樣
+	2. 還沒對到的用 Aho-Corasick 一次掃過全部名字找子字串
+對到不只一個的 (或一列被好幾個名字搶) 一律不配，回報出來讓人去補別名表
+"""
+
+DEFAULT_ALIAS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "player_aliases.json")
+
+# NFKC 之後 "．" 會變 "."，剩下這幾種點也都當成同一個
+_DOTS = str.maketrans({"·": ".", "‧": ".", "・": ".", "•": "."})
+
+def normalize(name: str) -> str:
+	name = unicodedata.normalize("NFKC", str(name))
+	return "".join(name.split()).translate(_DOTS)
+
+"""
+已知的寫法差異，{別的寫法: 正式寫法}，存成 json
+兩邊 (API 跟頁面) 都會先換成正式寫法再比，所以哪邊寫錯都對得到
+"""
+class AliasTable():
+
+	def __init__(self, path: str = None):
+		self.path = path if path is not None else DEFAULT_ALIAS_PATH
+		self.aliases = {}
+		if (os.path.exists(self.path)):
+			with open(self.path, "r", encoding="utf-8") as f:
+				for variant, canonical in json.load(f).items():
+					self.add(variant, canonical)
+
+	def add(self, variant: str, canonical: str):
+		variant = normalize(variant)
+		canonical = self.canonical(canonical)
+		if (variant != canonical):
+			self.aliases[variant] = canonical
+
+	# 一路換到底，繞圈的話就停在繞回來之前
+	def canonical(self, name: str) -> str:
+		name = normalize(name)
+		seen = set()
+		while (name in self.aliases and name not in seen):
+			seen.add(name)
+			name = self.aliases[name]
+		return name
+
+	def save(self, path: str = None):
+		path = path if path is not None else self.path
+		tmp = f"{path}.{os.getpid()}.tmp"
+		with open(tmp, "w", encoding="utf-8") as f:
+			json.dump(dict(sorted(self.aliases.items())), f, ensure_ascii=False, indent=4)
+		os.replace(tmp, path)
+
+_default_aliases = None
+
+def default_aliases() -> AliasTable:
+	global _default_aliases
+	if (_default_aliases is None):
+		_default_aliases = AliasTable()
+	return _default_aliases
+
+"""
+Aho-Corasick：一堆字一次建好，之後掃一段文字就知道裡面出現了哪些字
+掃的時間只跟文字長度 (加上找到的數量) 有關，跟有幾個字無關
+"""
+class Automaton():
+
+	def __init__(self, words):
+		self._goto = [{}]
+		self._fail = [0]
+		self._out = [[]]
+		for word in words:
+			if (len(word) == 0):
+				continue
+			state = 0
+			for ch in word:
+				nxt = self._goto[state].get(ch)
+				if (nxt is None):
+					nxt = len(self._goto)
+					self._goto[state][ch] = nxt
+					self._goto.append({})
+					self._fail.append(0)
+					self._out.append([])
+				state = nxt
+			self._out[state].append(word)
+
+		queue = deque(self._goto[0].values())
+		while (queue):
+			state = queue.popleft()
+			for ch, nxt in self._goto[state].items():
+				queue.append(nxt)
+				fail = self._fail[state]
+				while (fail and ch not in self._goto[fail]):
+					fail = self._fail[fail]
+				self._fail[nxt] = self._goto[fail].get(ch, 0)
+				self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+	def find(self, text: str) -> set:
+		found = set()
+		state = 0
+		for ch in text:
+			while (state and ch not in self._goto[state]):
+				state = self._fail[state]
+			state = self._goto[state].get(ch, 0)
+			found.update(self._out[state])
+		return found
+
+class NameIndex():
+
+	def __init__(self, names, aliases: AliasTable = None):
+		self.aliases = aliases if aliases is not None else default_aliases()
+		# key (正規化 + 別名) -> 頁面上原本的寫法 (同一個人在不同表格寫法不一樣的話會有好幾個)
+		self.exact = {}
+		for name in dict.fromkeys(names):
+			self.exact.setdefault(self.key(name), []).append(name)
+		self._rows = None
+
+	def key(self, name: str) -> str:
+		return self.aliases.canonical(name)
+
+	# 頁面名字的 automaton，只有要反過來比 (頁面名字是 API 名字的一部分) 才會用到
+	def _row_automaton(self) -> Automaton:
+		if (self._rows is None):
+			self._rows = Automaton(self.exact.keys())
+		return self._rows
+
+	"""
+	targets 是 API 那邊的名字
+	both_ways = True 的話 "頁面名字是 target 的一部分" 也算 (merged 以前就是這樣比)
+	回傳 (owners, ambiguous)
+		owners    : {頁面上的寫法: target}，跑表格的時候一列查一次就好
+		ambiguous : {target: [可能的頁面名字, ...]}，這些都沒配
+	"""
+	def resolve(self, targets, both_ways: bool = False) -> tuple:
+		owners = {}
+		ambiguous = {}
+		claimed = set()
+		pending = {}
+		by_key = {}
+		for target in dict.fromkeys(targets):
+			key = self.key(target)
+			if (len(key) > 0):
+				by_key.setdefault(key, []).append(target)
+		for key, targets_of_key in by_key.items():
+			if (key not in self.exact):
+				pending[key] = targets_of_key
+				continue
+			claimed.add(key)
+			# 名單裡同一個人出現兩種寫法: 跟頁面寫得一模一樣的那個優先，分不出來就都不配
+			if (len(targets_of_key) > 1):
+				spelled = {normalize(raw) for raw in self.exact[key]}
+				same = [target for target in targets_of_key if normalize(target) in spelled]
+				for target in targets_of_key:
+					if (len(same) != 1 or target != same[0]):
+						ambiguous[target] = list(self.exact[key])
+				if (len(same) != 1):
+					continue
+				targets_of_key = same
+			for raw in self.exact[key]:
+				owners[raw] = targets_of_key[0]
+
+		if (len(pending) == 0):
+			return (owners, ambiguous)
+
+		# 子字串：target 在頁面名字裡 (一次掃過所有還沒被配走的列)
+		candidates = {key: set() for key in pending}
+		automaton = Automaton(pending.keys())
+		for row_key in self.exact:
+			if (row_key in claimed):
+				continue
+			for key in automaton.find(row_key):
+				candidates[key].add(row_key)
+		if (both_ways):
+			rows = self._row_automaton()
+			for key in pending:
+				for row_key in rows.find(key):
+					if (row_key not in claimed):
+						candidates[key].add(row_key)
+
+		# 一列被好幾個 target 搶也算不確定
+		wanted = {}
+		for key, rows in candidates.items():
+			for row_key in rows:
+				wanted[row_key] = wanted.get(row_key, 0) + len(pending[key])
+
+		for key, targets_of_key in pending.items():
+			rows = candidates[key]
+			if (len(rows) == 0):
+				continue
+			if (len(rows) == 1 and len(targets_of_key) == 1):
+				row_key = next(iter(rows))
+				if (wanted[row_key] == 1):
+					for raw in self.exact[row_key]:
+						owners[raw] = targets_of_key[0]
+					continue
+			names = sorted(raw for row_key in rows for raw in self.exact[row_key])
+			for target in targets_of_key:
+				ambiguous[target] = names
+		return (owners, ambiguous)
+
+_page_indexes = {}
+
+"""
+一頁建一次 (跟 load_frames 一樣看檔案大小 + mtime)，球隊平均那種列不放進來
+找不到檔案就 None
+"""
+def page_index(file_path: str, aliases: AliasTable = None):
+	key = shared_cache().page_key(file_path)
+	if (key is None):
+		return None
+	cache_key = (key, id(aliases))
+	hit = _page_indexes.get(key[0])
+	if (hit is not None and hit[0] == cache_key):
+		return hit[1]
+	frames = load_frames(file_path)
+	if (frames is None):
+		return None
+	names = []
+	for frame in frames:
+		names.extend(frame.loc[~frame[TEAM_AVERAGE], PLAYER])
+	index = NameIndex(names, aliases)
+	_page_indexes[key[0]] = (cache_key, index)
+	return index
@@ -0,0 +1,81 @@
+from .cpbl_cache import WeekCache
+from .cpbl_calendar import GameWindow, WeekCalendar
+from .cpbl_client import RebasClient
+from .cpbl_fetch import CrawlCheckpoint, WeekCrawler
+from .cpbl_models import games_from_week
+from .cpbl_win_rate import GetWR
+from .cpbl_era import GetERA
+
+"""
+一段日期 (start_date <= 日期 < end_date，不用對齊週一) 只爬一次，每一週抓下來就丟給所有註冊的 consumer
+consumer 是任何長這樣的 callable:
+	consumer(week_start: tuple, games: list)
+games 是大家共用的同一個 list，consumer 不可以改它 (要 reverse 請自己 copy)
+範圍外的比賽跟前面的週已經給過的比賽 (看 id) 不會出現在 games 裡
+games 是 cpbl_models.Game，每週只轉一次，大家共用 (以前每個 consumer 自己 as_game，一場要轉好幾次)
+還在用 .get() 讀原始 json 的 consumer 用 register(consumer, raw=True)，拿到的是原始 dict
+"""
+
+class Pipeline(WeekCrawler):
+
+	def __init__(self, start_date: tuple, end_date: tuple, cache: WeekCache = None, max_workers: int = 1, client: RebasClient = None, calendar: WeekCalendar = None, checkpoint: CrawlCheckpoint = None):
+		self.start_date = start_date
+		self.end_date = end_date
+		self.init_crawler(cache, max_workers, client, calendar, checkpoint)
+		# [(consumer, raw)]
+		self.consumers = []
+		self.weeks = 0
+
+	# 回傳 consumer 本身，這樣可以 x = pipe.register(X(...))
+	def register(self, consumer, raw: bool = False):
+		self.consumers.append((consumer, raw))
+		return consumer
+
+	def run(self):
+		print(f"Start pipeline from {self.start_date} to {self.end_date}, {len(self.consumers)} consumers")
+		window = GameWindow(self.start_date, self.end_date)
+		for (now, _), json_data in self.crawl(self.start_date, self.end_date):
+			if (json_data is None):
+				continue
+			self.calendar.record(now, json_data)
+			raw_games = window.take(json_data["data"])
+			games = games_from_week(raw_games) if any(not raw for _, raw in self.consumers) else None
+			for consumer, raw in self.consumers:
+				consumer(now, raw_games if raw else games)
+			self.weeks += 1
+		print(f"Pipeline finished, {self.weeks} weeks fed, {len(self.missing)} weeks missing")
+
+"""
+GetWR.count_game 會把 list reverse 掉，所以先 copy 一份再給它
+"""
+class WinLossConsumer():
+
+	def __init__(self, wr: GetWR):
+		self.wr = wr
+
+	def __call__(self, now: tuple, games: list):
+		self.wr.count_game(list(games), now)
+
+"""
+一週一週地餵 GetERA.find_sp，把每週的先發次數加起來
+game_count 是整段的上限，跟直接呼叫 find_sp(game_count) 一樣
+"""
+class StartingPitcherConsumer():
+
+	def __init__(self, era: GetERA, game_count: int):
+		self.era = era
+		self.game_count = game_count
+		self.counted = 0
+		self.guardians = {}
+		self.opponents = {}
+
+	def __call__(self, now: tuple, games: list):
+		if (self.counted >= self.game_count):
+			return
+		before = self.era.total_games
+		guardians, opponents = self.era.find_sp(self.game_count - self.counted, {now: games})
+		self.counted += self.era.total_games - before
+		for name, cnt in guardians.items():
+			self.guardians[name] = self.guardians.get(name, 0) + cnt
+		for name, cnt in opponents.items():
+			self.opponents[name] = self.opponents.get(name, 0) + cnt
@@ -0,0 +1,444 @@
+import datetime
+import json
+import math
+import os
+import numpy as np
+import pandas as pd
+from .cpbl_cache import as_date
+from .cpbl_models import as_game
+from .cpbl_pipeline import Pipeline
+from .cpbl_teams import TEAM_MAP
+from .cpbl_win_rate import window_win_rates
+
+"""
+六隊一起算，比賽只要看一次
+以前 count_game / find_sp / end_season_PAs / _process_games / run_analysis 都寫死 "悍"，
+其他五隊的比賽直接丟掉，要比全聯盟就得爬六次
+LeagueStats 每場打完的比賽，主客兩隊各記一筆 TeamGame，打者照打擊方記 PA / RE24
+單一隊的報表 (以前那些) 就是 games_of(team) 篩出來再算
+
+可以直接註冊到 Pipeline 上，也可以自己 add_week(一週的 games)
+start / end   : 只收 start <= 日期 < end 的比賽，None 就是不限
+                跟 Pipeline / GameWindow 一樣不含 end，同一組日期給兩邊收到的比賽才會一樣
+                查詢 (summary / games_of ...) 的 start / end 也是這個意思
+late_start    : 這天以後的打席另外算一份 (GetPAStats 的 really_start_date)
+
+狀態可以存檔 (save / load)，下次只要餵新的比賽:
+	收過的比賽 (看 id) 不會再收第二次，沒打完的比賽不收，打完那週再餵一次就會進來
+	勝敗和、得失分跟得失分差的一次/二次和、先發次數都是邊收邊加的，不篩選的查詢直接拿
+	refresh(end) 從上次收到的那週開始爬到 end，季中每天更新只花新比賽的時間 (end 比原本的晚就跟著往後延)
+兩份沒有重疊比賽的狀態可以 merge (例如上下半季分開跑)
+"""
+
+STATE_VERSION = 1
+
+def _new_totals() -> dict:
+	return {"W": 0, "L": 0, "T": 0, "games": 0, "scored": 0, "allowed": 0, "diff_sum": 0, "diff_sq": 0}
+
+def _add_counts(into: dict, other: dict):
+	for key, value in other.items():
+		into[key] = into.get(key, 0) + value
+
+# 得失分差的 (平均, 標準差)，都是整數的和，變異數 = (n * Σx² - (Σx)²) / n² 沒有誤差
+def _moments(n: int, diff_sum: int, diff_sq: int) -> tuple:
+	if (n == 0):
+		return (0.0, 0.0)
+	return (diff_sum / n, math.sqrt((n * diff_sq - diff_sum ** 2) / (n * n)))
+
+class TeamGame():
+	__slots__ = ("game", "date", "opponent", "home", "mark", "scored", "allowed", "own_sp", "opp_sp")
+
+	def __init__(self, game: str, date: tuple, opponent: str, home: bool, mark: str,
+				scored: int, allowed: int, own_sp: str, opp_sp: str):
+		self.game = game
+		self.date = date
+		self.opponent = opponent
+		self.home = home
+		self.mark = mark
+		self.scored = scored
+		self.allowed = allowed
+		self.own_sp = own_sp
+		self.opp_sp = opp_sp
+
+	def to_json(self) -> list:
+		return [self.game, list(self.date), self.opponent, self.home, self.mark,
+			self.scored, self.allowed, self.own_sp, self.opp_sp]
+
+	@classmethod
+	def from_json(cls, raw: list) -> "TeamGame":
+		game, date, *rest = raw
+		return cls(game, tuple(date), *rest)
+
+	def __repr__(self):
+		return f"TeamGame({self.date} vs {self.opponent} {self.mark} {self.scored}:{self.allowed})"
+
+"""
+一隊的比賽照日期排好，勝/敗/和/得分/失分/得失分差/得失分差平方各做一條前綴和
+任何一段 (日期區間或最後 N 場) 都是兩個前綴和相減，O(1)；日期找位置是二分搜尋
+以前的 really_start_date、LATE_N、end_D 現在都只是 summary 的參數，換一個不用重爬
+"""
+class TeamIndex():
+	FIELDS = ("W", "L", "T", "scored", "allowed", "diff_sum", "diff_sq")
+
+	def __init__(self, games: list):
+		self.games = sorted(games, key=lambda it: it.date)
+		self.days = np.array([datetime.date(*it.date).toordinal() for it in self.games], dtype=np.int64)
+		diffs = np.array([it.scored - it.allowed for it in self.games], dtype=np.int64)
+		columns = {
+			"W": [it.mark == "W" for it in self.games],
+			"L": [it.mark == "L" for it in self.games],
+			"T": [it.mark == "T" for it in self.games],
+			"scored": [it.scored for it in self.games],
+			"allowed": [it.allowed for it in self.games],
+			"diff_sum": diffs,
+			"diff_sq": diffs * diffs
+		}
+		self.prefix = {name: np.concatenate(([0], np.cumsum(np.asarray(values, dtype=np.int64)))) for name, values in columns.items()}
+
+	def __len__(self):
+		return len(self.games)
+
+	# start <= 日期 < end 在 games 裡的 [i, j)
+	def span(self, start = None, end = None) -> tuple:
+		i = int(np.searchsorted(self.days, as_date(start).toordinal(), "left")) if start is not None else 0
+		j = int(np.searchsorted(self.days, as_date(end).toordinal(), "left")) if end is not None else len(self.games)
+		return (i, max(i, j))
+
+	"""
+	[i, j) 這段的 {games, W, L, T, scored, allowed, avg_diff, std_diff}
+	"""
+	def summary(self, i: int = 0, j: int = None) -> dict:
+		j = len(self.games) if j is None else j
+		result = {"games": j - i}
+		for name in self.FIELDS:
+			result[name] = int(self.prefix[name][j] - self.prefix[name][i])
+		result["avg_diff"], result["std_diff"] = _moments(j - i, result.pop("diff_sum"), result.pop("diff_sq"))
+		return result
+
+	# 日期區間裡，再只看最後 last 場 (None 就是全部)
+	def window(self, start = None, end = None, last: int = None) -> dict:
+		i, j = self.span(start, end)
+		if (last is not None):
+			i = max(i, j - max(last, 0))
+		return self.summary(i, j)
+
+class LeagueStats():
+
+	def __init__(self, start = None, end = None, late_start = None):
+		self.start = as_date(start) if start is not None else None
+		self.end = as_date(end) if end is not None else None
+		self.late_start = as_date(late_start) if late_start is not None else None
+		self.games = {}
+		self.batters = {}
+		self.totals = {}
+		self.starts = {}
+		self.faced = {}
+		self.seen = set()
+		self.last_week = None
+		self._indexes = {}
+
+	def _in_range(self, day) -> bool:
+		if (day is None):
+			return False
+		if (self.start is not None and day < self.start):
+			return False
+		if (self.end is not None and day >= self.end):
+			return False
+		return True
+
+	# 收了就回傳 True，沒打完、不在日期內、收過的都是 False
+	def add_game(self, game) -> bool:
+		game = as_game(game)
+		if (not game.finished or not self._in_range(game.started_at)):
+			return False
+		gid = str(game.id)
+		if (gid in self.seen):
+			return False
+		self.seen.add(gid)
+
+		home_sp, away_sp = game.innings.starting_pitchers() if len(game.PA_list) > 0 else (None, None)
+		for team, opponent, home, own_sp, opp_sp in (
+			(game.home, game.away, True, home_sp, away_sp),
+			(game.away, game.home, False, away_sp, home_sp)
+		):
+			scored, allowed = game.runs_for(team)
+			mark = game.result_for(team)
+			self.games.setdefault(team, []).append(TeamGame(
+				gid, game.date_tuple, opponent, home, mark, scored, allowed, own_sp, opp_sp
+			))
+
+			totals = self.totals.setdefault(team, _new_totals())
+			if (mark is not None):
+				totals[mark] += 1
+			totals["games"] += 1
+			totals["scored"] += scored
+			totals["allowed"] += allowed
+			totals["diff_sum"] += scored - allowed
+			totals["diff_sq"] += (scored - allowed) ** 2
+			if (own_sp is not None and opp_sp is not None):
+				starts = self.starts.setdefault(team, {})
+				starts[own_sp] = starts.get(own_sp, 0) + 1
+				faced = self.faced.setdefault(team, {})
+				faced[opp_sp] = faced.get(opp_sp, 0) + 1
+
+		# 半局已經切好了，一個半局一個打擊方
+		if (len(game.PA_list) == 0):
+			return True
+		late = self.late_start is not None and game.started_at >= self.late_start
+		innings = game.innings
+		team_of = {"AWAY": game.away, "HOME": game.home}
+		for half, side in enumerate(innings.sides):
+			stats = self.batters.setdefault(team_of[side], {})
+			begin, end = innings.span(half)
+			for pa in game.PA_list[begin:end]:
+				it = stats.get(pa.batter)
+				if (it is None):
+					it = stats[pa.batter] = [0, 0.0, 0, 0.0]
+				it[0] += 1
+				it[1] += pa.RE24
+				if (late):
+					it[2] += 1
+					it[3] += pa.RE24
+		return True
+
+	# API 一週是新的在前面，跟 count_game / find_sp 一樣倒過來看，回傳這次新收了幾場
+	def add_week(self, games: list) -> int:
+		return sum(self.add_game(game) for game in reversed(games))
+
+	def __call__(self, now: tuple, games: list):
+		self.add_week(games)
+		if (self.last_week is None or now > self.last_week):
+			self.last_week = now
+
+	def teams(self) -> list:
+		return sorted(self.games, key=lambda team: list(TEAM_MAP).index(team) if team in TEAM_MAP else len(TEAM_MAP))
+
+	"""
+	單一隊的比賽 (照順序)，也可以只看對某一隊、某段日期
+	"""
+	def games_of(self, team: str, opponent: str = None, start = None, end = None) -> list:
+		start = as_date(start).timetuple()[:3] if start is not None else None
+		end = as_date(end).timetuple()[:3] if end is not None else None
+		result = []
+		for it in self.games.get(team, []):
+			if (opponent is not None and it.opponent != opponent):
+				continue
+			if (start is not None and it.date < start):
+				continue
+			if (end is not None and it.date >= end):
+				continue
+			result.append(it)
+		return result
+
+	# GetWR._game_result 的樣子: [("W", (2025, 3, 29)), ...]
+	def results(self, team: str, **kwargs) -> list:
+		return [(it.mark, it.date) for it in self.games_of(team, **kwargs) if it.mark is not None]
+
+	# 那一隊的 TeamIndex，有新比賽進來才會重建
+	def index(self, team: str) -> TeamIndex:
+		games = self.games.get(team, [])
+		hit = self._indexes.get(team)
+		if (hit is None or hit[0] != len(games)):
+			hit = (len(games), TeamIndex(games))
+			self._indexes[team] = hit
+		return hit[1]
+
+	"""
+	任何一段的戰績跟得失分差: 日期區間 (start / end) 跟 / 或最後 last 場，不碰網路
+	{games, W, L, T, scored, allowed, avg_diff, std_diff}
+	"""
+	def summary(self, team: str, start = None, end = None, last: int = None) -> dict:
+		return self.index(team).window(start, end, last)
+
+	def record(self, team: str, **kwargs) -> tuple:
+		if (len(kwargs) == 0):
+			totals = self.totals.get(team, _new_totals())
+			return (totals["W"], totals["L"], totals["T"])
+		if (kwargs.get("opponent") is None):
+			kwargs.pop("opponent", None)
+			it = self.summary(team, **kwargs)
+			return (it["W"], it["L"], it["T"])
+		last = kwargs.pop("last", None)
+		marks = [mark for mark, _ in self.results(team, **kwargs)]
+		if (last is not None):
+			marks = marks[max(len(marks)-last, 0):] if last > 0 else []
+		return (marks.count("W"), marks.count("L"), marks.count("T"))
+
+	def win_rates(self, team: str, sizes, **kwargs) -> dict:
+		return window_win_rates([mark for mark, _ in self.results(team, **kwargs)], sizes)
+
+	"""
+	GetERA.find_sp 的樣子: (我方先發 {名字: 次數}, 對手先發 {名字: 次數})
+	first / last 是只看最前面 / 最後面幾場 (find_sp 的 game_count 就是 first)
+	"""
+	def starting_pitchers(self, team: str, first: int = None, last: int = None, **kwargs) -> tuple:
+		if (first is None and last is None and len(kwargs) == 0):
+			return (dict(self.starts.get(team, {})), dict(self.faced.get(team, {})))
+		games = [it for it in self.games_of(team, **kwargs) if it.own_sp is not None and it.opp_sp is not None]
+		if (first is not None):
+			games = games[:first]
+		if (last is not None):
+			games = games[max(len(games)-last, 0):] if last > 0 else []
+		ours = {}
+		theirs = {}
+		for it in games:
+			ours[it.own_sp] = ours.get(it.own_sp, 0) + 1
+			theirs[it.opp_sp] = theirs.get(it.opp_sp, 0) + 1
+		return (ours, theirs)
+
+	"""
+	GetPAStats.player_data 的樣子，不過只有 team 自己的打者
+	"""
+	def batter_re24(self, team: str) -> dict:
+		result = {}
+		for name, (pa, re24, late_pa, late_re24) in self.batters.get(team, {}).items():
+			result[name] = {
+				"full_season_PA_count": pa,
+				"full_season_RE24_total": re24,
+				"end_season_PA_count": late_pa,
+				"end_season_RE24_total": late_re24
+			}
+		return result
+
+	"""
+	GetRunStats._print_stats 算的那些: 場數、得分、失分、場均得失分差跟它的標準差
+	"""
+	def run_summary(self, team: str, **kwargs) -> dict:
+		if (len(kwargs) == 0):
+			totals = self.totals.get(team, _new_totals())
+			n = totals["games"]
+			avg_diff, std = _moments(n, totals["diff_sum"], totals["diff_sq"])
+			return {"games": n, "scored": totals["scored"], "allowed": totals["allowed"], "avg_diff": avg_diff, "std_diff": std}
+		if (kwargs.get("opponent") is None):
+			kwargs.pop("opponent", None)
+			it = self.summary(team, **kwargs)
+			return {key: it[key] for key in ("games", "scored", "allowed", "avg_diff", "std_diff")}
+		# 只看對某一隊的就沒有索引了，直接掃
+		last = kwargs.pop("last", None)
+		games = self.games_of(team, **kwargs)
+		if (last is not None):
+			games = games[max(len(games)-last, 0):] if last > 0 else []
+		diffs = [it.scored - it.allowed for it in games]
+		avg_diff, std = _moments(len(games), sum(diffs), sum(x * x for x in diffs))
+		return {"games": len(games), "scored": sum(it.scored for it in games),
+			"allowed": sum(it.allowed for it in games), "avg_diff": avg_diff, "std_diff": std}
+
+	"""
+	全聯盟的戰績表，一隊一列 (參數跟 summary 一樣，例如 last=19 就是每隊最後 19 場)
+	"""
+	def table(self, **kwargs) -> pd.DataFrame:
+		rows = []
+		for team in self.teams():
+			win, lose, tie = self.record(team, **kwargs)
+			runs = self.run_summary(team, **kwargs)
+			rows.append({
+				"隊伍": team,
+				"場數": runs["games"],
+				"勝": win,
+				"敗": lose,
+				"和": tie,
+				"勝率": round(win / (win + lose), 3) if win + lose > 0 else 0.0,
+				"得分": runs["scored"],
+				"失分": runs["allowed"],
+				"場均得失分差": round(runs["avg_diff"], 2),
+				"得失分差標準差": round(runs["std_diff"], 2)
+			})
+		return pd.DataFrame(rows).set_index("隊伍") if rows else pd.DataFrame()
+
+	"""
+	把另一份狀態併進來 (兩份不能有同一場比賽，late_start 要一樣)
+	每隊的比賽照日期排好，同一天的維持原本順序
+	"""
+	def merge(self, other: "LeagueStats") -> "LeagueStats":
+		if (self.late_start != other.late_start):
+			raise ValueError("Cannot merge LeagueStats with different late_start")
+		overlap = self.seen & other.seen
+		if (len(overlap) > 0):
+			raise ValueError(f"Cannot merge LeagueStats sharing {len(overlap)} games")
+
+		for team, games in other.games.items():
+			merged = self.games.setdefault(team, []) + games
+			merged.sort(key=lambda it: it.date)
+			self.games[team] = merged
+		for team, totals in other.totals.items():
+			_add_counts(self.totals.setdefault(team, _new_totals()), totals)
+		for table, others in ((self.starts, other.starts), (self.faced, other.faced)):
+			for team, counts in others.items():
+				_add_counts(table.setdefault(team, {}), counts)
+		for team, stats in other.batters.items():
+			mine = self.batters.setdefault(team, {})
+			for name, values in stats.items():
+				it = mine.setdefault(name, [0, 0.0, 0, 0.0])
+				for i, value in enumerate(values):
+					it[i] += value
+		self.seen |= other.seen
+		self._indexes = {}
+		self.start = None if self.start is None or other.start is None else min(self.start, other.start)
+		self.end = None if self.end is None or other.end is None else max(self.end, other.end)
+		if (other.last_week is not None and (self.last_week is None or other.last_week > self.last_week)):
+			self.last_week = other.last_week
+		return self
+
+	def to_json(self) -> dict:
+		iso = lambda day: day.isoformat() if day is not None else None
+		return {
+			"version": STATE_VERSION,
+			"start": iso(self.start),
+			"end": iso(self.end),
+			"late_start": iso(self.late_start),
+			"last_week": list(self.last_week) if self.last_week is not None else None,
+			"seen": sorted(self.seen),
+			"games": {team: [it.to_json() for it in games] for team, games in self.games.items()},
+			"totals": self.totals,
+			"starts": self.starts,
+			"faced": self.faced,
+			"batters": self.batters
+		}
+
+	@classmethod
+	def from_json(cls, data: dict) -> "LeagueStats":
+		if (data.get("version") != STATE_VERSION):
+			raise ValueError(f"Unknown LeagueStats state version {data.get('version')}")
+		day = lambda text: datetime.date.fromisoformat(text) if text is not None else None
+		stats = cls(day(data["start"]), day(data["end"]), day(data["late_start"]))
+		stats.last_week = tuple(data["last_week"]) if data["last_week"] is not None else None
+		stats.seen = set(data["seen"])
+		stats.games = {team: [TeamGame.from_json(it) for it in games] for team, games in data["games"].items()}
+		stats.totals = data["totals"]
+		stats.starts = data["starts"]
+		stats.faced = data["faced"]
+		stats.batters = data["batters"]
+		return stats
+
+	def save(self, path: str):
+		os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+		tmp = f"{path}.{os.getpid()}.tmp"
+		with open(tmp, "w", encoding="utf-8") as f:
+			json.dump(self.to_json(), f, ensure_ascii=False)
+		os.replace(tmp, path)
+
+	# 檔案不存在就回傳一份新的 (參數跟 __init__ 一樣)
+	@classmethod
+	def load(cls, path: str, start = None, end = None, late_start = None) -> "LeagueStats":
+		if (not os.path.exists(path)):
+			return cls(start, end, late_start)
+		with open(path, "r", encoding="utf-8") as f:
+			return cls.from_json(json.load(f))
+
+	"""
+	從上次收到的那週 (可能有當時還沒打完的比賽) 開始爬到 end_date，新的比賽才會被收
+	第一次用的話要給 start_date；其他參數 (cache, client, max_workers) 原封不動給 Pipeline
+	end_date 比建立時的 end 晚的話 end 會跟著延到 end_date，不然新爬的比賽會被 _in_range 丟掉
+	回傳這次新收了幾場
+	"""
+	def refresh(self, end_date: tuple, start_date: tuple = None, **kwargs) -> int:
+		start_date = self.last_week if self.last_week is not None else start_date
+		if (start_date is None):
+			raise ValueError("LeagueStats.refresh needs start_date the first time")
+		if (self.end is not None and as_date(end_date) > self.end):
+			self.end = as_date(end_date)
+		before = len(self.seen)
+		pipe = Pipeline(start_date, end_date, **kwargs)
+		pipe.register(self)
+		pipe.run()
+		return len(self.seen) - before
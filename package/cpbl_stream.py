@@ -0,0 +1,162 @@
+import json
+from .errors import PayloadError
+from .cpbl_cache import WeekCache
+from .cpbl_calendar import GameWindow, WeekCalendar, shared_calendar
+from .cpbl_client import SEASON_SUFFIX
+from .cpbl_decode import game_from_dict
+
+"""
+WeekCache 裡存好的週，一場一場讀出來
+GetData.iter_weeks() 一次至少要把一整週的 json (每場都帶整個 PA_list) 變成 dict，
+.data 更是整段日期全部留在記憶體，八季六隊一起跑就很可觀
+這裡邊讀檔邊解，同一時間只有一場比賽的 dict 在記憶體，記憶體跟季有多長無關:
+	iter_file_games(path)             : 一個週檔裡的每一場 (原始 dict，跟檔案裡的順序一樣，新的在前)
+	iter_cached_games(start, end)     : 一段日期裡每一場原始 dict，end_season_PAs 可以直接吃
+	iter_cached_weeks(start, end)     : (週一, list[Game])，跟 GetData.iter_weeks() 一樣，find_sp 可以直接吃
+	                                    (一次一週的精簡版 Game，原始 dict 不會整週留著)
+日期一樣是 start <= 日期 < end，沒有快取檔的週印出來並記在 missing，不會去上網
+有裝 ijson 就用它，沒有的話用內建 json 的 raw_decode 一塊一塊讀
+"""
+
+try:
+	import ijson
+except ImportError:
+	ijson = None
+
+CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+# 數字後面一定要接這些才算讀完
+_AFTER_NUMBER = ",]}" + _WHITESPACE
+
+class _Reader():
+
+	def __init__(self, f, chunk_size: int):
+		self.f = f
+		self.chunk_size = chunk_size
+		self.buf = ""
+		self.pos = 0
+		self.eof = False
+
+	# 讀下一塊接在後面，已經用掉的丟掉
+	def fill(self) -> bool:
+		chunk = self.f.read(self.chunk_size)
+		if (not chunk):
+			self.eof = True
+			return False
+		self.buf = self.buf[self.pos:] + chunk
+		self.pos = 0
+		return True
+
+	def peek(self) -> str:
+		while (True):
+			while (self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE):
+				self.pos += 1
+			if (self.pos < len(self.buf) or not self.fill()):
+				break
+		return self.buf[self.pos] if self.pos < len(self.buf) else ""
+
+	def expect(self, chars: str) -> str:
+		ch = self.peek()
+		if (ch == "" or ch not in chars):
+			raise PayloadError(f"Expected one of {chars!r} in week file, got {ch!r}")
+		self.pos += 1
+		return ch
+
+	# 下一個完整的 json 值，不完整 (被切在兩塊中間) 就再讀一塊
+	def value(self):
+		self.peek()
+		while (True):
+			try:
+				obj, end = _decoder.raw_decode(self.buf, self.pos)
+			except json.JSONDecodeError as e:
+				if (not self.fill()):
+					raise PayloadError(f"Broken week file. {e}")
+				continue
+			# 數字可能被切在兩塊中間 (12 | 3、-4. | 5)，後面要看到分隔字元才算數
+			unsure = end == len(self.buf) or (type(obj) in (int, float) and self.buf[end] not in _AFTER_NUMBER)
+			if (unsure and not self.eof and self.fill()):
+				continue
+			self.pos = end
+			return obj
+
+def _raw_games(f, chunk_size: int):
+	reader = _Reader(f, chunk_size)
+	reader.expect("{")
+	if (reader.peek() == "}"):
+		return
+	while (True):
+		key = reader.value()
+		reader.expect(":")
+		if (key == "data"):
+			reader.expect("[")
+			if (reader.peek() == "]"):
+				reader.pos += 1
+			else:
+				while (True):
+					yield reader.value()
+					if (reader.expect(",]") == "]"):
+						break
+		else:
+			# 用不到的欄位，都很小，解開丟掉
+			reader.value()
+		if (reader.expect(",}") == "}"):
+			return
+
+"""
+一個週檔 (WeekCache 存的那種 {"data": [...]}) 裡的每一場原始 dict
+檔案壞掉丟 PayloadError，已經交出去的比賽就算了
+"""
+def iter_file_games(path: str, chunk_size: int = CHUNK_SIZE):
+	if (ijson is not None):
+		with open(path, "rb") as f:
+			try:
+				yield from ijson.items(f, "data.item", use_float=True)
+			except ijson.JSONError as e:
+				raise PayloadError(f"Broken week file {path}. {e}")
+		return
+	with open(path, "r", encoding="utf-8") as f:
+		yield from _raw_games(f, chunk_size)
+
+def _week_files(start, end, cache: WeekCache, calendar: WeekCalendar, missing: list):
+	cache = cache if cache is not None else WeekCache()
+	calendar = calendar if calendar is not None else shared_calendar(cache.cache_dir)
+	for now in calendar.weeks(start, end):
+		path = cache.path_of(SEASON_SUFFIX[now[0]], now)
+		try:
+			open(path, "rb").close()
+		except FileNotFoundError:
+			print(f"Week {now} is not cached, skipped")
+			if (missing is not None):
+				missing.append(now)
+			continue
+		yield (now, path)
+
+"""
+start <= 日期 < end 的每一場原始 dict (同一場只會出現一次)
+週照時間順序，週裡面跟 API 一樣新的在前面
+"""
+def iter_cached_games(start, end, cache: WeekCache = None, calendar: WeekCalendar = None, missing: list = None):
+	window = GameWindow(start, end)
+	for _, path in _week_files(start, end, cache, calendar, missing):
+		for raw in iter_file_games(path):
+			if (len(window.take([raw])) > 0):
+				yield raw
+
+"""
+(週一, list[Game])，跟 GetData.iter_weeks() 一樣的樣子，但只讀快取
+壞掉的比賽 (cpbl_decode 的規則) 印出來之後跳過
+"""
+def iter_cached_weeks(start, end, cache: WeekCache = None, calendar: WeekCalendar = None, missing: list = None):
+	window = GameWindow(start, end)
+	for now, path in _week_files(start, end, cache, calendar, missing):
+		games = []
+		for i, raw in enumerate(iter_file_games(path)):
+			if (len(window.take([raw])) == 0):
+				continue
+			try:
+				games.append(game_from_dict(raw))
+			except ValueError as e:
+				print(f"Rejected malformed game #{i} of week {now}: {e}")
+		yield (now, games)
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import math
+import os
+import pandas as pd
+from .cpbl_cache import DEFAULT_CACHE_DIR
+from .cpbl_html import HtmlRow, HtmlTable, read_tables_from_file
+
+"""
+存下來的頁面解析一次就記住
+第一次讀某個檔案時把每個表格轉成有型別的版本:
+	看得懂的數字 (".313", "107.5", "NaN", "Infinity") -> float
+	其他 ("-", "28, 2/3", 名字) -> 原本的字串
+然後存在記憶體跟 {cache_dir}/tables/ 底下，key 是 絕對路徑 + 檔案大小 + mtime
+檔案被換掉 (大小或修改時間變了) 就會重新解析
+磁碟上沒有的頁面可以從 add_source() 加進來的地方拿 (cpbl_bundle.SeasonBundle.attach)
+
+要拿來算的話用 load_frames()，一個表格一個 DataFrame，所有欄位都在，另外多三欄:
+	player       : 球員名字 (列裡 button 的字，沒有 button 就拿第一格)
+	linked       : 這列有沒有 button (有連到球員頁面的才是真的球員)
+	team_average : 名字裡有 "平均" 的那列 (球隊平均)，不刪掉，要不要用自己決定
+要新的數據就是多挑一欄，不用再寫一次解析
+"""
+
+DEFAULT_TABLE_DIR = os.path.join(DEFAULT_CACHE_DIR, "tables")
+
+PLAYER = "player"
+LINKED = "linked"
+TEAM_AVERAGE = "team_average"
+
+def typed(text: str):
+	try:
+		return float(text)
+	except ValueError:
+		return text
+
+"""
+以前 ERA+ / tERA+ 的規則: "-", "NaN", "Infinity", "" 都當 0.0，其他照 float 轉
+轉不了的字串還是會丟 ValueError，跟以前 float() 一樣
+"""
+def stat_or_zero(value) -> float:
+	if (isinstance(value, float)):
+		if (math.isnan(value) or value == math.inf):
+			return 0.0
+		return value
+	if (value in ["-", ""]):
+		return 0.0
+	return float(value)
+
+# 一個 HtmlTable -> DataFrame，欄位數不夠的列後面補空的 (數字欄會是 NaN)
+def table_frame(table: HtmlTable) -> pd.DataFrame:
+	width = len(table.headers)
+	rows = [list(row.cells[:width]) + [None] * (width - len(row.cells)) for row in table.rows]
+	frame = pd.DataFrame(rows, columns=table.headers).infer_objects()
+	names = [row.button if row.button else str(row.cells[0]) for row in table.rows]
+	frame[PLAYER] = pd.Series(names, dtype=object)
+	frame[LINKED] = pd.Series([bool(row.button) for row in table.rows], dtype=bool)
+	frame[TEAM_AVERAGE] = frame[PLAYER].str.contains("平均", regex=False).astype(bool)
+	return frame
+
+def tables_to_json(tables: list) -> list:
+	return [{"headers": t.headers, "rows": [[r.cells, r.button] for r in t.rows]} for t in tables]
+
+def tables_from_json(data: list) -> list:
+	return [HtmlTable(t["headers"], [HtmlRow(cells, button) for cells, button in t["rows"]]) for t in data]
+
+class TableCache():
+
+	def __init__(self, cache_dir: str = None, backend: str = None):
+		self.cache_dir = cache_dir if cache_dir is not None else DEFAULT_TABLE_DIR
+		self.backend = backend
+		self._memory = {}
+		self._frames = {}
+		self.parsed = 0
+		# 磁碟上找不到的頁面去這裡找，[(資料夾, source)]，source 要有 has_table(名字) / tables(名字)
+		self.sources = []
+
+	@staticmethod
+	def key_of(file_path: str):
+		try:
+			st = os.stat(file_path)
+		except FileNotFoundError:
+			return None
+		return (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+
+	# 名字是相對 data_dir 的路徑，一律用 /
+	def add_source(self, data_dir: str, source):
+		self.sources.append((os.path.abspath(data_dir), source))
+
+	def _source_of(self, file_path: str):
+		abspath = os.path.abspath(file_path)
+		for data_dir, source in self.sources:
+			try:
+				rel = os.path.relpath(abspath, data_dir)
+			except ValueError:
+				continue
+			if (rel == ".." or rel.startswith(".." + os.sep)):
+				continue
+			name = rel.replace(os.sep, "/")
+			if (source.has_table(name)):
+				return (source, name)
+		return None
+
+	"""
+	頁面的 key，磁碟上有檔案就是 key_of()
+	沒有檔案但某個 source 裡有的話是 (絕對路徑, source, 名字)，都沒有就 None
+	"""
+	def page_key(self, file_path: str):
+		key = self.key_of(file_path)
+		if (key is not None or len(self.sources) == 0):
+			return key
+		hit = self._source_of(file_path)
+		if (hit is None):
+			return None
+		return (os.path.abspath(file_path), hit[0], hit[1])
+
+	def _disk_path(self, abspath: str) -> str:
+		name = hashlib.sha1(abspath.encode("utf-8")).hexdigest()
+		return os.path.join(self.cache_dir, f"{name}.json")
+
+	def _load_disk(self, key):
+		path = self._disk_path(key[0])
+		if (not os.path.exists(path)):
+			return None
+		try:
+			with open(path, "r", encoding="utf-8") as f:
+				data = json.load(f)
+		except (OSError, ValueError):
+			return None
+		if (data.get("size") != key[1] or data.get("mtime_ns") != key[2]):
+			return None
+		return tables_from_json(data["tables"])
+
+	def _save_disk(self, key, tables: list):
+		path = self._disk_path(key[0])
+		os.makedirs(self.cache_dir, exist_ok=True)
+		tmp = f"{path}.{os.getpid()}.tmp"
+		with open(tmp, "w", encoding="utf-8") as f:
+			json.dump({"path": key[0], "size": key[1], "mtime_ns": key[2], "tables": tables_to_json(tables)}, f, ensure_ascii=False)
+		os.replace(tmp, path)
+
+	# 只看快取 (記憶體 -> 磁碟)，沒有就 None，不會去解析
+	def cached(self, file_path: str):
+		key = self.page_key(file_path)
+		if (key is None):
+			return None
+		hit = self._memory.get(key[0])
+		if (hit is not None and hit[0] == key):
+			return hit[1]
+		if (isinstance(key[1], int)):
+			tables = self._load_disk(key)
+		else:
+			tables = key[1].tables(key[2])
+		if (tables is not None):
+			self._memory[key[0]] = (key, tables)
+		return tables
+
+	# 別的地方 (例如別的 process) 已經解析好的，直接記起來
+	def remember(self, file_path: str, tables: list):
+		key = self.key_of(file_path)
+		if (key is not None):
+			self._memory[key[0]] = (key, tables)
+
+	"""
+	回傳那一頁有型別的表格 (list[HtmlTable])，找不到檔案就 None
+	順序: 記憶體 -> 磁碟快取 (或 source) -> 真的去解析
+	"""
+	def load(self, file_path: str):
+		tables = self.cached(file_path)
+		if (tables is not None):
+			return tables
+		key = self.key_of(file_path)
+		if (key is None):
+			return None
+
+		tables = read_tables_from_file(file_path, self.backend)
+		if (tables is None):
+			return None
+		for table in tables:
+			for row in table.rows:
+				row.cells = [typed(cell) for cell in row.cells]
+		self.parsed += 1
+		self._save_disk(key, tables)
+		self._memory[key[0]] = (key, tables)
+		return tables
+
+	"""
+	同一頁的 list[DataFrame]，也是轉一次就記住，找不到檔案就 None
+	拿到的 DataFrame 是共用的，要改的話自己 copy()
+	"""
+	def frames(self, file_path: str):
+		key = self.page_key(file_path)
+		if (key is None):
+			return None
+		hit = self._frames.get(key[0])
+		if (hit is not None and hit[0] == key):
+			return hit[1]
+		tables = self.load(file_path)
+		if (tables is None):
+			return None
+		frames = [table_frame(table) for table in tables]
+		self._frames[key[0]] = (key, frames)
+		return frames
+
+_default_cache = None
+
+def shared_cache() -> TableCache:
+	global _default_cache
+	if (_default_cache is None):
+		_default_cache = TableCache()
+	return _default_cache
+
+# 同一個 process 裡大家共用，才會真的只解析一次
+def load_page(file_path: str):
+	return shared_cache().load(file_path)
+
+def load_frames(file_path: str):
+	return shared_cache().frames(file_path)
+
+# 有這些欄位的表格 (照頁面順序)，columns 全部都要有
+def frames_with(frames: list, *columns) -> list:
+	return [frame for frame in frames if all(column in frame.columns for column in columns)]
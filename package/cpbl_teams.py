@@ -0,0 +1,12 @@
+"""
+隊伍代號 (API 的 abbr) -> 存檔頁面的檔名 (datas/{年}/{檔名}.txt)
+以前放在 vibe_coding/merged.py，搬過來大家一起用
+"""
+TEAM_MAP = {
+	"悍": "guardians",
+	"龍": "dragons",
+	"獅": "lions",
+	"猿": "monkeys",
+	"鷹": "hawks",
+	"象": "brothers"
+}
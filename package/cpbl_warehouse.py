@@ -0,0 +1,213 @@
+import os
+import sqlite3
+from .cpbl_cache import DEFAULT_CACHE_DIR, as_date
+from .cpbl_models import as_game
+from .cpbl_pipeline import Pipeline
+
+"""
+本機的比賽資料庫 (sqlite)
+每週的 json 灌進來一次，之後 "X 在 6/8 以後對我們先發幾場" 這種問題就是查 index，不用再爬一次
+	games             : 一場一列
+	plate_appearances : 一個打席一列
+	starting_pitchers : 一場兩列 (主客隊各一個先發)
+GetWR.count_game / GetERA.find_sp / GetPAStats.end_season_PAs / GetRunStats._process_games
+都有對應的查詢，見下面的 results / starting_pitchers / batter_re24 / run_diffs
+"""
+
+DEFAULT_DB_PATH = os.path.join(DEFAULT_CACHE_DIR, "warehouse.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+	id TEXT PRIMARY KEY,
+	seq INTEGER NOT NULL,
+	week TEXT NOT NULL,
+	date TEXT,
+	home TEXT NOT NULL,
+	away TEXT NOT NULL,
+	status TEXT,
+	winner_side TEXT,
+	home_runs INTEGER,
+	away_runs INTEGER
+);
+CREATE INDEX IF NOT EXISTS games_home_date ON games (home, date);
+CREATE INDEX IF NOT EXISTS games_away_date ON games (away, date);
+CREATE INDEX IF NOT EXISTS games_date ON games (date);
+
+CREATE TABLE IF NOT EXISTS plate_appearances (
+	game_id TEXT NOT NULL REFERENCES games (id),
+	no INTEGER NOT NULL,
+	date TEXT,
+	batter TEXT NOT NULL,
+	pitcher TEXT NOT NULL,
+	batting_team TEXT NOT NULL,
+	fielding_team TEXT NOT NULL,
+	PA_order INTEGER,
+	PA_round INTEGER,
+	RE24 REAL,
+	PRIMARY KEY (game_id, no)
+);
+CREATE INDEX IF NOT EXISTS pa_batter_date ON plate_appearances (batter, date);
+CREATE INDEX IF NOT EXISTS pa_pitcher_date ON plate_appearances (pitcher, date);
+CREATE INDEX IF NOT EXISTS pa_batting_team_date ON plate_appearances (batting_team, date);
+CREATE INDEX IF NOT EXISTS pa_fielding_team_date ON plate_appearances (fielding_team, date);
+
+CREATE TABLE IF NOT EXISTS starting_pitchers (
+	game_id TEXT NOT NULL REFERENCES games (id),
+	team TEXT NOT NULL,
+	opponent TEXT NOT NULL,
+	pitcher TEXT NOT NULL,
+	date TEXT,
+	seq INTEGER NOT NULL,
+	PRIMARY KEY (game_id, team)
+);
+CREATE INDEX IF NOT EXISTS sp_team_date ON starting_pitchers (team, date);
+CREATE INDEX IF NOT EXISTS sp_pitcher_date ON starting_pitchers (pitcher, date);
+"""
+
+class Warehouse():
+
+	def __init__(self, path: str = None):
+		self.path = path if path is not None else DEFAULT_DB_PATH
+		if (self.path != ":memory:"):
+			os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+		self.conn = sqlite3.connect(self.path)
+		self.conn.executescript(SCHEMA)
+
+	def close(self):
+		self.conn.close()
+
+	"""
+	灌一週進來，同一場重灌會整場蓋掉
+	seq 是排序用的: 週的日期 + 在那週 (反轉後) 的位置，跟 find_sp / count_game 看比賽的順序一樣
+	"""
+	def ingest_week(self, week_start, games: list):
+		week = as_date(week_start)
+		with self.conn:
+			for pos, raw in enumerate(reversed(games)):
+				game = as_game(raw)
+				gid = str(game.id)
+				seq = week.toordinal() * 1000 + pos
+				date = game.started_at.isoformat() if game.started_at is not None else None
+				self.conn.execute("DELETE FROM plate_appearances WHERE game_id = ?", (gid,))
+				self.conn.execute("DELETE FROM starting_pitchers WHERE game_id = ?", (gid,))
+				self.conn.execute(
+					"INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+					(gid, seq, week.isoformat(), date, game.home, game.away, game.status,
+						game.winner_side, game.home_runs, game.away_runs)
+				)
+				if (len(game.PA_list) == 0):
+					continue
+
+				sides = game.batting_sides()
+				team_of = {"AWAY": game.away, "HOME": game.home}
+				rows = []
+				for no, (pa, side) in enumerate(zip(game.PA_list, sides)):
+					rows.append((gid, no, date, pa.batter, pa.pitcher, team_of[side],
+						team_of["HOME" if side == "AWAY" else "AWAY"], pa.PA_order, pa.PA_round, pa.RE24))
+				self.conn.executemany("INSERT INTO plate_appearances VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+				home_sp, away_sp = game.innings.starting_pitchers()
+				self.conn.execute("INSERT INTO starting_pitchers VALUES (?, ?, ?, ?, ?, ?)",
+					(gid, game.home, game.away, home_sp, date, seq))
+				if (away_sp is not None):
+					self.conn.execute("INSERT INTO starting_pitchers VALUES (?, ?, ?, ?, ?, ?)",
+						(gid, game.away, game.home, away_sp, date, seq))
+
+	# 讓它可以直接註冊到 Pipeline 上
+	def __call__(self, now: tuple, games: list):
+		self.ingest_week(now, games)
+
+	# 爬一段日期直接灌進來，其他參數 (cache, client, max_workers) 原封不動給 Pipeline
+	def ingest(self, start_date: tuple, end_date: tuple, **kwargs) -> Pipeline:
+		pipe = Pipeline(start_date, end_date, **kwargs)
+		pipe.register(self)
+		pipe.run()
+		return pipe
+
+	# 日期條件 (start <= date < end，跟 Pipeline 一樣 end 那天不算)，None 就是不限
+	@staticmethod
+	def _window(column: str, start, end) -> tuple:
+		sql = ""
+		args = []
+		if (start is not None):
+			sql += f" AND {column} >= ?"
+			args.append(as_date(start).isoformat())
+		if (end is not None):
+			sql += f" AND {column} < ?"
+			args.append(as_date(end).isoformat())
+		return (sql, args)
+
+	"""
+	GetWR.count_game 的查詢版：team 打完的比賽照順序的 [(W/L/T, 日期 tuple), ...]
+	"""
+	def results(self, team: str = "悍", start = None, end = None) -> list:
+		window, args = self._window("date", start, end)
+		rows = self.conn.execute(
+			"SELECT date, home, away, winner_side FROM games"
+			" WHERE status = 'FINISHED' AND (home = ? OR away = ?)" + window +
+			" ORDER BY seq", [team, team] + args
+		)
+		result = []
+		for date, home, away, winner_side in rows:
+			if (winner_side == "TIE"):
+				mark = "T"
+			elif (winner_side not in ("HOME", "AWAY")):
+				continue
+			elif ((home == team) == (winner_side == "HOME")):
+				mark = "W"
+			else:
+				mark = "L"
+			result.append((mark, tuple(map(int, date.split("-")))))
+		return result
+
+	"""
+	GetERA.find_sp 的查詢版：(我方先發 {名字: 次數}, 對手先發 {名字: 次數})
+	game_count 跟 find_sp 一樣，只算最前面幾場
+	"""
+	def starting_pitchers(self, team: str = "悍", start = None, end = None, game_count: int = None) -> tuple:
+		window, args = self._window("g.date", start, end)
+		limit = ""
+		if (game_count is not None):
+			limit = " LIMIT ?"
+			args.append(game_count)
+		rows = self.conn.execute(
+			"SELECT g.id FROM games g"
+			" WHERE g.status = 'FINISHED' AND (g.home = ? OR g.away = ?)" + window +
+			" AND (SELECT COUNT(*) FROM starting_pitchers s WHERE s.game_id = g.id) = 2"
+			" ORDER BY g.seq" + limit, [team, team] + args
+		).fetchall()
+		ours = {}
+		theirs = {}
+		for (gid,) in rows:
+			for sp_team, pitcher in self.conn.execute("SELECT team, pitcher FROM starting_pitchers WHERE game_id = ?", (gid,)):
+				bucket = ours if sp_team == team else theirs
+				bucket[pitcher] = bucket.get(pitcher, 0) + 1
+		return (ours, theirs)
+
+	"""
+	GetPAStats.end_season_PAs 的查詢版：team 有參賽的比賽裡，每個打者的 (打席數, RE24 總和)
+	"""
+	def batter_re24(self, team: str = "悍", start = None, end = None) -> dict:
+		window, args = self._window("p.date", start, end)
+		rows = self.conn.execute(
+			"SELECT p.batter, COUNT(*), SUM(p.RE24) FROM plate_appearances p JOIN games g ON g.id = p.game_id"
+			" WHERE g.status = 'FINISHED' AND (p.batting_team = ? OR p.fielding_team = ?)" + window +
+			" GROUP BY p.batter", [team, team] + args
+		)
+		return {batter: (cnt, re24) for batter, cnt, re24 in rows}
+
+	"""
+	GetRunStats._process_games 的查詢版：每場 (得分 - 失分)，照比賽順序
+	"""
+	def run_diffs(self, team: str = "悍", start = None, end = None) -> list:
+		window, args = self._window("date", start, end)
+		rows = self.conn.execute(
+			"SELECT CASE WHEN home = ? THEN home_runs - away_runs ELSE away_runs - home_runs END FROM games"
+			" WHERE status = 'FINISHED' AND (home = ? OR away = ?)" + window +
+			" ORDER BY seq", [team, team, team] + args
+		)
+		return [diff for (diff,) in rows]
+
+	# 任何其他問題就自己寫 SQL
+	def query(self, sql: str, args = ()) -> list:
+		return self.conn.execute(sql, args).fetchall()
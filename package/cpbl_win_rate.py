@@ -1,27 +1,68 @@
-import requests as rq
+import datetime
 import json
+import numpy as np
 from .errors import CrawlerError, StatusError
+from .cpbl_cache import WeekCache, as_date
+from .cpbl_calendar import GameWindow, WeekCalendar
+from .cpbl_fetch import CrawlCheckpoint, WeekCrawler
+from .cpbl_client import RebasClient
+from .cpbl_models import as_game
+
+"""
+連續 ran 場一組 (滑動視窗) 的勝率，一次算好幾種 ran
+marks 是每場的 "W" / "L" / "T"，和局不算在分母裡
+先做勝場跟有分勝負場數的累積和，任何一個視窗就是兩個累積和相減，整段只要 O(N)
+回傳 {ran: (平均, 標準差, 最後一個視窗的勝率, 最後一個視窗的 z 分數)}
+	比賽數不到 ran 場的話那個 ran 是 None
+	整個視窗都是和局的視窗不算 (勝率沒有定義)，最後一個視窗就是這樣的話勝率跟 z 分數都是 None
+	每個視窗勝率都一樣 (標準差是 0) 的話 z 分數當作 0.0
+"""
+# 以前每個值都 round 到小數第 9 位，比這個小的標準差就是 0
+STD_EPS = 1e-9
+
+def window_win_rates(marks, sizes) -> dict:
+	marks = np.asarray(list(marks))
+	wins = np.concatenate(([0], np.cumsum(marks == "W")))
+	decided = np.concatenate(([0], np.cumsum(marks != "T")))
+	N = len(marks)
+
+	result = {}
+	for ran in sizes:
+		if (ran <= 0 or ran > N):
+			result[ran] = None
+			continue
+		win = wins[ran:] - wins[:-ran]
+		total = decided[ran:] - decided[:-ran]
+		has = total > 0
+		if (not has.any()):
+			result[ran] = None
+			continue
+		rate = win[has] / total[has]
+		avg = float(rate.mean())
+		std = float(rate.std())
+		tar_avg = float(win[-1] / total[-1]) if total[-1] > 0 else None
+		if (tar_avg is None):
+			diff = None
+		elif (std < STD_EPS):
+			diff = 0.0
+		else:
+			diff = (tar_avg - avg) / std
+		result[ran] = (avg, std, tar_avg, diff)
+	return result
 
-class GetWR():
-	header = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36",
-    "Accept": "application/json, text/plain, */*"
-	}
-
-	suffix = {2018:"Fq", 2019:"Sf", 2020:"KS", 2021:"fi", 
-				2022:"dG", 2023:"sk", 2024:"xa", 2025:"JO"}
+class GetWR(WeekCrawler):
 
-	def __init__(self, start_date: tuple, end_date: tuple):
+	def __init__(self, start_date: tuple, end_date: tuple, cache: WeekCache = None, max_workers: int = 1, client: RebasClient = None, calendar: WeekCalendar = None, checkpoint: CrawlCheckpoint = None):
 		self._url = None
 		self._start_date = start_date
 		self._end_date = end_date
-		self._raw_content = None
 		self._complete_games = 0
 		self._win = 0
 		self._lose = 0
 		self._tie = 0
 		self._now = start_date
 		self._game_result = []
+		self.init_crawler(cache, max_workers, client, calendar, checkpoint)
 
 	"""
 	主要的 request
@@ -30,26 +71,18 @@ class GetWR():
 	"""
 
 	def raw_content_by_get(self, url: str, start_date: tuple): 
-		s = rq.Session()
-		s.headers.update(self.header)
 		print(f"Trying to get from {start_date}")
-		try:	
-			self._raw_content = rq.get(url, timeout = 8)
-			if (self._raw_content.status_code != 200):
-				raise StatusError(url, self._raw_content.status_code)
+		try:
+			json_data = self.client.get_json(url)
 		except StatusError as e:
 			print(f"Expected Error. \n{e}")
 
-		except rq.exceptions.ConnectionError as e:
+		except CrawlerError as e:
 			print(f"Connection Error. You dont even get a freaking net, or the url isnt even exist\n{e}")
-			
+
 		else:
 			print(f"Happy duck! request succeed!")
-			if (self._raw_content != None):
-				json_data = self._raw_content.json()
-				return json_data
-			else:
-				print("Error. Content isnt detected")
+			return json_data
 
 	@staticmethod
 	def date_trans(raw: str):
@@ -61,7 +94,7 @@ class GetWR():
 		return (tmp[0], tmp[1], tmp[2])
 
 	"""
-	吃進一週的比賽 json 檔 (理論上你要餵 json_data["data"])
+	吃進一週的比賽 json 檔 (理論上你要餵 json_data["data"])，已經轉好的 Game list 也可以
 	吐出一個 tuple
 	(參與場數, 勝場, 敗場, 和場, li: list)
 	li = {(W/L/T 簡寫, 日期), ...}
@@ -77,34 +110,32 @@ class GetWR():
 		temp_list = [("L", (24, 3, 30))]
 
 		for it in week_game:
-			hold_date = self.date_trans(it["info"]["started_at"])
+			it = as_game(it)
+			hold_date = it.date_tuple
 			"""
 			if (hold_date > self._end_date):
 				continue
 			if (hold_date < self._start_date):
 				continue
 			"""
-			home = it["home"]["abbr"]
-			away = it["away"]["abbr"]
-			status =  it["info"]["status"]
-			winner_side = it["info"]["winner_side"]
-			if (status != "FINISHED"):
+			if (not it.finished):
 				continue
 			complete += 1
-			if (home == "悍" or away == "悍"):
+			if (it.has("悍")):
 				joined_game += 1
-				if ((home == "悍" and winner_side == "HOME") or (away == "悍" and winner_side == "AWAY")):
+				result = it.result_for("悍")
+				if (result == "W"):
 					win += 1
 					self._win += 1
-					temp_list.append(("W", self.date_trans(it["info"]["started_at"])))
-				elif ((home == "悍" and winner_side == "AWAY") or (away == "悍" and winner_side == "HOME")):
+					temp_list.append(("W", hold_date))
+				elif (result == "L"):
 					lose += 1
 					self._lose += 1
-					temp_list.append(("L", self.date_trans(it["info"]["started_at"])))
-				elif (winner_side == "TIE"):
+					temp_list.append(("L", hold_date))
+				elif (result == "T"):
 					tie += 1
 					self._tie += 1
-					temp_list.append(("T", self.date_trans(it["info"]["started_at"])))
+					temp_list.append(("T", hold_date))
 
 		for it in temp_list:
 			self._game_result.append(it)
@@ -125,94 +156,65 @@ class GetWR():
 			pass
 		self._now = new_date
 
-	@staticmethod
-	def days_of_month(m: int):
-		if (m in [1, 3, 5, 7, 8, 10, 12]):
-			return 31
-		if (m in [4, 6, 9, 11]):
-			return 30
-		if (m%4==0 and m%100 != 0):
-			return 29
-		else:
-			return 28
-
 	"""
-	把 self._now 換到下一個比賽日，就加七天
-	對，python 有 datetime library，但我就很懶
-	known bug: 其實跨年後，你的日期絕對不是開季第一天
-	我知道這麼做會爛掉，所以請你他喵的不要這麼做
+	把 self._now 換到下一週，就加七天 (跨月跨年都交給 datetime)
 	"""
 	def next_date(self):
-		y, m, d = self.now[0], self.now[1], self.now[2]
-		d += 7
-		if (d > self.days_of_month(m)):
-			d -= self.days_of_month(m)
-			m += 1
-		if (m > 12):
-			m -= 12
-			y += 1
-		self.now = (y, m, d)
-		return (y, m, d)
+		day = as_date(self.now) + datetime.timedelta(days=7)
+		self.now = (day.year, day.month, day.day)
+		return self.now
 	
 	"""
 	會給你 self._now 所對應到的 api request url
 	"""
 	def url_get(self):
 		# https://www.rebas.tw/api/seasons/CPBL-2025-JO/games?start=2025-04-21
-		y, m, d = self.now[0], self.now[1], self.now[2]
-		su = self.suffix[y]
-		self._url = f"https://www.rebas.tw/api/seasons/CPBL-{y}-{su}/games?start={y}-{m:02d}-{d:02d}" 
+		self._url = self.week_url(self.now)
 		return self._url
 
 	"""
-	因為我很懶惰，所以你的 _start_date 和 _end_date
-	必須要是一週的起始點
-	判斷那個太麻煩了
+	_start_date <= 日期 < _end_date 的比賽，日期隨便給，不用是一週的開頭
 	"""
 	def analyze(self):
 		print(f"Start analyze from {self._start_date} to {self._end_date}")
-		self._now = self._start_date
-		while (self._now < self._end_date):
-			self.url_get()
-			json_data = self.raw_content_by_get(self._url, self._now)
-			game_list = json_data["data"]
-			ret = self.count_game(game_list, self._now)
-			self.next_date()
+		window = GameWindow(self._start_date, self._end_date)
+		# 對齊週一，已經知道沒比賽的週不抓，回來的順序跟日期一樣
+		for (now, _), json_data in self.crawl(self._start_date, self._end_date):
+			# 抓不到的週記在 self.missing，不要讓整個跑掉
+			if (json_data is None):
+				continue
+			self.calendar.record(now, json_data)
+			game_list = window.take(json_data["data"])
+			ret = self.count_game(game_list, now)
 		print(f"There're {self._complete_games} games in the given range")
 
+	# fetch_week 真的要上網的時候走這裡 (不碰 self._now，所以可以好幾個執行緒一起叫)
+	def get_week(self, url: str, now: tuple):
+		return self.raw_content_by_get(url, now)
+
+	"""
+	一次算好幾種 ran，{ran: (avg, std, tar_avg, diff)}，不會印東西
+	要掃 5~60 這種很多 ran 的時候用這個
+	"""
+	def window_stats(self, sizes) -> dict:
+		return window_win_rates([it[0] for it in self._game_result], sizes)
+
 	"""
 	若把每 ran 天作為一組，算出每組內的勝率
 	再回傳整年下來，考慮所有組別後的勝率平均與標準差
 	"""
 	def standard_discrete(self, ran):
-		data = []
-		N = len(self._game_result)
-		raw_sum = 0
-		delta_sum = 0
-
-		for l in range(0, N-ran+1, 1):
-			win = 0
-			total = 0
-			for i in range(l, l+ran):
-				it = self._game_result[i]
-				if (it[0] != 'T'):
-					total += 1
-				if (it[0] == 'W'):
-					win += 1
-			data.append(round(win/total, 9))
-			raw_sum += round(win/total, 9)
-
-		M = len(data)
-		avg = round(raw_sum / M, 9)
-		for it in data:
-			delta_sum += round((it-avg)*(it-avg), 9)
-
-		std = round((delta_sum/M) ** 0.5, 9)
-		tar_avg = data[M-1]
-		diff = round((tar_avg-avg)/std, 9)
+		stats = self.window_stats([ran])[ran]
+		if (stats is None):
+			print(f"Range = {ran}, but there're only {len(self._game_result)} games")
+			return None
+		avg, std, tar_avg, diff = (round(it, 9) if it is not None else None for it in stats)
 
 		print(f"Range = {ran}, Average = {round(avg, 5)}, Standard Discrete = {round(std, 5)}")
-		print(f"Winning rate in last {ran} games = {round(tar_avg, 5)}, delta = {round(diff, 5)}")
+		if (tar_avg is None):
+			print(f"Last {ran} games are all ties, no winning rate")
+		else:
+			print(f"Winning rate in last {ran} games = {round(tar_avg, 5)}, delta = {round(diff, 5)}")
 		return (avg, std, tar_avg, diff)
 
 
@@ -7,4 +7,7 @@ class StatusError(CrawlerError):
 		self.status_code = status_code
 		msg = f"Failed to fetch {url}. Status Code = {status_code}"
 		super().__init__(msg)
-		
\ No newline at end of file
+		
+# API 回來的 json 長得不對 (少欄位、型別不對)
+class PayloadError(CrawlerError):
+	pass
@@ -0,0 +1,49 @@
+# 一次爬完，四個分析 (先發投手、勝率波動、打者 RE24/PA、得失分差) 一起算
+# 以前要分別跑 era_main.py、GetWR、offense.py、runs_counter.py，同樣的週會被爬四次
+from package.cpbl_pipeline import Pipeline, WinLossConsumer, StartingPitcherConsumer
+from package.cpbl_win_rate import GetWR
+from package.cpbl_era import GetERA
+from package.cpbl_standings import LeagueStats
+from package.cpbl_columns import PAStore
+from package.cpbl_form import FormTimeline
+from offense_data.offense import GetPAStats
+from vibe_coding.runs_counter import GetRunStats
+
+def main():
+	start = (2025, 3, 24)
+	end = (2025, 6, 30)
+	really_start = (2025, 6, 8)
+
+	pipe = Pipeline(start, end, max_workers=4)
+
+	wr = GetWR(start, end)
+	pipe.register(WinLossConsumer(wr))
+	sp = pipe.register(StartingPitcherConsumer(GetERA({}), 300))
+	pa = GetPAStats(start, end, really_start)
+	# 這兩個還是讀原始 json
+	pipe.register(lambda now, games: pa.end_season_PAs(games), raw=True)
+	runs = GetRunStats(start, end)
+	pipe.register(lambda now, games: runs._process_games(games), raw=True)
+	# 六隊一起，單一隊的東西都可以從這裡篩出來
+	league = pipe.register(LeagueStats(end=end, late_start=really_start))
+	store = pipe.register(PAStore())
+
+	pipe.run()
+
+	print(sp.guardians)
+	print(sp.opponents)
+	for ran in (10, 20, 30):
+		wr.standard_discrete(ran)
+	pa.parse_local_html()
+	pa.print_all_stats()
+	runs._print_stats()
+	print(league.table())
+	# 季末那段 (really_start 以後) 直接查索引，換日期不用重爬
+	print(league.summary("悍", start=really_start))
+	# 打者狀態: really_start 以後、最後 30 個打席、EWMA，換日期不用重爬
+	form = FormTimeline(store, team="悍")
+	print(form.table(start=really_start, last=30, alpha=0.1))
+
+# 跟 batch_main.py / bundle_main.py 一樣，被 import 的時候 (例如 Windows 開子 process 會重新 import 主程式) 不要整個爬起來
+if __name__ == "__main__":
+	main()
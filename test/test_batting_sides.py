@@ -0,0 +1,52 @@
+import os
+import sys
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from package.cpbl_models import Game, PlateAppearance
+
+"""
+Game.batting_sides 猜半局
+	python -m pytest test/
+"""
+
+def _half(team: str, pitcher: str, orders, round_no: int = 1) -> list:
+	return [PlateAppearance(f"{team}{order}", pitcher, order, round_no, 0.0) for order in orders]
+
+def _game(gid: str, pa_list: list) -> Game:
+	return Game(gid, "H", "A", "FINISHED", "HOME", 0, 0, None, pa_list)
+
+class BattingSidesTest(unittest.TestCase):
+
+	"""
+	客 1-3 / 主 1-3 / 客 4-6 / 主 4-6，三局上主隊換 H2 上來
+	兩隊都輪到第 7 棒、投手跟打者都沒看過，以前會當作主隊還在打
+	"""
+	def test_new_pitcher_when_both_lineups_fit(self):
+		pa_list = (
+			_half("A", "H1", [1, 2, 3]) + _half("H", "A1", [1, 2, 3])
+			+ _half("A", "H1", [4, 5, 6]) + _half("H", "A1", [4, 5, 6])
+			+ _half("A", "H2", [7, 8, 9]) + _half("H", "A1", [7, 8, 9])
+			+ _half("A", "H2", [1, 2, 3], 2) + _half("H", "A1", [1, 2, 3], 2)
+		)
+		expected = [side for side in ("AWAY", "HOME") * 4 for _ in range(3)]
+		game = _game("new-pitcher", pa_list)
+		self.assertEqual(game.batting_sides(), expected)
+		self.assertEqual(game.innings.relievers("HOME"), ["H2"])
+		self.assertEqual(game.innings.relievers("AWAY"), [])
+
+	"""
+	客 1-4 / 主 1-4 之後主隊第 5 棒時客隊換 A2，兩隊也都輪到第 5 棒
+	這個半局已經打了四個，但這是半局中間換投，不能當作換半局 (後面 H1 又回來守，他是主隊的)
+	"""
+	def test_mid_inning_reliever_keeps_half(self):
+		pa_list = (
+			_half("A", "H1", [1, 2, 3, 4]) + _half("H", "A1", [1, 2, 3, 4])
+			+ _half("H", "A2", [5, 6]) + _half("A", "H1", [5, 6, 7])
+		)
+		expected = ["AWAY"] * 4 + ["HOME"] * 6 + ["AWAY"] * 3
+		game = _game("mid-inning", pa_list)
+		self.assertEqual(game.batting_sides(), expected)
+		self.assertEqual(game.innings.relievers("AWAY"), ["A2"])
+
+if __name__ == "__main__":
+	unittest.main()
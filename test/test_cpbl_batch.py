@@ -0,0 +1,83 @@
+import datetime
+import io
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+import pandas as pd
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "bench"))
+from package import cpbl_tables
+from package.cpbl_batch import SEASONS, Season, run_seasons
+from package.cpbl_cache import WeekCache
+from package.cpbl_client import SEASON_SUFFIX
+from package.cpbl_standings import LeagueStats
+from package.cpbl_tables import TableCache
+from package.cpbl_teams import TEAM_MAP
+from fake_rebas import make_week
+
+"""
+run_seasons (好幾個半季一起跑)，WeekCache 先塞好假的週，不會上網
+	python -m pytest test/
+"""
+
+FIRST = datetime.date(2025, 3, 24)
+WEEKS = [FIRST + datetime.timedelta(days=7 * i) for i in range(3)]
+SEASON = Season((2025, 3, 24), (2025, 4, 10), late_start=(2025, 4, 3))
+
+class SeasonsTableTest(unittest.TestCase):
+
+	# 上半季的結束就是下半季的開始，同一天不會算兩次
+	def test_halves_meet(self):
+		for year in (2024, 2025):
+			first, second = SEASONS[f"{year}年上"], SEASONS[f"{year}年下"]
+			self.assertEqual(first.end, second.start)
+			for season in (first, second):
+				self.assertLess(season.start, season.end)
+				if (season.late_start is not None):
+					self.assertTrue(season.start <= season.late_start < season.end)
+
+	def test_unknown_season(self):
+		with self.assertRaises(ValueError):
+			run_seasons(["2099年上"])
+
+class RunSeasonsTest(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		self.cache = WeekCache(os.path.join(self.tmp.name, "cache"))
+		for day in WEEKS:
+			self.cache.save(SEASON_SUFFIX[day.year], day, make_week(day))
+		self.out_dir = os.path.join(self.tmp.name, "out")
+		# 投手頁的解析快取也放暫存資料夾
+		self.shared = mock.patch.object(cpbl_tables, "_default_cache", TableCache(os.path.join(self.tmp.name, "tables")))
+		self.shared.start()
+
+	def tearDown(self):
+		self.shared.stop()
+		self.tmp.cleanup()
+
+	def test_one_season(self):
+		with redirect_stdout(io.StringIO()):
+			report = run_seasons({"測試": SEASON}, self.out_dir, cache=self.cache, max_workers=1)
+		expected = LeagueStats(SEASON.start, SEASON.end, SEASON.late_start)
+		for day in WEEKS:
+			expected((day.year, day.month, day.day), make_week(day)["data"])
+		self.assertEqual(report, {"測試": (len(expected.seen), [])})
+
+		season_dir = os.path.join(self.out_dir, "測試")
+		league = LeagueStats.load(os.path.join(season_dir, "league.json"))
+		self.assertEqual(league.seen, expected.seen)
+		standings = pd.read_csv(os.path.join(season_dir, "standings.csv"), index_col=0, encoding="utf-8-sig")
+		self.assertEqual(len(standings), len(expected.teams()))
+		batters = pd.read_csv(os.path.join(season_dir, "batters.csv"), index_col=0, encoding="utf-8-sig")
+		self.assertEqual(len(batters), sum(len(expected.batter_re24(team)) for team in expected.teams()))
+		for team in expected.teams():
+			sp = pd.read_csv(os.path.join(season_dir, f"{TEAM_MAP[team]}_sp.csv"), index_col=0, encoding="utf-8-sig")
+			self.assertEqual(sp["總出賽數"].to_dict(), expected.starting_pitchers(team)[0])
+
+if __name__ == "__main__":
+	unittest.main()
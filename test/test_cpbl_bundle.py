@@ -0,0 +1,128 @@
+import datetime
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "bench"))
+from package.cpbl_bundle import CODECS, SeasonBundle, available_codecs, export_bundle, page_name
+from package.cpbl_cache import WeekCache
+from package.cpbl_calendar import WeekCalendar, shared_calendar
+from package.cpbl_client import SEASON_SUFFIX
+from package.cpbl_pipeline import Pipeline
+from package.cpbl_tables import TableCache, tables_to_json
+from package.errors import CrawlerError
+from fake_rebas import make_week
+
+"""
+SeasonBundle (一段日期的週 + 頁面表格打包成一個檔) 寫進去讀出來都一樣
+	python -m pytest test/
+"""
+
+DATA_DIR = os.path.join(ROOT, "datas")
+PAGES = [os.path.join(DATA_DIR, "2025", "guardians.txt"), os.path.join(DATA_DIR, "offense", "2025年上.txt")]
+FIRST = datetime.date(2025, 3, 24)
+WEEKS = [FIRST + datetime.timedelta(days=7 * i) for i in range(3)]
+# 第四週沒比賽 (週曆知道)，第五週沒快取
+EMPTY = FIRST + datetime.timedelta(days=21)
+START, END = FIRST, FIRST + datetime.timedelta(days=35)
+TODAY = datetime.date(2025, 6, 1)
+
+# 表格裡有 NaN (NaN != NaN)，轉成 json 字串再比
+def _plain(tables: list) -> str:
+	return json.dumps(tables_to_json(tables), ensure_ascii=False)
+
+class BundleTest(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		self.cache = WeekCache(os.path.join(self.tmp.name, "cache"))
+		calendar = shared_calendar(self.cache.cache_dir)
+		for day in WEEKS:
+			week = make_week(day)
+			self.cache.save(SEASON_SUFFIX[day.year], day, week)
+			calendar.record(day, week, TODAY)
+		self.cache.save(SEASON_SUFFIX[EMPTY.year], EMPTY, {"data": []})
+		calendar.record(EMPTY, {"data": []}, TODAY)
+		self.tables = TableCache(os.path.join(self.tmp.name, "tables"))
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def _export(self, codec: str) -> str:
+		path = os.path.join(self.tmp.name, f"season.{codec}.bundle")
+		with redirect_stdout(io.StringIO()) as out:
+			counts = export_bundle(path, START, END, self.cache, DATA_DIR, PAGES, codec, self.tables)
+		self.assertEqual(counts, (len(WEEKS) + 1, len(PAGES)))
+		# 沒快取的第五週要說，第四週週曆知道沒比賽就不用
+		self.assertIn(str(EMPTY + datetime.timedelta(days=7)), out.getvalue())
+		self.assertNotIn(f"Week {EMPTY} ", out.getvalue())
+		return path
+
+	def test_round_trip_per_codec(self):
+		for codec in CODECS:
+			if (codec not in available_codecs()):
+				continue
+			with self.subTest(codec=codec), SeasonBundle(self._export(codec)) as bundle:
+				self.assertEqual(bundle.codec, codec)
+				self.assertEqual(bundle.weeks(), [(SEASON_SUFFIX[day.year], day) for day in WEEKS + [EMPTY]])
+				for su, day in bundle.weeks():
+					self.assertEqual(bundle.week_bytes(su, day), self.cache.load_bytes(su, day))
+				self.assertEqual(bundle.table_names(), sorted(page_name(page, DATA_DIR) for page in PAGES))
+				for page in PAGES:
+					self.assertEqual(_plain(bundle.tables(page_name(page, DATA_DIR))), _plain(self.tables.load(page)))
+				self.assertEqual(bundle.calendar_entries(), shared_calendar(self.cache.cache_dir).known)
+				self.assertIsNone(bundle.read("week/JO/1999-01-04"))
+
+	@unittest.skipIf("zstd" in available_codecs(), "zstandard is installed")
+	def test_zstd_missing(self):
+		with self.assertRaises(ImportError):
+			export_bundle(os.path.join(self.tmp.name, "x.bundle"), START, END, self.cache, DATA_DIR, [], "zstd", self.tables)
+
+	def test_unknown_codec(self):
+		with self.assertRaises(ValueError):
+			export_bundle(os.path.join(self.tmp.name, "x.bundle"), START, END, self.cache, DATA_DIR, [], "gzip", self.tables)
+
+	def test_broken_bundle(self):
+		path = self._export("zlib")
+		with open(path, "rb") as f:
+			data = f.read()
+		broken = os.path.join(self.tmp.name, "broken.bundle")
+		for payload in (data[:len(data) // 2], b"", b"not a bundle at all, just some bytes"):
+			with open(broken, "wb") as f:
+				f.write(payload)
+			with self.assertRaises(CrawlerError):
+				SeasonBundle(broken)
+
+	def test_install_seeds_calendar(self):
+		with SeasonBundle(self._export("zlib")) as bundle:
+			other = os.path.join(self.tmp.name, "laptop")
+			calendar = WeekCalendar(other, autosave=False)
+			bundle_cache = bundle.cache(other, calendar)
+			self.assertEqual(calendar.known, bundle.calendar_entries())
+			# 沒比賽的週不會來要
+			self.assertNotIn(tuple(EMPTY.timetuple()[:3]), calendar.weeks(START, END))
+
+			pipe = Pipeline(START, END, cache=bundle_cache, calendar=calendar)
+			with redirect_stdout(io.StringIO()):
+				pipe.run()
+			self.assertEqual(pipe.missing, [(2025, 4, 21)])
+			self.assertEqual(bundle_cache.hits, len(WEEKS))
+			# 唯讀，本機資料夾不會多出東西
+			self.assertFalse(os.path.exists(other) and os.listdir(other))
+
+	def test_import_weeks(self):
+		with SeasonBundle(self._export("zlib")) as bundle:
+			local = WeekCache(os.path.join(self.tmp.name, "imported"))
+			self.assertEqual(bundle.import_weeks(local), len(WEEKS) + 1)
+			self.assertEqual(local.load_bytes(SEASON_SUFFIX[2025], WEEKS[0]), self.cache.load_bytes(SEASON_SUFFIX[2025], WEEKS[0]))
+			self.assertEqual(shared_calendar(local.cache_dir).known, bundle.calendar_entries())
+			# 已經有定案資料的週不再寫
+			self.assertEqual(bundle.import_weeks(local), 0)
+
+if __name__ == "__main__":
+	unittest.main()
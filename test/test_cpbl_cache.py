@@ -0,0 +1,94 @@
+import datetime
+import io
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "bench"))
+from package.cpbl_cache import WeekCache
+from fake_rebas import make_week
+
+"""
+WeekCache (定案的週用快取，沒打完的重抓)
+	python -m pytest test/
+"""
+
+WEEK = datetime.date(2025, 4, 21)
+
+def _unfinished(week_start: datetime.date) -> dict:
+	json_data = make_week(week_start)
+	json_data["data"][0]["info"]["status"] = "SCHEDULED"
+	return json_data
+
+class IsFinalTest(unittest.TestCase):
+
+	def test_all_finished(self):
+		self.assertTrue(WeekCache.is_final(make_week(WEEK), WEEK))
+
+	def test_one_game_not_finished(self):
+		self.assertFalse(WeekCache.is_final(_unfinished(WEEK), WEEK))
+
+	def test_empty_week_only_after_it_is_over(self):
+		empty = {"data": []}
+		self.assertFalse(WeekCache.is_final(empty, WEEK, today=WEEK + datetime.timedelta(days=6)))
+		self.assertTrue(WeekCache.is_final(empty, WEEK, today=WEEK + datetime.timedelta(days=7)))
+
+	def test_missing_data(self):
+		self.assertFalse(WeekCache.is_final(None, WEEK))
+		self.assertFalse(WeekCache.is_final({"error": "nope"}, WEEK))
+
+class FetchTest(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		self.cache = WeekCache(self.tmp.name)
+		self.calls = 0
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def getter(self, json_data):
+		def get():
+			self.calls += 1
+			return json_data
+		return get
+
+	def test_final_week_is_not_fetched_again(self):
+		first = self.cache.fetch("JO", WEEK, self.getter(make_week(WEEK)))
+		again = self.cache.fetch("JO", WEEK, self.getter(None))
+		self.assertEqual(self.calls, 1)
+		self.assertEqual(again, first)
+		self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+	def test_unfinished_week_is_fetched_again(self):
+		self.cache.fetch("JO", WEEK, self.getter(_unfinished(WEEK)))
+		fresh = self.cache.fetch("JO", WEEK, self.getter(make_week(WEEK)))
+		self.assertEqual(self.calls, 2)
+		self.assertEqual(fresh, make_week(WEEK))
+		# 定案之後存回去的就是新的，不會再抓
+		self.cache.fetch("JO", WEEK, self.getter(None))
+		self.assertEqual(self.calls, 2)
+		self.assertEqual(self.cache.load("JO", WEEK), make_week(WEEK))
+
+	def test_failed_refetch_returns_stale_cache(self):
+		stale = _unfinished(WEEK)
+		self.cache.save("JO", WEEK, stale)
+		with redirect_stdout(io.StringIO()):
+			self.assertEqual(self.cache.fetch("JO", WEEK, self.getter(None)), stale)
+		self.assertIsNone(self.cache.fetch("JO", WEEK + datetime.timedelta(days=7), self.getter(None)))
+
+	def test_broken_file_is_ignored(self):
+		path = self.cache.path_of("JO", WEEK)
+		os.makedirs(os.path.dirname(path))
+		with open(path, "w", encoding="utf-8") as f:
+			f.write("{not json")
+		with redirect_stdout(io.StringIO()):
+			self.assertIsNone(self.cache.load("JO", WEEK))
+			self.assertEqual(self.cache.fetch("JO", WEEK, self.getter(make_week(WEEK))), make_week(WEEK))
+		self.assertEqual(self.calls, 1)
+
+if __name__ == "__main__":
+	unittest.main()
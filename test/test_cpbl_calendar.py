@@ -0,0 +1,122 @@
+import copy
+import datetime
+import os
+import sys
+import tempfile
+import unittest
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "bench"))
+from package.cpbl_calendar import GameWindow, WeekCalendar, game_day, shared_calendar, week_start, week_starts
+from package.cpbl_models import games_from_week
+from fake_rebas import make_week
+
+"""
+週曆 (對齊週一、跳過沒比賽的週) 跟 GameWindow (日期範圍、同一場只給一次)
+	python -m pytest test/
+"""
+
+MONDAY = datetime.date(2025, 4, 21)
+TODAY = datetime.date(2025, 6, 1)
+
+def _unfinished(week: dict) -> dict:
+	week = copy.deepcopy(week)
+	week["data"][0]["info"]["status"] = "PLAYING"
+	return week
+
+class WeekStartTest(unittest.TestCase):
+
+	def test_aligned_to_monday(self):
+		for offset in range(7):
+			self.assertEqual(week_start(MONDAY + datetime.timedelta(days=offset)), MONDAY)
+		self.assertEqual(week_start((2025, 4, 20)), MONDAY - datetime.timedelta(days=7))
+		# 跨年、閏年也一樣
+		self.assertEqual(week_start((2024, 2, 29)), datetime.date(2024, 2, 26))
+		self.assertEqual(week_start((2025, 1, 1)), datetime.date(2024, 12, 30))
+
+	def test_week_starts_is_half_open(self):
+		self.assertEqual(week_starts((2025, 4, 23), (2025, 5, 5)), [MONDAY, MONDAY + datetime.timedelta(days=7)])
+		self.assertEqual(week_starts((2025, 4, 23), (2025, 5, 6)), [MONDAY + datetime.timedelta(days=7 * i) for i in range(3)])
+		self.assertEqual(week_starts(MONDAY, MONDAY), [])
+
+class WeekCalendarTest(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def test_unknown_weeks_are_fetched(self):
+		calendar = WeekCalendar(self.tmp.name)
+		self.assertEqual(calendar.weeks((2025, 4, 23), (2025, 5, 5)), [(2025, 4, 21), (2025, 4, 28)])
+		self.assertEqual(calendar.jobs(MONDAY, (2025, 4, 28), lambda now: f"url-{now[2]}"), [((2025, 4, 21), "url-21")])
+
+	def test_records_only_final_weeks(self):
+		calendar = WeekCalendar(self.tmp.name)
+		week = make_week(MONDAY)
+		calendar.record(MONDAY, _unfinished(week), TODAY)
+		self.assertEqual(calendar.known, {})
+		self.assertFalse(os.path.exists(calendar.path))
+		# 沒比賽的週要過完才算
+		empty = MONDAY + datetime.timedelta(days=7)
+		calendar.record(empty, {"data": []}, empty + datetime.timedelta(days=6))
+		self.assertEqual(calendar.known, {})
+		calendar.record(empty, {"data": []}, TODAY)
+		calendar.record(MONDAY + datetime.timedelta(days=3), week, TODAY)
+		days = [game_day(game) for game in week["data"]]
+		self.assertEqual(calendar.known, {
+			MONDAY.isoformat(): [len(week["data"]), min(days).isoformat(), max(days).isoformat()],
+			empty.isoformat(): [0, None, None]
+		})
+		# autosave，下一個 WeekCalendar 讀得到
+		self.assertEqual(WeekCalendar(self.tmp.name).known, calendar.known)
+
+	def test_known_weeks_are_skipped(self):
+		calendar = WeekCalendar(self.tmp.name)
+		week = make_week(MONDAY)
+		calendar.record(MONDAY, week, TODAY)
+		calendar.record(MONDAY + datetime.timedelta(days=7), {"data": []}, TODAY)
+		first = min(game_day(game) for game in week["data"])
+		last = max(game_day(game) for game in week["data"])
+		end = MONDAY + datetime.timedelta(days=21)
+		self.assertEqual(calendar.weeks(MONDAY, end), [(2025, 4, 21), (2025, 5, 5)])
+		# 範圍碰不到有比賽的那幾天也跳過
+		self.assertEqual(calendar.weeks(last + datetime.timedelta(days=1), end), [(2025, 5, 5)])
+		self.assertEqual(calendar.weeks(MONDAY, first), [])
+		self.assertEqual(calendar.weeks(MONDAY, first + datetime.timedelta(days=1)), [(2025, 4, 21)])
+
+	def test_seed_keeps_own_weeks(self):
+		calendar = WeekCalendar(self.tmp.name, autosave=False)
+		calendar.record(MONDAY, {"data": []}, TODAY)
+		calendar.seed({MONDAY.isoformat(): [18, "2025-04-22", "2025-04-27"], "2025-04-28": [0, None, None]})
+		self.assertEqual(calendar.known, {MONDAY.isoformat(): [0, None, None], "2025-04-28": [0, None, None]})
+		self.assertFalse(os.path.exists(calendar.path))
+		calendar.save()
+		self.assertEqual(WeekCalendar(self.tmp.name).known, calendar.known)
+
+	def test_shared_calendar(self):
+		self.assertIs(shared_calendar(self.tmp.name), shared_calendar(os.path.join(self.tmp.name, ".")))
+
+class GameWindowTest(unittest.TestCase):
+
+	def test_range_and_dedupe(self):
+		raw = make_week(MONDAY)["data"]
+		days = sorted({game_day(game) for game in raw})
+		start, end = days[1], days[-1]
+		window = GameWindow(start, end)
+		taken = window.take(raw)
+		self.assertEqual(taken, [game for game in raw if start <= game_day(game) < end])
+		self.assertGreater(len(taken), 0)
+		# 同一週再給一次 (或是重疊的週) 不會再給
+		self.assertEqual(window.take(raw), [])
+		self.assertNotIn(None, window)
+
+	def test_games_and_raw_json(self):
+		raw = make_week(MONDAY)["data"]
+		games = games_from_week(raw)
+		self.assertEqual([game.id for game in GameWindow().take(games)], [game.id for game in games])
+		self.assertEqual(len(GameWindow(end=MONDAY).take(raw)), 0)
+
+if __name__ == "__main__":
+	unittest.main()
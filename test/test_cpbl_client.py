@@ -0,0 +1,125 @@
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "bench"))
+from package.cpbl_client import RebasClient, TokenBucket
+from package.errors import CrawlerError, StatusError
+from fake_rebas import FakeRebas, make_week
+
+"""
+RebasClient (重試、狀態碼、json 壞掉) + TokenBucket
+會在本機開 server，不會連到外面
+	python -m pytest test/
+"""
+
+class Flaky():
+	"""
+	本機 server，照 replies 的順序回 (狀態碼, body)，用完之後都回最後一個
+	"""
+	def __init__(self, replies: list):
+		self.replies = list(replies)
+		self.requests = 0
+		flaky = self
+
+		class Handler(BaseHTTPRequestHandler):
+			def do_GET(self):
+				status, body = flaky.replies[min(flaky.requests, len(flaky.replies) - 1)]
+				flaky.requests += 1
+				self.send_response(status)
+				self.send_header("Content-Length", str(len(body)))
+				self.end_headers()
+				self.wfile.write(body)
+
+			def log_message(self, *args):
+				pass
+
+		self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+		self.root = f"http://127.0.0.1:{self.server.server_address[1]}"
+		self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+	def __enter__(self):
+		self._thread.start()
+		return self
+
+	def __exit__(self, *args):
+		self.server.shutdown()
+		self.server.server_close()
+
+OK = (200, json.dumps({"data": []}).encode("utf-8"))
+
+def _client(root: str, retries: int = 3) -> RebasClient:
+	# 不限速、重試不等
+	return RebasClient(root=root, retries=retries, backoff_base=0, rate=None)
+
+class RebasClientTest(unittest.TestCase):
+
+	def test_week_url(self):
+		client = RebasClient(root="https://example.test", rate=None)
+		self.assertEqual(client.week_url("JO", (2025, 4, 21)), "https://example.test/api/seasons/CPBL-2025-JO/games?start=2025-04-21")
+		self.assertEqual(client.week_url("xa", datetime.date(2024, 3, 4)), "https://example.test/api/seasons/CPBL-2024-xa/games?start=2024-03-04")
+
+	def test_get_json_from_fake_rebas(self):
+		day = datetime.date(2025, 4, 21)
+		with FakeRebas(latency=0) as fake:
+			client = _client(fake.root)
+			self.assertEqual(client.get_json(client.week_url("JO", day)), make_week(day))
+			client.close()
+
+	def test_retry_status_then_ok(self):
+		with Flaky([(503, b""), (429, b""), OK]) as flaky:
+			self.assertEqual(_client(flaky.root).get_json(flaky.root + "/x"), {"data": []})
+			self.assertEqual(flaky.requests, 3)
+
+	def test_gives_up_after_retries(self):
+		with Flaky([(503, b"")]) as flaky:
+			with self.assertRaises(StatusError):
+				_client(flaky.root, retries=2).get_json(flaky.root + "/x")
+			self.assertEqual(flaky.requests, 3)
+
+	def test_not_found_is_not_retried(self):
+		with Flaky([(404, b""), OK]) as flaky:
+			with self.assertRaises(StatusError):
+				_client(flaky.root).get_json(flaky.root + "/x")
+			self.assertEqual(flaky.requests, 1)
+
+	def test_broken_json(self):
+		with Flaky([(200, b"{not json")]) as flaky:
+			with self.assertRaises(CrawlerError) as caught:
+				_client(flaky.root).get_json(flaky.root + "/x")
+			self.assertIn("Broken json", str(caught.exception))
+
+	def test_connection_error(self):
+		with Flaky([OK]) as flaky:
+			root = flaky.root
+		# server 關掉了，連不上
+		with self.assertRaises(CrawlerError):
+			_client(root, retries=1).get_json(root + "/x")
+
+	def test_backoff_is_capped(self):
+		client = RebasClient(backoff_base=0.5, backoff_cap=2.0, rate=None)
+		for attempt in range(8):
+			wait = client.backoff(attempt)
+			self.assertGreaterEqual(wait, 0)
+			self.assertLessEqual(wait, min(2.0, 0.5 * 2 ** attempt))
+
+class TokenBucketTest(unittest.TestCase):
+
+	def test_burst_then_waits(self):
+		bucket = TokenBucket(rate=50, burst=2)
+		begin = time.monotonic()
+		bucket.acquire()
+		bucket.acquire()
+		self.assertLess(time.monotonic() - begin, 0.015)
+		# 第三個要等補一個 token (1/50 秒)
+		bucket.acquire()
+		self.assertGreaterEqual(time.monotonic() - begin, 0.015)
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,94 @@
+import datetime
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "bench"))
+from package.cpbl_columns import COLUMNS, PAStore, pyarrow
+from package.cpbl_models import games_from_week
+from fake_rebas import make_week
+
+"""
+PAStore (打席攤平成 numpy 欄位) 的查詢跟一場一場跑 python 算的一樣
+	python -m pytest test/
+"""
+
+FIRST = datetime.date(2025, 3, 24)
+GAMES = [game for i in range(4) for game in games_from_week(make_week(FIRST + datetime.timedelta(days=7 * i))["data"])]
+
+def _store(games: list) -> PAStore:
+	return PAStore().add_games(games)
+
+# 一個打席一個打席數: {打者: (打席, RE24 總和)}，start <= 日期 < end
+def _brute(games: list, start = None, end = None, team: str = None) -> dict:
+	result = {}
+	for game in games:
+		if (start is not None and game.started_at < start):
+			continue
+		if (end is not None and game.started_at >= end):
+			continue
+		if (team is not None and not game.has(team)):
+			continue
+		for pa in game.PA_list:
+			pa_count, re24 = result.get(pa.batter, (0, 0.0))
+			result[pa.batter] = (pa_count + 1, re24 + pa.RE24)
+	return result
+
+class PAStoreTest(unittest.TestCase):
+
+	def assert_matches(self, store: PAStore, start = None, end = None, team: str = None):
+		got = store.re24_per_pa(start, end, team)
+		want = _brute(GAMES, start, end, team)
+		self.assertEqual(set(got), set(want))
+		for name, (pa_count, re24) in want.items():
+			self.assertEqual(got[name]["PA"], pa_count)
+			self.assertAlmostEqual(got[name]["RE24_total"], re24, places=9)
+
+	def test_totals_match_brute_force(self):
+		store = _store(GAMES)
+		self.assertEqual(len(store), sum(len(game.PA_list) for game in GAMES))
+		mid = datetime.date(2025, 4, 9)
+		for start, end in ((None, None), (mid, None), (None, mid), (FIRST, mid), (mid, mid)):
+			for team in (None, "悍", "龍"):
+				self.assert_matches(store, start, end, team)
+
+	def test_end_is_exclusive(self):
+		store = _store(GAMES)
+		day = GAMES[0].started_at
+		self.assertFalse(store.mask(end=day)[store.column("date") == np.datetime64(day, "D")].any())
+		self.assertTrue(store.mask(start=day)[store.column("date") == np.datetime64(day, "D")].all())
+		self.assertEqual(store.mask(start=day, end=day).sum(), 0)
+		self.assertEqual(store.mask(team="沒這隊").sum(), 0)
+
+	def test_unfinished_game_is_skipped(self):
+		game = GAMES[0]
+		playing = games_from_week([dict(make_week(FIRST)["data"][-1], info={"status": "PLAYING"})])[0]
+		store = _store([playing, game])
+		self.assertEqual((store.games, len(store)), (1, len(game.PA_list)))
+
+	def _round_trip(self, path: str):
+		store = _store(GAMES[:30])
+		store.save(path)
+		loaded = PAStore.load(path)
+		for name in COLUMNS:
+			self.assertTrue(np.array_equal(loaded.column(name), store.column(name)), name)
+		self.assertEqual((loaded.players, loaded.teams, loaded.games), (store.players, store.teams, store.games))
+		# 讀回來的還可以接著灌
+		loaded.add_games(GAMES[30:])
+		self.assert_matches(loaded)
+
+	def test_save_load_npy_directory(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			self._round_trip(os.path.join(tmp, "store"))
+
+	@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+	def test_save_load_arrow(self):
+		for ext in (".feather", ".parquet"):
+			with tempfile.TemporaryDirectory() as tmp:
+				self._round_trip(os.path.join(tmp, f"store{ext}"))
+
+if __name__ == "__main__":
+	unittest.main()
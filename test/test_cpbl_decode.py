@@ -0,0 +1,67 @@
+import copy
+import datetime
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "bench"))
+from package import cpbl_decode
+from package.cpbl_decode import game_from_dict, loads
+from package.cpbl_models import games_from_week
+from package.errors import CrawlerError, PayloadError
+from fake_rebas import make_week
+
+"""
+週的 json 怎麼解 (loads / game_from_dict)
+	python -m pytest test/
+"""
+
+WEEK = make_week(datetime.date(2025, 4, 21))
+
+class LoadsTest(unittest.TestCase):
+
+	def test_same_as_json(self):
+		text = json.dumps(WEEK, ensure_ascii=False)
+		self.assertEqual(loads(text), WEEK)
+		self.assertEqual(loads(text.encode("utf-8")), WEEK)
+		# 沒裝 orjson 的路線
+		with mock.patch.object(cpbl_decode, "orjson", None):
+			self.assertEqual(loads(text.encode("utf-8")), WEEK)
+
+	def test_broken_json(self):
+		for payload in ("", "{\"data\": [", b"\xff\xfe", "<html>502</html>"):
+			with self.assertRaises(PayloadError):
+				loads(payload)
+			with mock.patch.object(cpbl_decode, "orjson", None), self.assertRaises(PayloadError):
+				loads(payload)
+		# 爬蟲那邊 except CrawlerError 就接得到
+		self.assertTrue(issubclass(PayloadError, CrawlerError))
+
+class GameFromDictTest(unittest.TestCase):
+
+	def test_same_as_games_from_week(self):
+		games = games_from_week(WEEK["data"])
+		for raw, game in zip(WEEK["data"], games):
+			got = game_from_dict(raw)
+			self.assertEqual((got.id, got.home, got.away, got.started_at, got.home_runs, got.away_runs, len(got.PA_list)),
+				(game.id, game.home, game.away, game.started_at, game.home_runs, game.away_runs, len(game.PA_list)))
+
+	def test_malformed_game(self):
+		raw = WEEK["data"][0]
+		broken = []
+		for path, value in ((("info",), []), (("info", "started_at"), "四月二十一日"), (("PA_list",), [None]), (("home",), "悍")):
+			it = copy.deepcopy(raw)
+			target = it
+			for key in path[:-1]:
+				target = target[key]
+			target[path[-1]] = value
+			broken.append(it)
+		for it in broken + [None, [], "game"]:
+			with self.assertRaises(ValueError):
+				game_from_dict(it)
+
+if __name__ == "__main__":
+	unittest.main()
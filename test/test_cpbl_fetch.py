@@ -0,0 +1,120 @@
+import datetime
+import io
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "bench"))
+from package.cpbl_cache import WeekCache
+from package.cpbl_calendar import WeekCalendar
+from package.cpbl_fetch import CHECKPOINT_BATCH, CrawlCheckpoint, WeekCrawler, crawl_weeks
+from fake_rebas import make_week
+
+"""
+CrawlCheckpoint + crawl_weeks (中途斷掉接著跑、一批一批抓) + WeekCrawler
+	python -m pytest test/
+"""
+
+def _week(i: int) -> tuple:
+	day = datetime.date(2025, 3, 24) + datetime.timedelta(days=7 * i)
+	return (day.year, day.month, day.day)
+
+# crawl_weeks 吃的樣子: (週一, url)
+WEEKS = [(_week(i), f"url-{i}") for i in range(20)]
+
+class FakeSource():
+
+	def __init__(self, broken = ()):
+		self.broken = set(broken)
+		self.fetched = []
+		self.loaded = []
+
+	def fetch(self, week, url):
+		self.fetched.append(week)
+		if (week in self.broken):
+			return None
+		return {"data": [url]}
+
+	def load(self, week, url):
+		self.loaded.append(week)
+		return {"data": [url]}
+
+class CrawlWeeksTest(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		self.checkpoint = CrawlCheckpoint.of(self.tmp.name, "test")
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def test_early_stop_fetches_one_batch(self):
+		source = FakeSource()
+		crawl = crawl_weeks(WEEKS, source.fetch, checkpoint=self.checkpoint, load_one=source.load)
+		first = [next(crawl) for _ in range(3)]
+		crawl.close()
+		self.assertEqual([week for week, _ in first], WEEKS[:3])
+		self.assertEqual(len(source.fetched), CHECKPOINT_BATCH)
+		self.assertEqual(len(CrawlCheckpoint(self.checkpoint.path).done), CHECKPOINT_BATCH)
+
+	def test_resume_skips_done_weeks(self):
+		source = FakeSource(broken=[WEEKS[10][0]])
+		missing = []
+		with redirect_stdout(io.StringIO()):
+			result = list(crawl_weeks(WEEKS, source.fetch, checkpoint=self.checkpoint, load_one=source.load, retry_wait=0, missing=missing))
+		self.assertEqual([week for week, _ in result], WEEKS)
+		self.assertEqual(missing, [WEEKS[10][0]])
+		# 壞掉的週試了兩次 (retry_rounds = 1)，checkpoint 還留著
+		self.assertEqual(source.fetched.count(WEEKS[10][0]), 2)
+		self.assertTrue(os.path.exists(self.checkpoint.path))
+
+		again = FakeSource()
+		with redirect_stdout(io.StringIO()):
+			result = list(crawl_weeks(WEEKS, again.fetch, checkpoint=CrawlCheckpoint(self.checkpoint.path), load_one=again.load))
+		self.assertEqual(again.fetched, [WEEKS[10][0]])
+		self.assertEqual(len(again.loaded), len(WEEKS) - 1)
+		self.assertEqual([json_data["data"] for _, json_data in result], [[url] for _, url in WEEKS])
+		# 全部都拿到了，checkpoint 檔案刪掉
+		self.assertFalse(os.path.exists(self.checkpoint.path))
+
+	def test_without_checkpoint_reports_missing(self):
+		source = FakeSource(broken=[WEEKS[0][0]])
+		missing = []
+		with redirect_stdout(io.StringIO()):
+			result = list(crawl_weeks(WEEKS[:4], source.fetch, max_workers=2, missing=missing))
+		self.assertEqual(result[0], (WEEKS[0], None))
+		self.assertEqual(missing, [WEEKS[0][0]])
+
+class Crawler(WeekCrawler):
+
+	def __init__(self, **kwargs):
+		self.init_crawler(**kwargs)
+		self.got = []
+
+	# 不上網，記一下被叫了哪幾週
+	def get_week(self, url, now):
+		self.got.append(now)
+		return make_week(datetime.date(*now))
+
+class WeekCrawlerTest(unittest.TestCase):
+
+	def test_crawl_uses_cache_and_reports_missing(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			cache = WeekCache(tmp)
+			day = datetime.date(*WEEKS[0][0])
+			cache.save("JO", day, make_week(day))
+			crawler = Crawler(cache=cache, calendar=WeekCalendar(tmp))
+			self.assertEqual(crawler.week_suffix(WEEKS[0][0]), "JO")
+			self.assertEqual(crawler.week_suffix((2030, 1, 1)), "JO")
+			result = list(crawler.crawl(WEEKS[0][0], WEEKS[3][0]))
+		self.assertEqual([now for (now, _), _ in result], [week for week, _ in WEEKS[:3]])
+		self.assertTrue(all(url.endswith(f"start={datetime.date(*now).isoformat()}") for (now, url), _ in result))
+		# 第一週在快取裡，只有後面兩週要抓
+		self.assertEqual(crawler.got, [week for week, _ in WEEKS[1:3]])
+		self.assertEqual(crawler.missing, [])
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,110 @@
+import datetime
+import os
+import sys
+import unittest
+import numpy as np
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "bench"))
+from package.cpbl_columns import PAStore
+from package.cpbl_form import FormTimeline
+from package.cpbl_models import games_from_week
+from fake_rebas import make_week
+
+"""
+FormTimeline (每個打者的狀態曲線) 跟一個打席一個打席算的一樣
+	python -m pytest test/
+"""
+
+FIRST = datetime.date(2025, 3, 24)
+GAMES = [game for i in range(4) for game in games_from_week(make_week(FIRST + datetime.timedelta(days=7 * i))["data"])]
+STORE = PAStore().add_games(GAMES)
+DAYS = sorted({game.started_at for game in GAMES})
+ENDS = [None, DAYS[0], DAYS[5], DAYS[5] + datetime.timedelta(days=1), DAYS[-1], DAYS[-1] + datetime.timedelta(days=1)]
+
+# 每個打者照日期排的 [(日期, RE24)]，同一天照灌進來的順序；team 是打擊的那隊
+def _by_batter(team: str = None) -> dict:
+	result = {}
+	for game in GAMES:
+		sides = game.batting_sides()
+		for pa, side in zip(game.PA_list, sides):
+			batting = game.away if side == "AWAY" else game.home
+			if (team is not None and batting != team):
+				continue
+			result.setdefault(pa.batter, []).append((game.started_at, pa.RE24))
+	return {name: sorted(pas, key=lambda it: it[0]) for name, pas in result.items()}
+
+def _before(pas: list, end) -> list:
+	return [re24 for day, re24 in pas if end is None or day < end]
+
+# pandas ewm(alpha, adjust=True) 的定義: 越舊的打席權重多乘一次 (1 - alpha)
+def _ewma(values: list, alpha: float) -> float:
+	weights = [(1 - alpha) ** i for i in range(len(values))]
+	return sum(w * v for w, v in zip(weights, reversed(values))) / sum(weights)
+
+class FormTimelineTest(unittest.TestCase):
+
+	def setUp(self):
+		self.timeline = FormTimeline(STORE)
+
+	def test_window_matches_store(self):
+		for start in (None, DAYS[0], DAYS[3], DAYS[-1]):
+			for end in ENDS:
+				pa, re24 = self.timeline.window(start, end)
+				want_pa, want_re24 = STORE.batter_totals(start, end)
+				self.assertEqual(pa.tolist(), want_pa.tolist(), (start, end))
+				np.testing.assert_allclose(re24, want_re24, atol=1e-9)
+
+	def test_window_end_is_exclusive(self):
+		day = DAYS[5]
+		on_day = STORE.batter_totals(day, day + datetime.timedelta(days=1))[0]
+		self.assertEqual((self.timeline.window(end=day + datetime.timedelta(days=1))[0] - self.timeline.window(end=day)[0]).tolist(), on_day.tolist())
+		self.assertEqual(self.timeline.window(day, day)[0].sum(), 0)
+
+	def test_last_pa(self):
+		pas = _by_batter()
+		for n in (0, 1, 5, 1000):
+			for end in ENDS:
+				pa, re24 = self.timeline.last_pa(n, end)
+				for code, name in enumerate(self.timeline.players):
+					values = _before(pas.get(name, []), end)
+					values = values[max(len(values) - n, 0):] if n > 0 else []
+					self.assertEqual(pa[code], len(values), (name, n, end))
+					self.assertAlmostEqual(re24[code], sum(values), places=9)
+
+	def test_ewma(self):
+		pas = _by_batter()
+		for alpha in (0.1, 0.5):
+			for end in ENDS:
+				got = self.timeline.ewma(alpha, end)
+				for code, name in enumerate(self.timeline.players):
+					values = _before(pas.get(name, []), end)
+					if (len(values) == 0):
+						self.assertTrue(np.isnan(got[code]), (name, end))
+					else:
+						self.assertAlmostEqual(got[code], _ewma(values, alpha), places=9)
+
+	def test_team_counts_own_batting_only(self):
+		team = "悍"
+		timeline = FormTimeline(STORE, team)
+		pas = _by_batter(team)
+		pa, re24 = timeline.window()
+		for code, name in enumerate(timeline.players):
+			values = pas.get(name, [])
+			self.assertEqual(pa[code], len(values), name)
+			self.assertAlmostEqual(re24[code], sum(re24 for _, re24 in values), places=9)
+		self.assertEqual(FormTimeline(STORE, "沒這隊").window()[0].sum(), 0)
+
+	def test_table_and_curve(self):
+		table = self.timeline.table(DAYS[2], DAYS[-1], last=10, alpha=0.3)
+		self.assertTrue((table["PA"] > 0).all())
+		self.assertEqual(list(table.columns), ["PA", "RE24", "RE24_per_PA", "last_10_PA", "last_10_RE24_per_PA", "EWMA"])
+		name = table.index[0]
+		curve = self.timeline.curve(name)
+		values = _by_batter()[name]
+		self.assertEqual(int(curve["PA"].iloc[-1]), len(values))
+		self.assertAlmostEqual(curve["RE24"].iloc[-1], sum(re24 for _, re24 in values), places=9)
+		self.assertTrue(self.timeline.curve("沒這個人").empty)
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import unittest
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from package.cpbl_html import BeautifulSoup, available_backends, read_tables, read_tables_from_file
+
+"""
+存下來的頁面解析: 每個 backend 都跟以前整棵 BeautifulSoup 的讀法一樣
+	python -m pytest test/
+"""
+
+PAGES = [os.path.join(ROOT, "datas", "offense", "2025年上.txt"), os.path.join(ROOT, "datas", "2025", "guardians.txt")]
+
+SNIPPET = """
+<div><table><tr><td>沒有 thead 的不算</td></tr></table></div>
+<table>
+	<thead><tr><th> 球員 </th><th>OPS<span></span>+</th><th>AVG</th></tr></thead>
+	<tbody>
+		<tr><td><button> <b>王</b> 一 </button></td><td> 120 </td><td>.301</td></tr>
+		<tr><th>只有 th 的列不算</th></tr>
+		<tr><td>球隊平均</td><td>100</td></tr>
+	</tbody>
+</table>
+"""
+
+# 以前 offense.py / merged.py 的讀法
+def _soup_tables(html: str) -> list:
+	result = []
+	for table in BeautifulSoup(html, "html.parser").find_all("table"):
+		thead = table.find("thead")
+		if (not thead):
+			continue
+		headers = [th.get_text(strip=True) for th in thead.find_all("th")]
+		rows = []
+		tbody = table.find("tbody")
+		for tr in tbody.find_all("tr") if tbody else []:
+			cells = tr.find_all("td")
+			if (not cells):
+				continue
+			button = tr.find("button")
+			rows.append(([td.get_text(strip=True) for td in cells], button.get_text(strip=True) if button else None))
+		result.append((headers, rows))
+	return result
+
+def _plain(tables: list) -> list:
+	return [(table.headers, [(row.cells, row.button) for row in table.rows]) for table in tables]
+
+class ReadTablesTest(unittest.TestCase):
+
+	def test_snippet(self):
+		for backend in available_backends():
+			tables = read_tables(SNIPPET, backend)
+			self.assertEqual(_plain(tables), [(["球員", "OPS+", "AVG"], [(["王一", "120", ".301"], "王一"), (["球隊平均", "100"], None)])], backend)
+
+	@unittest.skipIf(BeautifulSoup is None, "beautifulsoup4 is not installed")
+	def test_backends_match_full_soup(self):
+		for path in PAGES:
+			with open(path, "r", encoding="utf-8") as f:
+				expected = _soup_tables(f.read())
+			self.assertGreater(len(expected), 0)
+			for backend in available_backends():
+				self.assertEqual(_plain(read_tables_from_file(path, backend)), expected, f"{backend} {path}")
+
+	def test_missing_file(self):
+		self.assertIsNone(read_tables_from_file(os.path.join(ROOT, "datas", "nope.txt")))
+
+if __name__ == "__main__":
+	unittest.main()
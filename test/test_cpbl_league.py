@@ -0,0 +1,64 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from package.cpbl_league import PITCHING_TEAMS, league_frame, load_pages, season_pages
+from package import cpbl_tables
+from package.cpbl_tables import TableCache
+
+"""
+一季的頁面一起讀 (load_pages / league_frame / season_pages)，用 repo 裡 datas/ 存好的頁面
+	python -m pytest test/
+"""
+
+DATA_DIR = os.path.join(ROOT, "datas")
+
+class LoadPagesTest(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		# 共用的 TableCache 換成暫存資料夾裡的，不要寫到真的 .rebas_cache
+		self.shared = mock.patch.object(cpbl_tables, "_default_cache", TableCache(os.path.join(self.tmp.name, "shared")))
+		self.shared.start()
+
+	def tearDown(self):
+		self.shared.stop()
+		self.tmp.cleanup()
+
+	def test_season_pages(self):
+		pitching, offense = season_pages(2025, DATA_DIR)
+		self.assertEqual(list(pitching), PITCHING_TEAMS)
+		self.assertTrue(all(os.path.exists(path) for path in pitching.values()))
+		self.assertEqual(list(offense), ["2025年上", "2025年下"])
+
+	def test_pool_matches_serial(self):
+		pitching, _ = season_pages(2025, DATA_DIR)
+		paths = list(pitching.values())[:3] + [os.path.join(DATA_DIR, "nope.txt")]
+		serial = load_pages(paths, 1, TableCache(os.path.join(self.tmp.name, "serial")))
+		pooled_cache = TableCache(os.path.join(self.tmp.name, "pool"))
+		pooled = load_pages(paths, 2, pooled_cache)
+		self.assertEqual(pooled_cache.parsed, 3)
+		self.assertIsNone(pooled[paths[-1]])
+		for path in paths[:-1]:
+			self.assertEqual(len(pooled[path]), len(serial[path]))
+			for got, want in zip(pooled[path], serial[path]):
+				self.assertTrue(got.equals(want), path)
+		# 都在快取裡了，再叫一次不會再解析
+		load_pages(paths, 2, pooled_cache)
+		self.assertEqual(pooled_cache.parsed, 3)
+
+	def test_league_frame(self):
+		pitching, _ = season_pages(2025, DATA_DIR)
+		pages = dict(list(pitching.items())[:2])
+		frame = league_frame(pages)
+		self.assertEqual(list(frame["page"].unique()), list(pages))
+		frames = load_pages(pages.values())
+		self.assertEqual(len(frame), sum(len(part) for path in pages.values() for part in frames[path]))
+		first = frames[pages[PITCHING_TEAMS[0]]]
+		self.assertEqual(sorted(frame.loc[frame["page"] == PITCHING_TEAMS[0], "table"].unique()), list(range(len(first))))
+
+if __name__ == "__main__":
+	unittest.main()
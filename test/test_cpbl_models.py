@@ -0,0 +1,62 @@
+import datetime
+import os
+import sys
+import unittest
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "bench"))
+from package.cpbl_models import Game, as_game, games_from_week, half_innings
+from fake_rebas import make_week
+
+"""
+Game / PlateAppearance 跟原始 json 讀到的一樣 (batting_sides 在 test_batting_sides.py)
+	python -m pytest test/
+"""
+
+WEEK = make_week(datetime.date(2025, 4, 21))["data"]
+
+class GameTest(unittest.TestCase):
+
+	def test_from_json_matches_raw(self):
+		for raw, game in zip(WEEK, games_from_week(WEEK)):
+			self.assertEqual(game.id, raw["id"])
+			self.assertEqual((game.home, game.away), (raw["home"]["abbr"], raw["away"]["abbr"]))
+			self.assertEqual((game.home_runs, game.away_runs), (raw["home"]["runs"], raw["away"]["runs"]))
+			self.assertEqual(game.winner_side, raw["info"]["winner_side"])
+			self.assertTrue(game.finished)
+			self.assertEqual(game.started_at.isoformat(), raw["info"]["started_at"].split()[0])
+			self.assertEqual([(pa.batter, pa.pitcher, pa.PA_order, pa.PA_round, pa.RE24) for pa in game.PA_list],
+				[(pa["batter"]["name"], pa["pitcher"]["name"], pa["PA_order"], pa["PA_round"], pa["RE24"]) for pa in raw["PA_list"]])
+
+	def test_result_and_runs_for(self):
+		game = Game("g", "悍", "龍", "FINISHED", "AWAY", 2, 5, None, [])
+		self.assertEqual((game.result_for("悍"), game.result_for("龍"), game.result_for("獅")), ("L", "W", None))
+		self.assertEqual((game.runs_for("悍"), game.runs_for("龍")), ((2, 5), (5, 2)))
+		tie = Game("t", "悍", "龍", "FINISHED", "TIE", 3, 3, None, [])
+		self.assertEqual((tie.result_for("悍"), tie.result_for("獅")), ("T", None))
+
+	def test_missing_fields(self):
+		game = Game.from_json({"id": "x", "info": {"started_at": " "}, "home": {"runs": None}})
+		self.assertIsNone(game.started_at)
+		self.assertIsNone(game.date_tuple)
+		self.assertEqual((game.home, game.away, game.home_runs, game.PA_list), ("", "", 0, []))
+
+	def test_innings_are_kept_on_the_game(self):
+		game = as_game(WEEK[0])
+		self.assertIs(as_game(game), game)
+		self.assertIs(game.innings, game.innings)
+		self.assertIs(half_innings(game), game.innings)
+
+	def test_innings_follow_a_growing_game(self):
+		raw = WEEK[0]
+		partial = Game.from_json(dict(raw, PA_list=raw["PA_list"][:10]))
+		first = partial.innings
+		full = Game.from_json(raw)
+		partial.PA_list.extend(full.PA_list[10:])
+		self.assertIsNot(partial.innings, first)
+		self.assertEqual(partial.batting_sides(), full.batting_sides())
+		self.assertEqual([partial.innings.span(i) for i in range(len(partial.innings))],
+			[full.innings.span(i) for i in range(len(full.innings))])
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,101 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from package.cpbl_names import AliasTable, Automaton, NameIndex, normalize
+
+"""
+NameIndex (API 的名字 -> 頁面上的那一列)
+	python -m pytest test/
+"""
+
+# 不讀 repo 裡的 player_aliases.json，每個測試自己給
+def _aliases(pairs: dict = None) -> AliasTable:
+	table = AliasTable(os.path.join(tempfile.gettempdir(), "no-such-aliases.json"))
+	for variant, canonical in (pairs or {}).items():
+		table.add(variant, canonical)
+	return table
+
+class NameIndexTest(unittest.TestCase):
+
+	def test_exact_beats_substring(self):
+		# 以前 "張奕" 會同時吃到 "張奕凱"
+		index = NameIndex(["張奕", "張奕凱", "林安可"], _aliases())
+		owners, ambiguous = index.resolve(["張奕", "林安可"])
+		self.assertEqual(owners, {"張奕": "張奕", "林安可": "林安可"})
+		self.assertEqual(ambiguous, {})
+
+	def test_normalized_spelling(self):
+		index = NameIndex(["魔 鷹", "布雷克．安德森"], _aliases())
+		owners, ambiguous = index.resolve(["魔鷹", "布雷克·安德森"])
+		self.assertEqual(owners, {"魔 鷹": "魔鷹", "布雷克．安德森": "布雷克·安德森"})
+		self.assertEqual(normalize("ＡＢ　c"), "ABc")
+
+	def test_unique_substring(self):
+		index = NameIndex(["林安可(左)", "陳傑憲"], _aliases())
+		self.assertEqual(index.resolve(["林安可"]), ({"林安可(左)": "林安可"}, {}))
+
+	def test_ambiguous_substring(self):
+		index = NameIndex(["陳杰憲", "陳杰瑋", "王柏融"], _aliases())
+		owners, ambiguous = index.resolve(["陳杰", "王柏融"])
+		self.assertEqual(owners, {"王柏融": "王柏融"})
+		self.assertEqual(ambiguous, {"陳杰": sorted(["陳杰憲", "陳杰瑋"])})
+
+	def test_row_wanted_by_two_targets(self):
+		index = NameIndex(["陳杰憲"], _aliases())
+		owners, ambiguous = index.resolve(["陳杰", "杰憲"])
+		self.assertEqual(owners, {})
+		self.assertEqual(ambiguous, {"陳杰": ["陳杰憲"], "杰憲": ["陳杰憲"]})
+
+	def test_alias_hit(self):
+		aliases = _aliases({"德保拉": "德堡拉", "Brewer": "布魯爾"})
+		index = NameIndex(["德堡拉", "布魯爾"], aliases)
+		owners, ambiguous = index.resolve(["德保拉", "Brewer"])
+		self.assertEqual(owners, {"德堡拉": "德保拉", "布魯爾": "Brewer"})
+		self.assertEqual(ambiguous, {})
+		# 頁面寫錯也對得到
+		index = NameIndex(["德保拉"], aliases)
+		self.assertEqual(index.resolve(["德堡拉"])[0], {"德保拉": "德堡拉"})
+
+	# 名單裡同一個人有兩種寫法 (別名)，跟頁面一樣的那個優先
+	def test_two_spellings_in_targets(self):
+		index = NameIndex(["德堡拉"], _aliases({"德保拉": "德堡拉"}))
+		owners, ambiguous = index.resolve(["德保拉", "德堡拉"])
+		self.assertEqual(owners, {"德堡拉": "德堡拉"})
+		self.assertEqual(ambiguous, {"德保拉": ["德堡拉"]})
+		# 只差空白的分不出來，都不配
+		index = NameIndex(["吳哲源"], _aliases())
+		owners, ambiguous = index.resolve(["吳哲源", "吳 哲 源"])
+		self.assertEqual(owners, {})
+		self.assertEqual(set(ambiguous), {"吳哲源", "吳 哲 源"})
+
+	def test_both_ways(self):
+		index = NameIndex(["吳哲源"], _aliases())
+		self.assertEqual(index.resolve(["吳哲源(2)"])[0], {})
+		self.assertEqual(index.resolve(["吳哲源(2)"], both_ways=True)[0], {"吳哲源": "吳哲源(2)"})
+
+class AliasTableTest(unittest.TestCase):
+
+	def test_chain_cycle_and_save(self):
+		aliases = _aliases({"a": "b", "b": "c"})
+		self.assertEqual(aliases.canonical("a"), "c")
+		aliases.add("c", "a")
+		self.assertIn(aliases.canonical("a"), {"a", "b", "c"})
+		with tempfile.TemporaryDirectory() as tmp:
+			path = os.path.join(tmp, "aliases.json")
+			aliases.save(path)
+			self.assertEqual(AliasTable(path).aliases, aliases.aliases)
+
+class AutomatonTest(unittest.TestCase):
+
+	def test_matches_brute_force(self):
+		rng = random.Random(7)
+		for _ in range(50):
+			words = {"".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(8)}
+			text = "".join(rng.choice("abcd") for _ in range(30))
+			self.assertEqual(Automaton(words).find(text), {word for word in words if word in text})
+
+if __name__ == "__main__":
+	unittest.main()
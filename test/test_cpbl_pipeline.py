@@ -0,0 +1,81 @@
+import datetime
+import io
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "bench"))
+from package.cpbl_cache import WeekCache
+from package.cpbl_calendar import WeekCalendar
+from package.cpbl_client import SEASON_SUFFIX
+from package.cpbl_pipeline import Pipeline, WinLossConsumer
+from package.cpbl_win_rate import GetWR
+from fake_rebas import make_week
+
+"""
+Pipeline (一段日期只爬一次，每週丟給所有 consumer)
+WeekCache 先塞好假的週，都是打完的過去的週，不會上網
+	python -m pytest test/
+"""
+
+FIRST = datetime.date(2025, 3, 24)
+WEEKS = [FIRST + datetime.timedelta(days=7 * i) for i in range(4)]
+# 不是週一也可以，頭尾那兩週只會拿到一部分
+START = (2025, 3, 27)
+END = (2025, 4, 16)
+
+class Recorder():
+
+	def __init__(self):
+		self.weeks = []
+		self.games = []
+
+	def __call__(self, now: tuple, games: list):
+		self.weeks.append(now)
+		self.games.extend(games)
+
+class PipelineTest(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		self.cache = WeekCache(self.tmp.name)
+		for day in WEEKS:
+			self.cache.save(SEASON_SUFFIX[day.year], day, make_week(day))
+		self.kwargs = {"cache": self.cache, "calendar": WeekCalendar(self.tmp.name)}
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def test_consumers_see_the_same_games(self):
+		pipe = Pipeline(START, END, **self.kwargs)
+		games = pipe.register(Recorder())
+		raw = pipe.register(Recorder(), raw=True)
+		with redirect_stdout(io.StringIO()):
+			pipe.run()
+		self.assertEqual(pipe.weeks, 4)
+		self.assertEqual(pipe.missing, [])
+		self.assertEqual(games.weeks, raw.weeks)
+		self.assertEqual([game.id for game in games.games], [game["id"] for game in raw.games])
+		expected = [game["id"] for day in WEEKS for game in make_week(day)["data"]
+			if START <= tuple(map(int, game["id"][:10].split("-"))) < END]
+		self.assertEqual(sorted(game["id"] for game in raw.games), sorted(expected))
+		# 每週只讀快取一次
+		self.assertEqual(self.cache.hits, 4)
+
+	def test_win_loss_matches_standalone(self):
+		alone = GetWR(START, END, **self.kwargs)
+		fed = GetWR(START, END, **self.kwargs)
+		pipe = Pipeline(START, END, **self.kwargs)
+		pipe.register(WinLossConsumer(fed))
+		with redirect_stdout(io.StringIO()):
+			alone.analyze()
+			pipe.run()
+		self.assertGreater(len(alone._game_result), 0)
+		self.assertEqual(fed._game_result, alone._game_result)
+		self.assertEqual((fed._win, fed._lose, fed._tie), (alone._win, alone._lose, alone._tie))
+
+if __name__ == "__main__":
+	unittest.main()
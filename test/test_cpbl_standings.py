@@ -0,0 +1,156 @@
+import datetime
+import io
+import math
+import os
+import random
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "bench"))
+from package.cpbl_cache import WeekCache
+from package.cpbl_calendar import WeekCalendar
+from package.cpbl_client import SEASON_SUFFIX
+from package.cpbl_standings import LeagueStats, TeamGame, TeamIndex
+from fake_rebas import make_week
+
+"""
+LeagueStats 存檔 / 合併 / refresh
+	python -m pytest test/
+"""
+
+FIRST = datetime.date(2025, 3, 24)
+WEEKS = [FIRST + datetime.timedelta(days=7 * i) for i in range(6)]
+LATE = (2025, 4, 14)
+
+def _tuple(day: datetime.date) -> tuple:
+	return (day.year, day.month, day.day)
+
+def _feed(league: LeagueStats, weeks: list) -> LeagueStats:
+	for day in weeks:
+		league(_tuple(day), make_week(day)["data"])
+	return league
+
+# 跟 RE24 的加總順序無關的樣子，拿來比兩份狀態
+def _snapshot(league: LeagueStats) -> dict:
+	data = league.to_json()
+	data["batters"] = {team: {name: [pa, round(re24, 9), late_pa, round(late_re24, 9)] for name, (pa, re24, late_pa, late_re24) in stats.items()}
+		for team, stats in data["batters"].items()}
+	data["games"] = {team: sorted(games) for team, games in data["games"].items()}
+	return data
+
+# 一場一場加起來，跟前綴和比
+def _brute(games: list) -> dict:
+	result = {"games": len(games)}
+	for mark in ("W", "L", "T"):
+		result[mark] = sum(1 for it in games if it.mark == mark)
+	result["scored"] = sum(it.scored for it in games)
+	result["allowed"] = sum(it.allowed for it in games)
+	diffs = [it.scored - it.allowed for it in games]
+	avg = sum(diffs) / len(diffs) if diffs else 0.0
+	result["avg_diff"] = avg
+	result["std_diff"] = math.sqrt(sum((diff - avg) ** 2 for diff in diffs) / len(diffs)) if diffs else 0.0
+	return result
+
+class TeamIndexTest(unittest.TestCase):
+
+	def setUp(self):
+		rng = random.Random(3)
+		self.games = []
+		for i in range(60):
+			# 一天可能打兩場，也有空白的日子
+			day = FIRST + datetime.timedelta(days=rng.randint(0, 40))
+			scored, allowed = rng.randint(0, 9), rng.randint(0, 9)
+			mark = "W" if scored > allowed else ("L" if scored < allowed else "T")
+			self.games.append(TeamGame(str(i), _tuple(day), "獅", rng.random() < 0.5, mark, scored, allowed, "甲", "乙"))
+		self.index = TeamIndex(self.games)
+
+	def _assert_same(self, got: dict, want: dict):
+		self.assertEqual({key: got[key] for key in ("games", "W", "L", "T", "scored", "allowed")},
+			{key: want[key] for key in ("games", "W", "L", "T", "scored", "allowed")})
+		self.assertAlmostEqual(got["avg_diff"], want["avg_diff"], places=9)
+		self.assertAlmostEqual(got["std_diff"], want["std_diff"], places=9)
+
+	def test_window_matches_brute_force(self):
+		rng = random.Random(5)
+		ordered = sorted(self.games, key=lambda it: it.date)
+		for _ in range(200):
+			start = FIRST + datetime.timedelta(days=rng.randint(-3, 44)) if rng.random() < 0.8 else None
+			end = FIRST + datetime.timedelta(days=rng.randint(-3, 44)) if rng.random() < 0.8 else None
+			last = rng.randint(0, 20) if rng.random() < 0.5 else None
+			games = [it for it in ordered if (start is None or it.date >= _tuple(start)) and (end is None or it.date < _tuple(end))]
+			if (last is not None):
+				games = games[max(len(games) - last, 0):] if last > 0 else []
+			self._assert_same(self.index.window(start, end, last), _brute(games))
+
+	def test_end_is_exclusive(self):
+		day = FIRST + datetime.timedelta(days=10)
+		on_day = [it for it in self.games if it.date == _tuple(day)]
+		before = self.index.window(end=day)["games"]
+		self.assertEqual(self.index.window(end=day + datetime.timedelta(days=1))["games"], before + len(on_day))
+		self.assertEqual(self.index.window(day, day)["games"], 0)
+
+	def test_empty(self):
+		index = TeamIndex([])
+		self.assertEqual(len(index), 0)
+		self._assert_same(index.window(FIRST, WEEKS[-1], 5), _brute([]))
+
+class LeagueStatsTest(unittest.TestCase):
+
+	def test_save_load_round_trip(self):
+		league = _feed(LeagueStats(FIRST, WEEKS[-1], LATE), WEEKS[:3])
+		with tempfile.TemporaryDirectory() as tmp:
+			path = os.path.join(tmp, "league.json")
+			league.save(path)
+			loaded = LeagueStats.load(path)
+		self.assertEqual(_snapshot(loaded), _snapshot(league))
+		self.assertEqual((loaded.start, loaded.end, loaded.late_start), (league.start, league.end, league.late_start))
+		self.assertEqual(loaded.table().to_dict(), league.table().to_dict())
+		# 讀回來的狀態再餵一次收過的週，不會重複算
+		self.assertEqual(loaded.add_week(make_week(WEEKS[2])["data"]), 0)
+
+	def test_merge_two_partial_ranges(self):
+		full = _feed(LeagueStats(FIRST, WEEKS[-1], LATE), WEEKS[:5])
+		first = _feed(LeagueStats(FIRST, WEEKS[2], LATE), WEEKS[:5])
+		second = _feed(LeagueStats(WEEKS[2], WEEKS[-1], LATE), WEEKS[:5])
+		merged = second.merge(first)
+		expected = _snapshot(full)
+		got = _snapshot(merged)
+		for key in ("seen", "games", "totals", "starts", "faced", "batters", "start", "end"):
+			self.assertEqual(got[key], expected[key], key)
+		with self.assertRaises(ValueError):
+			merged.merge(full)
+
+	def test_end_is_exclusive(self):
+		end = FIRST + datetime.timedelta(days=3)
+		league = _feed(LeagueStats(FIRST, end), WEEKS[:1])
+		days = {it.date for games in league.games.values() for it in games}
+		self.assertEqual(max(days), _tuple(end - datetime.timedelta(days=1)))
+		team = league.teams()[0]
+		self.assertEqual(league.summary(team, end=end)["games"], league.summary(team)["games"])
+		self.assertEqual(len(league.games_of(team, end=end - datetime.timedelta(days=1))),
+			len([it for it in league.games[team] if it.date < _tuple(end - datetime.timedelta(days=1))]))
+
+	def test_refresh_extends_end(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			# 都是過去的週而且打完了，WeekCache 不會上網
+			cache = WeekCache(tmp)
+			for day in WEEKS:
+				cache.save(SEASON_SUFFIX[day.year], day, make_week(day))
+			kwargs = {"cache": cache, "calendar": WeekCalendar(tmp)}
+			league = LeagueStats(FIRST, WEEKS[2])
+			with redirect_stdout(io.StringIO()):
+				first = league.refresh(_tuple(WEEKS[2]), _tuple(FIRST), **kwargs)
+				more = league.refresh(_tuple(WEEKS[4]), **kwargs)
+				again = league.refresh(_tuple(WEEKS[4]), **kwargs)
+		expected = _feed(LeagueStats(FIRST, WEEKS[4]), WEEKS[:4])
+		self.assertEqual(league.end, WEEKS[4])
+		self.assertEqual(first, 2 * 18)
+		self.assertEqual(more, 2 * 18)
+		self.assertEqual(again, 0)
+		self.assertEqual(league.seen, expected.seen)
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,118 @@
+import datetime
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "bench"))
+from package import cpbl_stream
+from package.cpbl_cache import WeekCache
+from package.cpbl_calendar import GameWindow, WeekCalendar
+from package.cpbl_client import SEASON_SUFFIX
+from package.cpbl_stream import iter_cached_games, iter_cached_weeks, iter_file_games
+from package.errors import PayloadError
+from fake_rebas import make_week
+
+"""
+週檔一場一場讀 (cpbl_stream)，不管檔案被切成多小塊都跟 json.load 一樣
+	python -m pytest test/
+"""
+
+FIRST = datetime.date(2025, 3, 24)
+WEEKS = [FIRST + datetime.timedelta(days=7 * i) for i in range(3)]
+# 數字、字串跳脫、巢狀的東西，小 chunk 一定會切在它們中間
+TRICKY = {
+	"meta": {"v": 1, "tags": ["a", "b"]},
+	"data": [
+		{"id": 123456789, "x": -4.5, "y": 1e-07, "z": 12.0e3, "s": "引號 \" 跟 \\ 跟 é 跟 😀", "n": None, "b": [True, False]},
+		{"id": 0, "nested": {"a": [[], {}, [1, [2, [3]]]]}, "neg": -0},
+		987,
+		"  空白  "
+	],
+	"after": 3.25
+}
+
+class IterFileGamesTest(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def _write(self, text: str) -> str:
+		path = os.path.join(self.tmp.name, "week.json")
+		with open(path, "w", encoding="utf-8") as f:
+			f.write(text)
+		return path
+
+	# 沒裝 ijson 的讀法 (raw_decode 一塊一塊讀)
+	def _games(self, path: str, chunk_size: int) -> list:
+		with mock.patch.object(cpbl_stream, "ijson", None):
+			return list(iter_file_games(path, chunk_size))
+
+	def test_matches_json_load_on_every_chunk_size(self):
+		# 一整週很大，一個字一個字讀太慢，用比一場小的塊就會切在比賽中間
+		cases = [(json.dumps(TRICKY, ensure_ascii=False), (1, 2, 3, 5, 7, 64, 4096)), (json.dumps(TRICKY, indent=2), (1, 3, 7)),
+			(json.dumps(make_week(FIRST), ensure_ascii=False), (997, 4096, cpbl_stream.CHUNK_SIZE))]
+		for text, chunk_sizes in cases:
+			path = self._write(text)
+			with open(path, "r", encoding="utf-8") as f:
+				want = json.load(f)["data"]
+			for chunk_size in chunk_sizes:
+				self.assertEqual(self._games(path, chunk_size), want, chunk_size)
+
+	def test_empty(self):
+		for text in ("{}", "{\"data\": []}", " { \"other\" : 1 } "):
+			self.assertEqual(self._games(self._write(text), 1), [])
+
+	def test_broken_file(self):
+		text = json.dumps(TRICKY)
+		for broken in (text[:len(text) // 2], text.replace("[", "(", 1), "[1, 2]"):
+			path = self._write(broken)
+			for chunk_size in (1, 7, 4096):
+				with self.assertRaises(PayloadError):
+					self._games(path, chunk_size)
+
+	@unittest.skipIf(cpbl_stream.ijson is None, "ijson is not installed")
+	def test_ijson_matches(self):
+		path = self._write(json.dumps(TRICKY))
+		self.assertEqual(list(iter_file_games(path)), self._games(path, 3))
+
+class IterCachedTest(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		self.cache = WeekCache(self.tmp.name)
+		for day in WEEKS:
+			self.cache.save(SEASON_SUFFIX[day.year], day, make_week(day))
+		self.calendar = WeekCalendar(self.tmp.name)
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def test_same_games_as_window(self):
+		start, end = (2025, 3, 27), (2025, 4, 16)
+		window = GameWindow(start, end)
+		want = [raw for day in WEEKS for raw in window.take(make_week(day)["data"])]
+		got = list(iter_cached_games(start, end, self.cache, self.calendar))
+		self.assertEqual(got, want)
+		weeks = list(iter_cached_weeks(start, end, self.cache, self.calendar))
+		self.assertEqual([now for now, _ in weeks], [(day.year, day.month, day.day) for day in WEEKS])
+		self.assertEqual([game.id for _, games in weeks for game in games], [raw["id"] for raw in want])
+
+	def test_missing_week(self):
+		missing = []
+		end = WEEKS[-1] + datetime.timedelta(days=14)
+		with redirect_stdout(io.StringIO()):
+			weeks = list(iter_cached_weeks(FIRST, end, self.cache, self.calendar, missing))
+		self.assertEqual(len(weeks), len(WEEKS))
+		self.assertEqual(missing, [(2025, 4, 14)])
+
+if __name__ == "__main__":
+	unittest.main()
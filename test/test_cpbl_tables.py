@@ -0,0 +1,90 @@
+import math
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from package.cpbl_tables import LINKED, PLAYER, TEAM_AVERAGE, TableCache, stat_or_zero, typed
+
+"""
+TableCache (頁面解析一次就記住，檔案換掉才重新解析)
+	python -m pytest test/
+"""
+
+PAGE = """
+<table>
+	<thead><tr><th>球員</th><th>AVG</th><th>IP</th><th>ERA+</th></tr></thead>
+	<tbody>
+		<tr><td><button>王一</button></td><td>.313</td><td>28, 2/3</td><td>NaN</td></tr>
+		<tr><td><button>李二</button></td><td>.250</td><td>10</td><td>-</td></tr>
+		<tr><td>球隊平均</td><td>.280</td><td>38, 2/3</td><td>100</td></tr>
+	</tbody>
+</table>
+"""
+
+class TableCacheTest(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp = tempfile.mkdtemp()
+		self.page = os.path.join(self.tmp, "page.txt")
+		self._write(PAGE)
+		self.cache_dir = os.path.join(self.tmp, "tables")
+
+	def tearDown(self):
+		shutil.rmtree(self.tmp)
+
+	def _write(self, html: str, mtime_ns: int = None):
+		with open(self.page, "w", encoding="utf-8") as f:
+			f.write(html)
+		if (mtime_ns is not None):
+			os.utime(self.page, ns=(mtime_ns, mtime_ns))
+
+	def test_typed_cells(self):
+		tables = TableCache(self.cache_dir).load(self.page)
+		row = tables[0].rows[0]
+		self.assertEqual(row.cells[:3], ["王一", 0.313, "28, 2/3"])
+		self.assertTrue(math.isnan(row.cells[3]))
+		self.assertEqual(row.button, "王一")
+		self.assertEqual(tables[0].rows[1].cells[3], "-")
+
+	def test_parsed_once_then_memory_then_disk(self):
+		cache = TableCache(self.cache_dir)
+		first = cache.load(self.page)
+		self.assertIs(cache.load(self.page), first)
+		self.assertEqual(cache.parsed, 1)
+		# 新的 TableCache (例如下一次執行) 讀磁碟快取，不用再解析
+		other = TableCache(self.cache_dir)
+		self.assertEqual(other.load(self.page)[0].rows[0].cells[:3], first[0].rows[0].cells[:3])
+		self.assertEqual(other.parsed, 0)
+
+	def test_changed_file_is_parsed_again(self):
+		cache = TableCache(self.cache_dir)
+		cache.load(self.page)
+		self._write(PAGE.replace(".313", ".314"), mtime_ns=os.stat(self.page).st_mtime_ns + 10**9)
+		self.assertEqual(cache.load(self.page)[0].rows[0].cells[1], 0.314)
+		self.assertEqual(cache.parsed, 2)
+		self.assertEqual(TableCache(self.cache_dir).cached(self.page)[0].rows[0].cells[1], 0.314)
+
+	def test_missing_file(self):
+		cache = TableCache(self.cache_dir)
+		self.assertIsNone(cache.load(os.path.join(self.tmp, "nope.txt")))
+		self.assertIsNone(cache.frames(os.path.join(self.tmp, "nope.txt")))
+
+	def test_frames(self):
+		cache = TableCache(self.cache_dir)
+		frame = cache.frames(self.page)[0]
+		self.assertIs(cache.frames(self.page)[0], frame)
+		self.assertEqual(list(frame[PLAYER]), ["王一", "李二", "球隊平均"])
+		self.assertEqual(list(frame[LINKED]), [True, True, False])
+		self.assertEqual(list(frame[TEAM_AVERAGE]), [False, False, True])
+		self.assertEqual(list(frame["AVG"]), [0.313, 0.25, 0.28])
+
+	def test_stat_or_zero(self):
+		self.assertEqual([stat_or_zero(typed(text)) for text in ("NaN", "Infinity", "-", "", "107.5")], [0.0, 0.0, 0.0, 0.0, 107.5])
+		with self.assertRaises(ValueError):
+			stat_or_zero("28, 2/3")
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,89 @@
+import datetime
+import os
+import sys
+import unittest
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "bench"))
+from package.cpbl_models import games_from_week
+from package.cpbl_warehouse import Warehouse
+from fake_rebas import make_week
+
+"""
+Warehouse (sqlite) 的查詢跟直接一場一場看 Game 算的一樣
+	python -m pytest test/
+"""
+
+FIRST = datetime.date(2025, 3, 24)
+DAYS = [FIRST + datetime.timedelta(days=7 * i) for i in range(4)]
+WEEKS = [(day, make_week(day)["data"]) for day in DAYS]
+TEAM = "悍"
+
+# count_game / find_sp 看比賽的順序: 一週一週，每週反轉 (API 是新的排前面)
+def _games(start = None, end = None) -> list:
+	result = []
+	for _, raw_games in WEEKS:
+		for game in reversed(games_from_week(raw_games)):
+			if (start is not None and game.started_at < start):
+				continue
+			if (end is not None and game.started_at >= end):
+				continue
+			if (game.finished and game.has(TEAM)):
+				result.append(game)
+	return result
+
+class WarehouseTest(unittest.TestCase):
+
+	def setUp(self):
+		self.wh = Warehouse(":memory:")
+		for day, raw_games in WEEKS:
+			self.wh.ingest_week(day, raw_games)
+
+	def tearDown(self):
+		self.wh.close()
+
+	def test_results_and_run_diffs(self):
+		mid = datetime.date(2025, 4, 9)
+		for start, end in ((None, None), (mid, None), (None, mid), (FIRST, mid)):
+			games = _games(start, end)
+			self.assertEqual(self.wh.results(TEAM, start, end), [(game.result_for(TEAM), game.date_tuple) for game in games])
+			self.assertEqual(self.wh.run_diffs(TEAM, start, end), [ours - theirs for ours, theirs in (game.runs_for(TEAM) for game in games)])
+
+	def test_end_is_exclusive(self):
+		game = _games()[0]
+		day = game.started_at
+		self.assertNotIn(game.date_tuple, [date for _, date in self.wh.results(TEAM, end=day)])
+		self.assertIn(game.date_tuple, [date for _, date in self.wh.results(TEAM, start=day)])
+		self.assertEqual(self.wh.results(TEAM, start=day, end=day), [])
+
+	def test_batter_re24(self):
+		want = {}
+		for game in _games():
+			for pa in game.PA_list:
+				pa_count, re24 = want.get(pa.batter, (0, 0.0))
+				want[pa.batter] = (pa_count + 1, re24 + pa.RE24)
+		got = self.wh.batter_re24(TEAM)
+		self.assertEqual(set(got), set(want))
+		for name, (pa_count, re24) in want.items():
+			self.assertEqual(got[name][0], pa_count)
+			self.assertAlmostEqual(got[name][1], re24, places=9)
+
+	def test_starting_pitchers(self):
+		games = _games()
+		ours = {}
+		theirs = {}
+		for game in games[:10]:
+			home_sp, away_sp = game.innings.starting_pitchers()
+			mine, other = (home_sp, away_sp) if game.home == TEAM else (away_sp, home_sp)
+			ours[mine] = ours.get(mine, 0) + 1
+			theirs[other] = theirs.get(other, 0) + 1
+		self.assertEqual(self.wh.starting_pitchers(TEAM, game_count=10), (ours, theirs))
+
+	def test_ingest_again_does_not_duplicate(self):
+		before = self.wh.query("SELECT COUNT(*) FROM plate_appearances")
+		self.wh.ingest_week(*WEEKS[1])
+		self.assertEqual(self.wh.query("SELECT COUNT(*) FROM plate_appearances"), before)
+		self.assertEqual(len(self.wh.results(TEAM)), len(_games()))
+
+if __name__ == "__main__":
+	unittest.main()
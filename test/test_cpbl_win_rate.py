@@ -0,0 +1,79 @@
+import io
+import os
+import random
+import sys
+import unittest
+from contextlib import redirect_stdout
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from package.cpbl_win_rate import GetWR, window_win_rates
+
+"""
+滑動視窗勝率 (window_win_rates / GetWR.standard_discrete)
+	python -m pytest test/
+"""
+
+# 以前 GetWR.standard_discrete 的 O(N·k) 算法 (每個值都 round 到小數第 9 位)
+def _old_standard_discrete(marks: list, ran: int) -> tuple:
+	data = []
+	raw_sum = 0
+	delta_sum = 0
+	for l in range(0, len(marks) - ran + 1):
+		win = 0
+		total = 0
+		for mark in marks[l:l+ran]:
+			if (mark != "T"):
+				total += 1
+			if (mark == "W"):
+				win += 1
+		data.append(round(win / total, 9))
+		raw_sum += round(win / total, 9)
+	M = len(data)
+	avg = round(raw_sum / M, 9)
+	for it in data:
+		delta_sum += round((it - avg) * (it - avg), 9)
+	std = round((delta_sum / M) ** 0.5, 9)
+	tar_avg = data[M-1]
+	diff = round((tar_avg - avg) / std, 9)
+	return (avg, std, tar_avg, diff)
+
+class WindowWinRatesTest(unittest.TestCase):
+
+	def test_matches_old_standard_discrete(self):
+		rng = random.Random(20250324)
+		for _ in range(20):
+			# 和局很少，視窗至少 3 場就不會整個都是和局 (舊的算法遇到會除以 0)
+			marks = ["T" if rng.random() < 0.03 else rng.choice("WL") for _ in range(rng.randint(30, 120))]
+			sizes = [ran for ran in range(3, min(40, len(marks) + 1)) if "TTT" not in "".join(marks)]
+			for ran, stats in window_win_rates(marks, sizes).items():
+				try:
+					expected = _old_standard_discrete(marks, ran)
+				except ZeroDivisionError:
+					# 只有一個視窗 (ran 就是整季) 標準差是 0，舊的會除以 0，現在 z 分數是 0.0
+					self.assertEqual(stats[3], 0.0)
+					continue
+				# 以前每一項平方差都先 round 到第 9 位，標準差小的時候 z 分數會差到第 6 位
+				for got, want in zip(stats, expected):
+					self.assertAlmostEqual(got, want, delta=1e-5)
+
+	def test_last_window_all_ties(self):
+		result = window_win_rates(["W", "W", "W", "T"], [1, 2])
+		self.assertEqual(result[1], (1.0, 0.0, None, None))
+		self.assertEqual(result[2], (1.0, 0.0, 1.0, 0.0))
+
+	def test_zero_std_and_short_season(self):
+		result = window_win_rates(["W", "L"] * 5, [2, 11])
+		self.assertEqual(result[2], (0.5, 0.0, 0.5, 0.0))
+		self.assertIsNone(result[11])
+		self.assertIsNone(window_win_rates(["T", "T"], [1])[1])
+
+	def test_standard_discrete_prints_without_nan(self):
+		wr = GetWR((2025, 3, 24), (2025, 3, 31))
+		wr._game_result = [(mark, (2025, 3, 25 + i)) for i, mark in enumerate(["W", "L", "W", "T"])]
+		out = io.StringIO()
+		with redirect_stdout(out):
+			stats = wr.standard_discrete(1)
+		self.assertEqual(stats[2:], (None, None))
+		self.assertNotIn("nan", out.getvalue())
+
+if __name__ == "__main__":
+	unittest.main()
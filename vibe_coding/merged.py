@@ -1,8 +1,18 @@
-import requests as rq
+# 要在 repo 根目錄用 python -m vibe_coding.merged 跑，才找得到 package/
+import datetime
 import json
 import pandas as pd
-from bs4 import BeautifulSoup
 import os
+from package.cpbl_cache import WeekCache, as_date
+from package.cpbl_calendar import GameWindow, WeekCalendar
+from package.cpbl_fetch import CrawlCheckpoint, WeekCrawler
+from package.cpbl_client import RebasClient
+from package.cpbl_tables import PLAYER, frames_with, load_frames, stat_or_zero
+from package.cpbl_names import page_index
+from package.cpbl_league import load_pages
+from package.cpbl_models import half_innings
+from package.cpbl_teams import TEAM_MAP
+from package.cpbl_standings import LeagueStats
 
 # ==========================================
 # 1. 設定與基礎類別
@@ -10,69 +20,32 @@ import os
 
 BASE_FILE_PATH = "C:/Users/aaron/Desktop/Python/大學中文/datas/2024/"
 
-# 隊伍代號對照表
-TEAM_MAP = {
-    "悍": "guardians",
-    "龍": "dragons",
-    "獅": "lions",
-    "猿": "monkeys",
-    "鷹": "hawks",
-    "象": "brothers"
-}
+# 隊伍代號對照表 (放在 package/cpbl_teams.py)
 
-class GetData:
-    header = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36",
-        "Accept": "application/json, text/plain, */*"
-    }
-    suffix = {2018: "Fq", 2019: "Sf", 2020: "KS", 2021: "fi",
-              2022: "dG", 2023: "sk", 2024: "xa", 2025: "JO"}
-
-    def __init__(self, start_date: tuple, end_date: tuple):
+class GetData(WeekCrawler):
+    def __init__(self, start_date: tuple, end_date: tuple, cache: WeekCache = None, max_workers: int = 1, client: RebasClient = None, calendar: WeekCalendar = None, checkpoint: CrawlCheckpoint = None):
         self.data = {}
         self.start_date = start_date
         self.end_date = end_date
         self._now = start_date
-
-    @staticmethod
-    def days_of_month(m: int):
-        if m in [1, 3, 5, 7, 8, 10, 12]: return 31
-        if m in [4, 6, 9, 11]: return 30
-        if m % 4 == 0 and m % 100 != 0: return 29
-        return 28
+        self.init_crawler(cache, max_workers, client, calendar, checkpoint)
 
     def next_date(self):
-        y, m, d = self._now
-        d += 7
-        if d > self.days_of_month(m):
-            d -= self.days_of_month(m)
-            m += 1
-        if m > 12:
-            m -= 12
-            y += 1
-        self._now = (y, m, d)
+        day = as_date(self._now) + datetime.timedelta(days=7)
+        self._now = (day.year, day.month, day.day)
 
     def url_get(self):
-        y, m, d = self._now
-        su = self.suffix.get(y, "JO")
-        return f"https://www.rebas.tw/api/seasons/CPBL-{y}-{su}/games?start={y}-{m:02d}-{d:02d}"
+        return self.week_url(self._now)
 
     def run(self):
         print(f"Start crawling from {self.start_date} to {self.end_date}...")
-        self._now = self.start_date
-        s = rq.Session()
-        s.headers.update(self.header)
-
-        while self._now < self.end_date:
-            url = self.url_get()
-            try:
-                resp = s.get(url, timeout=10)
-                if resp.status_code == 200:
-                    json_data = resp.json()
-                    self.data[self._now] = json_data.get("data", [])
-            except Exception as e:
-                print(f"Connection Error at {self._now}: {e}")
-            self.next_date()
+        # 對齊週一、跳過已經知道沒比賽的週，開始日不用剛好是週一
+        window = GameWindow(self.start_date, self.end_date)
+        for (week, _), json_data in self.crawl(self.start_date, self.end_date):
+            if json_data is not None:
+                self.calendar.record(week, json_data)
+                # 範圍外跟前面週已經收過的比賽不要
+                self.data[week] = window.take(json_data.get("data", []))
         
         print(f"Crawling finished. Collected {len(self.data)} weeks.")
         return self.data
@@ -89,83 +62,42 @@ def get_era_from_local_file(team_name: str, target_pitchers: list) -> dict:
         return {}
 
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            soup = BeautifulSoup(f.read(), "html.parser")
+        frames = load_frames(file_path)
     except Exception as e:
         print(f"Error reading {file_path}: {e}")
         return {}
 
-    result = {}
-    tables = soup.find_all("table")
-
-    for table in tables:
-        thead = table.find("thead")
-        if not thead: continue
-        headers = [th.get_text(strip=True) for th in thead.find_all("th")]
-
-        if "ERA+" in headers and "tERA+" in headers:
-            erap_idx = headers.index("ERA+")
-            terap_idx = headers.index("tERA+")
-            name_idx = 0 
-            
-            tbody = table.find("tbody")
-            if not tbody: continue
-            
-            for row in tbody.find_all("tr"):
-                cols = row.find_all("td")
-                if not cols: continue
-                if len(cols) <= max(erap_idx, terap_idx): continue
+    # '陳仕鵬' vs '陳仕朋' 這種寫法差異交給別名表 (package/player_aliases.json)
+    # 對不到的才看子字串，兩個方向都算；對到不只一個的就不配，印出來
+    owners, ambiguous = page_index(file_path).resolve(target_pitchers, both_ways=True)
+    for target, candidates in ambiguous.items():
+        print(f"Warning: {target} is ambiguous in {team_name}.txt: {candidates}")
 
-                raw_name = cols[name_idx].get_text(strip=True)
-                
-                for target in target_pitchers:
-                    # 這裡加上簡單的名稱修正，避免 '陳仕鵬' vs '陳仕朋' 的問題
-                    # 但主要依賴 target (API名) 是否包含在 raw_name (檔案名) 中
-                    if target in raw_name or raw_name in target:
-                        try:
-                            val_erap = cols[erap_idx].get_text(strip=True)
-                            val_terap = cols[terap_idx].get_text(strip=True)
-                            
-                            def safe_float(v):
-                                return 0.0 if v in ["-", "NaN", "Infinity", ""] else float(v)
+    result = {}
 
-                            result[target] = {
-                                "ERA+": safe_float(val_erap), 
-                                "tERA+": safe_float(val_terap)
-                            }
-                        except:
-                            pass
-                        break 
+    for frame in frames_with(frames, "ERA+", "tERA+"):
+        for raw_name, erap, terap in zip(frame[PLAYER], frame["ERA+"], frame["tERA+"]):
+            target = owners.get(raw_name)
+            if target is None: continue
+            try:
+                result[target] = {
+                    "ERA+": stat_or_zero(erap), 
+                    "tERA+": stat_or_zero(terap)
+                }
+            except:
+                pass
     return result
 
 def identify_sp_in_game(game) -> tuple:
     """ 
-    修正版邏輯：
-    精準尋找「下半局開始」的那個打席。
-    下半局開始的特徵：棒次(PA_order) 為 1，且是該隊第一輪(PA_round) 為 1。
+    (主隊先發 = 1局上投手, 客隊先發 = 1局下投手)
+    半局怎麼切是 package 裡每場算一次就記住的 (half_innings)，這裡直接查
+    若找不到 (例如比賽只打半局裁定? 極少見)，則 away_sp 為 None
     """
     try:
-        pa_list = game.get("PA_list", [])
-        if not pa_list:
+        if not game.get("PA_list"):
             return (None, None)
-
-        # 1. 取得主隊先發 (1局上投手)
-        home_sp_name = pa_list[0]["pitcher"]["name"]
-        away_sp_name = None
-
-        # 2. 尋找客隊先發 (1局下投手)
-        # 我們從 index 1 開始找，尋找第一個同時滿足 PA_order==1 和 PA_round==1 的打席
-        # 這代表是「另一隊」的第一棒第一次上場，也就是下半局開始
-        for i in range(1, len(pa_list)):
-            pa = pa_list[i]
-            # 檢查是否為第一棒，且是第一輪
-            # 注意：如果是單局打超過一輪，PA_order 會是 1，但 PA_round 會是 2 (或其他)，所以會被這裡過濾掉
-            if pa["PA_order"] == 1 and pa["PA_round"] == 1:
-                away_sp_name = pa["pitcher"]["name"]
-                break
-        
-        # 若找不到 (例如比賽只打半局裁定? 極少見)，則 away_sp 為 None
-        return (home_sp_name, away_sp_name)
+        return half_innings(game).starting_pitchers()
 
     except Exception as e:
         # print(f"Error parsing game SP: {e}")
@@ -180,21 +112,13 @@ def run_analysis(start_date: tuple, end_date: tuple, n_late_games: int):
     crawler = GetData(start_date, end_date)
     raw_data_weeks = crawler.run()
 
-    # 2. 排序
-    all_sorted_games = []
-    sorted_dates = sorted(raw_data_weeks.keys())
-    for d in sorted_dates:
-        all_sorted_games.extend(raw_data_weeks[d][::-1]) 
+    # 2. 六隊一起算，一場只看一次 (每週倒過來 = 照時間順序)
+    league = LeagueStats()
+    for d in sorted(raw_data_weeks.keys()):
+        league.add_week(raw_data_weeks[d])
 
-    # 3. 篩選
-    guardians_games = []
-    for game in all_sorted_games:
-        if game["info"]["status"] != "FINISHED":
-            continue
-        h = game["home"]["abbr"]
-        a = game["away"]["abbr"]
-        if h == "悍" or a == "悍":
-            guardians_games.append(game)
+    # 3. 篩選：悍將的比賽就是聯盟資料的一個 view
+    guardians_games = league.games_of("悍")
 
     total_g_count = len(guardians_games)
     print(f"Total Guardians games: {total_g_count}")
@@ -207,29 +131,22 @@ def run_analysis(start_date: tuple, end_date: tuple, n_late_games: int):
 
     for idx, game in enumerate(guardians_games):
         is_late = (idx >= late_start_index)
-        home_abbr = game["home"]["abbr"]
-        away_abbr = game["away"]["abbr"]
-        
-        home_sp, away_sp = identify_sp_in_game(game)
         
-        if not home_sp or not away_sp: 
+        if not game.own_sp or not game.opp_sp: 
             continue
 
-        # 歸類主隊先發 (Home SP -> Home Team)
-        if home_abbr in TEAM_MAP:
-            t_key = TEAM_MAP[home_abbr]
-            if home_sp not in stats[t_key]: stats[t_key][home_sp] = {"total": 0, "late": 0}
-            stats[t_key][home_sp]["total"] += 1
-            if is_late: stats[t_key][home_sp]["late"] += 1
-
-        # 歸類客隊先發 (Away SP -> Away Team)
-        if away_abbr in TEAM_MAP:
-            t_key = TEAM_MAP[away_abbr]
-            if away_sp not in stats[t_key]: stats[t_key][away_sp] = {"total": 0, "late": 0}
-            stats[t_key][away_sp]["total"] += 1
-            if is_late: stats[t_key][away_sp]["late"] += 1
+        # 悍將先發歸悍將，對手先發歸對手
+        for abbr, sp in (("悍", game.own_sp), (game.opponent, game.opp_sp)):
+            if abbr in TEAM_MAP:
+                t_key = TEAM_MAP[abbr]
+                if sp not in stats[t_key]: stats[t_key][sp] = {"total": 0, "late": 0}
+                stats[t_key][sp]["total"] += 1
+                if is_late: stats[t_key][sp]["late"] += 1
 
     # 6. 輸出
+    # 六隊的頁面先一起解析 (六頁而已，在這個 process 做比開 pool 快)，下面 get_era_from_local_file 就都是快取
+    load_pages([f"{BASE_FILE_PATH}{team_code}.txt" for team_code in stats.keys()])
+
     print("\nGenerating CSV files...")
     for team_code in stats.keys():
         pitchers_dict = stats[team_code]
@@ -265,6 +182,6 @@ def run_analysis(start_date: tuple, end_date: tuple, n_late_games: int):
 
 if __name__ == "__main__":
     s_date = (2024, 7, 8)
-    e_date = (2024, 10, 27)
+    e_date = (2024, 10, 28)  # 不含這天，10/27 那週的比賽都要
     LATE_N = 19
     run_analysis(s_date, e_date, LATE_N)
\ No newline at end of file
@@ -1,56 +1,26 @@
-import requests as rq
+# 要在 repo 根目錄用 python -m vibe_coding.runs_counter 跑，才找得到 package/
 import datetime
 import math
+from package.cpbl_cache import WeekCache
+from package.cpbl_calendar import GameWindow, WeekCalendar
+from package.cpbl_fetch import CrawlCheckpoint, WeekCrawler
+from package.cpbl_client import RebasClient
 
 end_D = (2025, 7, 3)
 
-class GetRunStats:
-    # 模擬瀏覽器的 Header
-    header = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36",
-        "Accept": "application/json, text/plain, */*"
-    }
-
-    # 年份對應的 URL 後綴
-    suffix = {
-        2018: "Fq", 2019: "Sf", 2020: "KS", 2021: "fi", 
-        2022: "dG", 2023: "sk", 2024: "xa", 2025: "JO"
-    }
-
-    def __init__(self, start_date: tuple, end_date: tuple):
+class GetRunStats(WeekCrawler):
+    def __init__(self, start_date: tuple, end_date: tuple, cache: WeekCache = None, max_workers: int = 1, client: RebasClient = None, calendar: WeekCalendar = None, checkpoint: CrawlCheckpoint = None):
         # 將 tuple (2025, 3, 24) 轉為 datetime 物件方便計算
         self._start_date = datetime.date(*start_date)
         self._end_date = datetime.date(*end_date)
-        self._current_date = self._start_date
-        self._url = None
         
         # 統計數據容器
         self._games_count = 0
         self._total_runs_scored = 0  # 總得分
         self._total_runs_allowed = 0 # 總失分
         self._run_differentials = [] # 每一場的得失分差 (用於計算標準差)
-
-    def _url_get(self):
-        """
-        產生 Rebas API 的 URL
-        """
-        y, m, d = self._current_date.year, self._current_date.month, self._current_date.day
-        su = self.suffix.get(y, "JO") 
-        # 保持你原本的 URL 格式
-        self._url = f"https://www.rebas.tw/api/seasons/CPBL-{y}-{su}/games?start={y}-{m:02d}-{d:02d}"
-
-    def raw_content_by_get(self, url: str): 
-        """
-        爬蟲核心：發送 GET 請求並回傳 JSON
-        """
-        try:
-            s = rq.Session()
-            response = s.get(url, headers=self.header)
-            response.raise_for_status() # 檢查 HTTP 錯誤
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching data from {url}: {e}")
-            return None
+        # 快取、連線池、週曆、checkpoint、self.missing 都是 WeekCrawler 在管
+        self.init_crawler(cache, max_workers, client, calendar, checkpoint)
 
     def _process_games(self, game_list: list):
         """
@@ -105,18 +75,15 @@ class GetRunStats:
         """
         print(f"Start analyze from {self._start_date} to {self._end_date}")
         
-        # 當前日期小於結束日期時，持續迴圈
-        while self._current_date < self._end_date:
-            self._url_get()
-            # print(f"Fetching: {self._url}") # Debug 用
-            
-            json_data = self.raw_content_by_get(self._url)
-            
-            if json_data and "data" in json_data:
-                self._process_games(json_data["data"])
-            
-            # 前進一週 (配合 Rebas API 的特性)
-            self._current_date += datetime.timedelta(days=7)
+        # 週曆會對齊週一、跳過已經知道沒比賽的週，開始日不用剛好是週一
+        # 照日期順序回傳，所以處理順序跟以前一樣
+        # 抓不到的週不會再默默不見，會記在 self.missing 而且最後印出來
+        window = GameWindow(self._start_date, self._end_date)
+        for (week, _), json_data in self.crawl(self._start_date, self._end_date):
+            if json_data is not None:
+                self.calendar.record(week, json_data)
+                # 範圍外跟重複的比賽不算
+                self._process_games(window.take(json_data["data"]))
         
         self._print_stats()
 